@@ -0,0 +1,7 @@
+"""Benchmarks dos caminhos críticos sobre bancos sintéticos
+
+    python -m benchmarks.dados --empresas 100000            # só gera o banco
+    python -m benchmarks.executar --empresas 100000         # gera (se preciso) e mede
+    python -m benchmarks.executar --gravar-baseline         # grava a referência desta máquina
+    python -m benchmarks.carga --sessoes 16 --duracao 30    # várias sessões concorrentes
+"""
@@ -0,0 +1,226 @@
+"""Simulador de carga: várias sessões concorrentes sobre o mesmo arquivo de banco
+
+Cada sessão representa um cliente desktop: abre sua própria conexão (como o
+ExecutorBanco de cada instância da aplicação), faz login e repete, até o fim da
+duração, operações sorteadas pela mistura configurada. As sessões rodam em threads
+ou em processos separados, o caso real de vários clientes no mesmo arquivo.
+
+    python -m benchmarks.carga --sessoes 16 --duracao 30
+    python -m benchmarks.carga --sessoes 32 --modo processos --mix busca=5,mensagem=5,dashboard=2
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.dados import PRENOMES, RAIZES_EMPRESA, SENHA_PADRAO, argumentos_escala, preparar_banco
+from benchmarks.executar import PAGINA, percentil
+from boss_bridge.banco import abrir_conexao
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.servicos.conexoes import (
+    criar_conexao, listar_conexoes, listar_status_conexoes, partes_conexao, responder_conexao
+)
+from boss_bridge.servicos.contas import autenticar
+from boss_bridge.servicos.diretorio import buscar_contas
+from boss_bridge.servicos.mensagens import enviar_mensagem, listar_conversas, marcar_mensagens_lidas
+from boss_bridge.servicos.notificacoes import consultar_dashboard
+
+# Peso de cada fluxo na mistura padrão
+MIX_PADRAO = {"login": 1, "busca": 6, "solicitar": 1, "aceitar": 1, "mensagem": 3, "dashboard": 3}
+
+class Sessao:
+    """Um cliente simulado: conta autenticada, conexão própria e os fluxos da interface"""
+
+    def __init__(self, conn, rng, conta_id, tipo_conta, email, max_user, max_empresa):
+        self.conn = conn
+        self.rng = rng
+        self.conta_id = conta_id
+        self.tipo_conta = tipo_conta
+        self.email = email
+        self.max_user = max_user
+        self.max_empresa = max_empresa
+        self.status_conexoes = {}
+
+    def login(self):
+        # Mesmos passos de _login_concluido: autenticar e carregar o mapa de status
+        if autenticar(self.conn, self.email, SENHA_PADRAO) is None:
+            raise ErroValidacao("Email ou senha incorretos!")
+        self.status_conexoes = listar_status_conexoes(self.conn, self.conta_id, self.tipo_conta)
+
+    def busca(self):
+        if self.tipo_conta == "user":
+            termo = self.rng.choice(RAIZES_EMPRESA).lower()[:self.rng.randint(2, 4)]
+        else:
+            termo = self.rng.choice(PRENOMES).lower()[:self.rng.randint(2, 5)]
+        buscar_contas(self.conn, self.tipo_conta, termo, 0, PAGINA)
+
+    def solicitar(self):
+        # Como na tela de busca: só contas sem conexão recebem o botão Conectar
+        if self.tipo_conta == "user":
+            alvo, tipo_alvo = self.rng.randint(1, self.max_empresa), "empresa"
+        else:
+            alvo, tipo_alvo = self.rng.randint(1, self.max_user), "user"
+        if alvo in self.status_conexoes:
+            return
+        user_id, empresa_id = partes_conexao(self.conta_id, self.tipo_conta, alvo, tipo_alvo)
+        criar_conexao(self.conn, user_id, empresa_id, tipo_alvo)
+        self.status_conexoes[alvo] = "pendente"
+
+    def aceitar(self):
+        if self.tipo_conta != "empresa":
+            return self.dashboard()
+        pendentes = [linha for linha in listar_conexoes(self.conn, self.conta_id, "empresa", 0, PAGINA)
+                     if linha[3] == "pendente"]
+        if pendentes:
+            responder_conexao(self.conn, self.rng.choice(pendentes)[0], self.rng.choice(["aceita", "recusada"]))
+
+    def mensagem(self):
+        # Abrir a lista de conversas, abrir uma conversa e responder
+        conversas = listar_conversas(self.conn, self.conta_id, self.tipo_conta, 0, PAGINA)
+        if not conversas:
+            return
+        conversa_id = self.rng.choice(conversas)[4]
+        marcar_mensagens_lidas(self.conn, conversa_id, self.conta_id, self.tipo_conta)
+        enviar_mensagem(self.conn, conversa_id, self.conta_id, self.tipo_conta, "Mensagem de carga")
+
+    def dashboard(self):
+        consultar_dashboard(self.conn, self.conta_id, self.tipo_conta)
+
+def interpretar_mix(texto):
+    """Converte 'busca=5,mensagem=2' em {fluxo: peso}"""
+    mix = {}
+    for item in texto.split(","):
+        nome, _, peso = item.partition("=")
+        nome = nome.strip()
+        if nome not in MIX_PADRAO:
+            raise ValueError(f"Fluxo desconhecido: {nome} (opções: {', '.join(MIX_PADRAO)})")
+        mix[nome] = float(peso or 1)
+    return mix
+
+def executar_sessao(indice, caminho, mix, duracao, semente, busy_timeout):
+    """Roda uma sessão até o fim da duração e retorna {fluxo: {latencias, erros, travadas, rejeitadas}}"""
+    rng = random.Random(semente * 1000003 + indice)
+    conn = abrir_conexao(caminho)
+    if busy_timeout is not None:
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+    try:
+        max_user, max_empresa = conn.execute(
+            "SELECT (SELECT MAX(id) FROM users), (SELECT MAX(id) FROM empresas)"
+        ).fetchone()
+        # Sessões pares são investidores e ímpares empresas, com contas sorteadas
+        if indice % 2 == 0:
+            conta_id = rng.randint(1, max_user)
+            sessao = Sessao(conn, rng, conta_id, "user", f"investidor{conta_id}@exemplo.com", max_user, max_empresa)
+        else:
+            conta_id = rng.randint(1, max_empresa)
+            sessao = Sessao(conn, rng, conta_id, "empresa", f"contato{conta_id}@empresa{conta_id}.com.br",
+                            max_user, max_empresa)
+
+        fluxos, pesos = list(mix), list(mix.values())
+        estatisticas = {nome: {"latencias": [], "erros": 0, "travadas": 0, "rejeitadas": 0} for nome in mix}
+        fim = time.perf_counter() + duracao
+        proximo = "login" if "login" in mix else None
+        while time.perf_counter() < fim:
+            nome = proximo or rng.choices(fluxos, pesos)[0]
+            proximo = None
+            estatistica = estatisticas[nome]
+            inicio = time.perf_counter()
+            try:
+                getattr(sessao, nome)()
+            except ErroValidacao:
+                estatistica["rejeitadas"] += 1
+            except sqlite3.OperationalError as e:
+                estatistica["erros"] += 1
+                if "locked" in str(e) or "busy" in str(e):
+                    estatistica["travadas"] += 1
+            except sqlite3.Error:
+                estatistica["erros"] += 1
+            finally:
+                # Mesma regra do ExecutorBanco: nunca deixar uma transação aberta
+                if conn.in_transaction:
+                    conn.rollback()
+            estatistica["latencias"].append((time.perf_counter() - inicio) * 1000)
+        return estatisticas
+    finally:
+        conn.close()
+
+def _executar_sessao(argumentos):
+    return executar_sessao(*argumentos)
+
+def simular(caminho, sessoes, mix, duracao, modo="threads", semente=42, busy_timeout=None):
+    """Roda as sessões em paralelo e retorna (estatísticas somadas por fluxo, duração real em s)"""
+    argumentos = [(i, caminho, mix, duracao, semente, busy_timeout) for i in range(sessoes)]
+    inicio = time.perf_counter()
+    if modo == "processos":
+        with multiprocessing.Pool(sessoes) as pool:
+            resultados = pool.map(_executar_sessao, argumentos)
+    else:
+        with ThreadPoolExecutor(max_workers=sessoes, thread_name_prefix="sessao") as pool:
+            resultados = list(pool.map(_executar_sessao, argumentos))
+    decorrido = time.perf_counter() - inicio
+
+    total = {nome: {"latencias": [], "erros": 0, "travadas": 0, "rejeitadas": 0} for nome in mix}
+    for resultado in resultados:
+        for nome, estatistica in resultado.items():
+            total[nome]["latencias"].extend(estatistica["latencias"])
+            for campo in ("erros", "travadas", "rejeitadas"):
+                total[nome][campo] += estatistica[campo]
+    return total, decorrido
+
+def imprimir(total, decorrido):
+    print(f"{'fluxo':<12}{'ops':>8}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'erros':>7}{'locked':>8}{'% locked':>9}{'rejeitadas':>11}")
+    geral = {"ops": 0, "erros": 0, "travadas": 0, "rejeitadas": 0}
+    for nome, estatistica in total.items():
+        latencias = sorted(estatistica["latencias"])
+        ops = len(latencias)
+        geral["ops"] += ops
+        for campo in ("erros", "travadas", "rejeitadas"):
+            geral[campo] += estatistica[campo]
+        if not ops:
+            print(f"{nome:<12}{0:>8}")
+            continue
+        print(f"{nome:<12}{ops:>8}{ops / decorrido:>9.1f}{percentil(latencias, 50):>9.2f}"
+              f"{percentil(latencias, 95):>9.2f}{percentil(latencias, 99):>9.2f}"
+              f"{estatistica['erros']:>7}{estatistica['travadas']:>8}{estatistica['travadas'] / ops:>9.2%}"
+              f"{estatistica['rejeitadas']:>11}")
+    ops = geral["ops"]
+    print(f"Total: {ops} operações em {decorrido:.1f} s ({ops / decorrido:.1f} ops/s), "
+          f"{geral['erros']} erros, {geral['travadas']} 'database is locked' "
+          f"({geral['travadas'] / ops if ops else 0:.2%}), {geral['rejeitadas']} rejeitadas pela validação")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de carga com várias sessões concorrentes")
+    argumentos_escala(parser)
+    parser.add_argument("--sessoes", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=10, help="segundos de carga por sessão")
+    parser.add_argument("--modo", choices=["threads", "processos"], default="threads")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in MIX_PADRAO.items()),
+                        help="pesos dos fluxos, ex.: busca=5,mensagem=2 (padrão: %(default)s)")
+    parser.add_argument("--busy-timeout", type=int, help="busy_timeout em ms (padrão: o de abrir_conexao)")
+    parser.add_argument("--no-lugar", action="store_true",
+                        help="escreve direto no banco informado, em vez de numa cópia descartável")
+    args = parser.parse_args()
+
+    origem = preparar_banco(args)
+    caminho = origem
+    if not args.no_lugar:
+        # A carga escreve no banco: trabalhar numa cópia mantém o banco do benchmark intacto
+        caminho = os.path.splitext(origem)[0] + "_carga.db"
+        # O with de uma conexão só encerra a transação; closing() fecha os arquivos
+        with contextlib.closing(sqlite3.connect(origem)) as fonte, \
+                contextlib.closing(sqlite3.connect(caminho)) as destino:
+            fonte.backup(destino)
+
+    mix = interpretar_mix(args.mix)
+    print(f"{args.sessoes} sessões ({args.modo}) por {args.duracao:g} s em {caminho}")
+    total, decorrido = simular(caminho, args.sessoes, mix, args.duracao, args.modo, args.semente, args.busy_timeout)
+    imprimir(total, decorrido)
+
+if __name__ == "__main__":
+    main()
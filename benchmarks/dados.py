@@ -0,0 +1,236 @@
+"""Gerador de bancos sintéticos com o esquema atual
+
+O conteúdo depende só dos parâmetros e da semente: a mesma chamada gera sempre o
+mesmo banco, então tempos medidos em máquinas ou versões diferentes são comparáveis.
+As inserções passam pelos gatilhos das migrações (FTS, contadores, contas e
+conversas), como acontece em produção.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from boss_bridge.banco import MIGRACOES, abrir_conexao, aplicar_migracoes
+from boss_bridge.seguranca import gerar_hash_senha
+from boss_bridge.servicos.contas import digitos_verificadores_cnpj
+
+# Senha de todas as contas geradas; o benchmark de login autentica com ela
+SENHA_PADRAO = "senha123"
+
+# Linhas por chamada de executemany
+LOTE = 10000
+
+# Datas são geradas a partir de um instante fixo para não depender do relógio
+DATA_REFERENCIA = datetime.datetime(2024, 1, 1)
+
+PRENOMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+    "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vitória", "William",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+]
+RAIZES_EMPRESA = [
+    "Agro", "Bio", "Tech", "Nova", "Prime", "Solar", "Verde", "Alfa", "Delta", "Mega",
+    "Inova", "Rede", "Vale", "Norte", "Sul", "Logi", "Data", "Fin", "Med", "Eco",
+]
+SUFIXOS_EMPRESA = [
+    "Soluções", "Sistemas", "Capital", "Energia", "Alimentos", "Logística",
+    "Consultoria", "Saúde", "Digital", "Engenharia", "Investimentos", "Comércio",
+]
+CIDADES = [
+    ("São Paulo", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"), ("Curitiba", "PR"),
+    ("Porto Alegre", "RS"), ("Salvador", "BA"), ("Recife", "PE"), ("Fortaleza", "CE"),
+    ("Brasília", "DF"), ("Goiânia", "GO"), ("Manaus", "AM"), ("Florianópolis", "SC"),
+]
+GENEROS = ["Masculino", "Feminino", "Outro"]
+STATUS_CONEXAO = ["aceita", "pendente", "recusada"]
+PESOS_STATUS = [60, 25, 15]
+FRASES = [
+    "Olá, tudo bem?", "Podemos marcar uma reunião?", "Segue o material da apresentação.",
+    "Qual o valor mínimo do aporte?", "Obrigado pelo retorno!", "Vou analisar e te respondo.",
+    "Temos interesse em conhecer melhor o projeto.", "Pode enviar o plano de negócios?",
+]
+
+def caminho_padrao(empresas, usuarios_por_empresa, conexoes_por_usuario, mensagens_por_conexao, semente):
+    """Arquivo do banco para os parâmetros; bancos já gerados são reaproveitados
+
+    A versão do esquema faz parte do nome: um banco gerado antes de uma migração nova
+    não é reaproveitado, e a medição sempre parte do mesmo banco que uma geração nova.
+    """
+    nome = (f"boss_bridge_e{empresas}_u{usuarios_por_empresa:g}_c{conexoes_por_usuario:g}"
+            f"_m{mensagens_por_conexao:g}_s{semente}_v{MIGRACOES[-1][0]}.db")
+    return os.path.join(tempfile.gettempdir(), nome)
+
+def gerar_cnpj(numero):
+    """CNPJ de 14 dígitos com dígitos verificadores válidos, derivado de um número sequencial"""
+    base = f"{numero:08d}0001"
+    return base + digitos_verificadores_cnpj(base)
+
+def _data(rng, dias_atras):
+    instante = DATA_REFERENCIA - datetime.timedelta(seconds=rng.randrange(dias_atras * 86400))
+    return instante.strftime("%Y-%m-%d %H:%M:%S")
+
+def _empresas(rng, quantidade, senha):
+    for i in range(1, quantidade + 1):
+        nome = f"{rng.choice(RAIZES_EMPRESA)}{rng.choice(RAIZES_EMPRESA).lower()} {rng.choice(SUFIXOS_EMPRESA)}"
+        cidade, estado = rng.choice(CIDADES)
+        yield (
+            gerar_cnpj(i), nome, f"{nome} {i} Ltda", f"Rua {rng.choice(SOBRENOMES)}", str(rng.randint(1, 3000)),
+            "", cidade, estado, f"{rng.randint(10000, 99999)}-{rng.randint(0, 999):03d}",
+            f"contato{i}@empresa{i}.com.br", senha, _data(rng, 730),
+        )
+
+def _usuarios(rng, quantidade, senha):
+    for i in range(1, quantidade + 1):
+        nome = f"{rng.choice(PRENOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+        yield (
+            nome, f"investidor{i}@exemplo.com", rng.choice(GENEROS), senha,
+            f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}", _data(rng, 730),
+        )
+
+def _conexoes(rng, usuarios, empresas, media):
+    for user_id in range(1, usuarios + 1):
+        quantidade = min(rng.randint(0, 2 * media), empresas)
+        for empresa_id in rng.sample(range(1, empresas + 1), quantidade):
+            status = rng.choices(STATUS_CONEXAO, PESOS_STATUS)[0]
+            yield user_id, empresa_id, _data(rng, 365), status
+
+def _mensagens(rng, conversas, media):
+    for conversa_id, user_id, empresa_id, data_conexao in conversas:
+        quantidade = rng.randint(0, 2 * media)
+        instante = datetime.datetime.strptime(data_conexao, "%Y-%m-%d %H:%M:%S")
+        for n in range(quantidade):
+            instante += datetime.timedelta(minutes=rng.randint(1, 600))
+            lida = int(n < quantidade - 2)  # as duas últimas de cada conversa ficam sem ler
+            if rng.random() < 0.5:
+                partes = (user_id, "user", empresa_id, "empresa")
+            else:
+                partes = (empresa_id, "empresa", user_id, "user")
+            yield (conversa_id, *partes, rng.choice(FRASES), instante.strftime("%Y-%m-%d %H:%M:%S"), lida)
+
+def _inserir(conn, sql, linhas, tabela, progresso):
+    inicio = time.perf_counter()
+    total = 0
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) == LOTE:
+            conn.executemany(sql, lote)
+            total += len(lote)
+            lote.clear()
+    if lote:
+        conn.executemany(sql, lote)
+        total += len(lote)
+    conn.commit()
+    duracao = time.perf_counter() - inicio
+    progresso(f"{tabela}: {total} linhas em {duracao:.1f} s ({total / duracao if duracao else 0:.0f} linhas/s)")
+    return total
+
+def gerar_banco(caminho, empresas, usuarios_por_empresa=1.0, conexoes_por_usuario=3,
+                mensagens_por_conexao=6, semente=42, progresso=print):
+    """Cria o banco em `caminho` (substituindo o existente) e retorna a quantidade de linhas por tabela"""
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+
+    rng = random.Random(semente)
+    usuarios = int(empresas * usuarios_por_empresa)
+    senha = gerar_hash_senha(SENHA_PADRAO)  # um único scrypt para todas as contas
+
+    conn = sqlite3.connect(caminho)
+    try:
+        # Carga inicial sem journal; o banco só passa a valer ao final
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+        aplicar_migracoes(conn)
+
+        contagem = {}
+        contagem["empresas"] = _inserir(conn, """INSERT INTO empresas
+            (cnpj, nome_empresa, razao_social, logradouro, numero_endereco, complemento,
+             cidade, estado, cep, email, senha, data_criacao)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            _empresas(rng, empresas, senha), "empresas", progresso)
+        contagem["users"] = _inserir(conn, """INSERT INTO users
+            (nome, email, genero, senha, numero, data_criacao) VALUES (?, ?, ?, ?, ?, ?)""",
+            _usuarios(rng, usuarios, senha), "users", progresso)
+        contagem["conexoes"] = _inserir(conn, """INSERT INTO conexoes
+            (user_id, empresa_id, data_conexao, status) VALUES (?, ?, ?, ?)""",
+            _conexoes(rng, usuarios, empresas, conexoes_por_usuario), "conexoes", progresso)
+
+        # Conversas foram criadas pelos gatilhos das conexões aceitas
+        conversas = conn.execute("""
+            SELECT cv.id, cv.user_id, cv.empresa_id, c.data_conexao
+            FROM conversas cv JOIN conexoes c ON c.user_id = cv.user_id AND c.empresa_id = cv.empresa_id
+            ORDER BY cv.id
+        """).fetchall()
+        contagem["mensagens"] = _inserir(conn, """INSERT INTO mensagens
+            (conversa_id, remetente_id, tipo_remetente, destinatario_id, tipo_destinatario,
+             mensagem, data_envio, lida) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            _mensagens(rng, conversas, mensagens_por_conexao), "mensagens", progresso)
+
+        # Notificações das solicitações e das respostas, como criar_conexao e responder_conexao fariam
+        inicio = time.perf_counter()
+        conn.execute("""
+            INSERT INTO notificacoes (usuario_id, tipo_usuario, titulo, mensagem, data_notificacao, lida)
+            SELECT empresa_id, 'empresa', 'Nova solicitação de conexão',
+                   'Um investidor deseja se conectar com sua empresa', data_conexao, status != 'pendente'
+            FROM conexoes ORDER BY id
+        """)
+        conn.execute("""
+            INSERT INTO notificacoes (usuario_id, tipo_usuario, titulo, mensagem, data_notificacao, lida)
+            SELECT user_id, 'user', 'Solicitação de conexão respondida',
+                   'Sua solicitação de conexão foi ' || status, data_conexao, id % 3 != 0
+            FROM conexoes WHERE status != 'pendente' ORDER BY id
+        """)
+        conn.commit()
+        contagem["notificacoes"] = conn.execute("SELECT COUNT(*) FROM notificacoes").fetchone()[0]
+        progresso(f"notificacoes: {contagem['notificacoes']} linhas em {time.perf_counter() - inicio:.1f} s")
+
+        conn.execute("PRAGMA journal_mode = WAL")
+        return contagem
+    finally:
+        conn.close()
+
+def argumentos_escala(parser):
+    """Opções que definem o banco gerado, compartilhadas com o executor do benchmark"""
+    parser.add_argument("--empresas", type=int, default=10000, help="quantidade de empresas (padrão: 10000)")
+    parser.add_argument("--usuarios-por-empresa", type=float, default=1.0)
+    parser.add_argument("--conexoes-por-usuario", type=int, default=3,
+                        help="média de conexões por investidor")
+    parser.add_argument("--mensagens-por-conexao", type=int, default=6,
+                        help="média de mensagens por conexão aceita")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--banco", help="arquivo do banco (padrão: um arquivo por escala no diretório temporário)")
+
+def preparar_banco(args, regerar=False, progresso=print):
+    """Retorna o caminho do banco descrito pelos argumentos, gerando-o se ainda não existe"""
+    caminho = args.banco or caminho_padrao(
+        args.empresas, args.usuarios_por_empresa, args.conexoes_por_usuario, args.mensagens_por_conexao, args.semente
+    )
+    if regerar or not os.path.exists(caminho):
+        progresso(f"Gerando {caminho}")
+        gerar_banco(
+            caminho, args.empresas, args.usuarios_por_empresa, args.conexoes_por_usuario,
+            args.mensagens_por_conexao, args.semente, progresso
+        )
+    else:
+        # Um banco informado com --banco pode ter qualquer versão: mede-se sempre o esquema atual
+        conn = abrir_conexao(caminho)
+        try:
+            aplicar_migracoes(conn)
+        finally:
+            conn.close()
+    return caminho
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um banco sintético do Boss Bridge")
+    argumentos_escala(parser)
+    args = parser.parse_args()
+    print("Banco gerado em:", preparar_banco(args, regerar=True))
@@ -0,0 +1,197 @@
+"""Mede a latência dos caminhos críticos e compara com a referência gravada
+
+Cada caminho chama o mesmo serviço que a interface usa, com a conexão configurada por
+abrir_conexao, sobre entradas sorteadas pela semente. O resultado é p50/p95/p99 em
+milissegundos; um p95 acima da referência além da tolerância é marcado como regressão
+e o processo termina com código 1.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+from benchmarks.dados import PRENOMES, RAIZES_EMPRESA, SENHA_PADRAO, argumentos_escala, preparar_banco
+from boss_bridge.banco import abrir_conexao
+from boss_bridge.cache import CacheBusca
+from boss_bridge.servicos.contas import autenticar, buscar_credenciais
+from boss_bridge.servicos.diretorio import buscar_contas
+from boss_bridge.servicos.mensagens import listar_conversas, listar_mensagens
+from boss_bridge.servicos.notificacoes import consultar_dashboard
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Mesmo tamanho de página das listas da interface
+PAGINA = 50
+
+# Diferenças abaixo disso (em ms) são ruído de medição, não regressão
+PISO_REGRESSAO_MS = 0.05
+
+def percentil(valores_ordenados, p):
+    """Percentil pelo método do posto mais próximo"""
+    indice = max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)
+    return valores_ordenados[indice]
+
+def medir(funcao, entradas, aquecimento):
+    """Executa funcao(*entrada) para cada entrada e retorna as durações em ms, já ordenadas"""
+    for entrada in entradas[:aquecimento]:
+        funcao(*entrada)
+    duracoes = []
+    for entrada in entradas:
+        inicio = time.perf_counter()
+        funcao(*entrada)
+        duracoes.append((time.perf_counter() - inicio) * 1000)
+    duracoes.sort()
+    return duracoes
+
+def buscar_com_cache(cache, conn, tipo_conta, termo):
+    """Primeira página da busca passando pelo cache, como a lista de resultados da interface"""
+    chave = (tipo_conta, termo, 0, PAGINA)
+    linhas = cache.obter(chave)
+    if linhas is None:
+        geracao = cache.geracao
+        linhas = buscar_contas(conn, tipo_conta, termo, 0, PAGINA)
+        cache.guardar(chave, linhas, geracao)
+    return linhas
+
+def caminhos(conn, rng, iteracoes, iteracoes_login, cache):
+    """Retorna [(nome, função, entradas)] dos caminhos medidos"""
+    max_user, max_empresa, max_conversa = conn.execute(
+        "SELECT (SELECT MAX(id) FROM users), (SELECT MAX(id) FROM empresas), (SELECT MAX(id) FROM conversas)"
+    ).fetchone()
+
+    def conta():
+        if rng.random() < 0.5:
+            return rng.randint(1, max_user), "user"
+        return rng.randint(1, max_empresa), "empresa"
+
+    def termo_empresa():
+        termo = rng.choice(RAIZES_EMPRESA).lower()[:rng.randint(2, 4)]
+        if rng.random() < 0.3:
+            termo += " " + rng.choice(RAIZES_EMPRESA).lower()[:3]
+        return termo
+
+    def email():
+        if rng.random() < 0.5:
+            return f"investidor{rng.randint(1, max_user)}@exemplo.com"
+        n = rng.randint(1, max_empresa)
+        return f"contato{n}@empresa{n}.com.br"
+
+    return [
+        ("busca_empresas", lambda termo: buscar_contas(conn, "user", termo, 0, PAGINA),
+         [(termo_empresa(),) for _ in range(iteracoes)]),
+        ("busca_investidores", lambda termo: buscar_contas(conn, "empresa", termo, 0, PAGINA),
+         [(rng.choice(PRENOMES).lower()[:rng.randint(2, 5)],) for _ in range(iteracoes)]),
+        ("dashboard", lambda conta_id, tipo: consultar_dashboard(conn, conta_id, tipo),
+         [conta() for _ in range(iteracoes)]),
+        ("conversas", lambda conta_id, tipo: listar_conversas(conn, conta_id, tipo, 0, PAGINA),
+         [conta() for _ in range(iteracoes)]),
+        ("historico_chat", lambda conversa_id: listar_mensagens(conn, conversa_id, None, PAGINA),
+         [(rng.randint(1, max_conversa or 1),) for _ in range(iteracoes)]),
+        ("credenciais", lambda endereco: buscar_credenciais(conn, endereco),
+         [(email(),) for _ in range(iteracoes)]),
+        # Login completo: dominado pelo scrypt, por isso com menos repetições
+        ("login", lambda endereco: autenticar(conn, endereco, SENHA_PADRAO),
+         [(email(),) for _ in range(iteracoes_login)]),
+        # Busca com cache: termos repetidos, como quem refaz ou volta a uma busca
+        ("busca_cache", lambda termo: buscar_com_cache(cache, conn, "user", termo),
+         [(termo,) for termos in [[termo_empresa() for _ in range(max(1, iteracoes // 10))]]
+          for termo in rng.choices(termos, k=iteracoes)]),
+    ]
+
+def executar(caminho_banco, iteracoes=500, iteracoes_login=20, aquecimento=20, semente=42):
+    """Mede todos os caminhos e retorna ({nome: {"n", "p50", "p95", "p99"}}, o CacheBusca da busca com cache)"""
+    rng = random.Random(semente)
+    conn = abrir_conexao(caminho_banco)
+    cache = CacheBusca()
+    try:
+        resultados = {}
+        for nome, funcao, entradas in caminhos(conn, rng, iteracoes, iteracoes_login, cache):
+            duracoes = medir(funcao, entradas, aquecimento)
+            resultados[nome] = {
+                "n": len(duracoes),
+                "p50": round(percentil(duracoes, 50), 4),
+                "p95": round(percentil(duracoes, 95), 4),
+                "p99": round(percentil(duracoes, 99), 4),
+            }
+        return resultados, cache
+    finally:
+        conn.close()
+
+def comparar(resultados, referencia, tolerancia):
+    """Retorna {nome: variação relativa do p95} e a lista de caminhos que regrediram"""
+    variacoes, regressoes = {}, []
+    for nome, medida in resultados.items():
+        anterior = referencia.get(nome)
+        if not anterior:
+            continue
+        variacoes[nome] = (medida["p95"] - anterior["p95"]) / anterior["p95"] if anterior["p95"] else 0.0
+        if medida["p95"] > anterior["p95"] * (1 + tolerancia) and medida["p95"] - anterior["p95"] > PISO_REGRESSAO_MS:
+            regressoes.append(nome)
+    return variacoes, regressoes
+
+def imprimir(resultados, referencia, variacoes, regressoes):
+    print(f"{'caminho':<20}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ref p95':>10}{'variação':>10}")
+    for nome, medida in resultados.items():
+        anterior = referencia.get(nome, {}).get("p95")
+        linha = (f"{nome:<20}{medida['n']:>6}{medida['p50']:>10.3f}{medida['p95']:>10.3f}{medida['p99']:>10.3f}"
+                 + (f"{anterior:>10.3f}" if anterior is not None else f"{'-':>10}"))
+        if nome in variacoes:
+            linha += f"{variacoes[nome]:>+10.0%}"
+        if nome in regressoes:
+            linha += "  REGRESSÃO"
+        print(linha)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos críticos do Boss Bridge")
+    argumentos_escala(parser)
+    parser.add_argument("--iteracoes", type=int, default=500)
+    parser.add_argument("--iteracoes-login", type=int, default=20)
+    parser.add_argument("--aquecimento", type=int, default=20)
+    parser.add_argument("--regerar", action="store_true", help="gera o banco mesmo que já exista")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO, help="arquivo JSON da referência")
+    parser.add_argument("--gravar-baseline", action="store_true", help="grava os resultados como nova referência")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="aumento de p95 aceito (padrão: 0.25)")
+    parser.add_argument("--saida", help="grava os resultados desta execução em JSON")
+    args = parser.parse_args()
+
+    caminho = preparar_banco(args, regerar=args.regerar)
+    escala = {
+        "empresas": args.empresas, "usuarios_por_empresa": args.usuarios_por_empresa,
+        "conexoes_por_usuario": args.conexoes_por_usuario, "mensagens_por_conexao": args.mensagens_por_conexao,
+        "semente": args.semente,
+    }
+    resultados, cache = executar(caminho, args.iteracoes, args.iteracoes_login, args.aquecimento, args.semente)
+    documento = {"escala": escala, "resultados": resultados, "cache_busca": cache.estatisticas()}
+
+    referencia = {}
+    if os.path.exists(args.baseline) and not args.gravar_baseline:
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            gravado = json.load(arquivo)
+        # Só faz sentido comparar medições sobre o mesmo banco
+        if gravado.get("escala") == escala:
+            referencia = gravado["resultados"]
+        else:
+            print(f"Aviso: a referência em {args.baseline} foi medida em outra escala; comparação ignorada")
+
+    variacoes, regressoes = comparar(resultados, referencia, args.tolerancia)
+    imprimir(resultados, referencia, variacoes, regressoes)
+    print(cache.resumo())
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(documento, arquivo, indent=2, ensure_ascii=False)
+    if args.gravar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as arquivo:
+            json.dump(documento, arquivo, indent=2, ensure_ascii=False)
+        print("Referência gravada em", args.baseline)
+
+    if regressoes:
+        print(f"{len(regressoes)} caminho(s) com regressão: {', '.join(regressoes)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
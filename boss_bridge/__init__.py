@@ -0,0 +1,11 @@
+"""Núcleo do Boss Bridge, sem interface gráfica
+
+Banco de dados, senhas, eventos, cache, manutenção em segundo plano e os serviços de
+contas, diretório, conexões, mensagens, notificações, importação e exportação. A interface (boss_bridge_system.py) é só uma camada de
+exibição sobre estes módulos, que também podem ser usados por scripts e ferramentas;
+os comandos sem janela (importação, exportação, arquivamento) ficam em boss_bridge.cli.
+"""
+
+from boss_bridge.erros import ErroValidacao
+
+__all__ = ["ErroValidacao"]
@@ -0,0 +1,1173 @@
+"""Conexões, esquema (migrações), consultas das telas e o executor de banco"""
+
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, CancelledError
+
+from boss_bridge.erros import ErroValidacao
+
+# Perfil de armazenamento aplicado a toda conexão com o banco
+PRAGMAS_CONEXAO = [
+    "PRAGMA journal_mode = WAL",          # leitores não bloqueiam o escritor
+    "PRAGMA synchronous = NORMAL",        # fsync apenas nos checkpoints do WAL
+    "PRAGMA cache_size = -32000",         # ~32 MB de cache de páginas
+    "PRAGMA mmap_size = 268435456",       # 256 MB mapeados em memória
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA foreign_keys = ON",           # exclusões em cascata (migração 6)
+    "PRAGMA wal_autocheckpoint = 10000",  # reserva caso o checkpoint periódico atrase
+]
+
+# Intervalo (em segundos) entre checkpoints do WAL em segundo plano
+INTERVALO_CHECKPOINT = 30
+
+def caminho_banco():
+    """Retorna o caminho do arquivo do banco de dados da aplicação"""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(raiz, "boss_bridge.db")
+
+def abrir_conexao(caminho=None):
+    """Abre uma conexão com o banco aplicando o perfil de armazenamento"""
+    conn = sqlite3.connect(caminho or caminho_banco(), timeout=5)
+    for pragma in PRAGMAS_CONEXAO:
+        conn.execute(pragma)
+    return conn
+
+def caminho_arquivo(caminho=None):
+    """Retorna o caminho do banco de arquivo (mensagens antigas) ao lado do banco principal"""
+    return os.path.splitext(caminho or caminho_banco())[0] + "_arquivo.db"
+
+def anexar_arquivo(conn, criar=False):
+    """Anexa o banco de arquivo à conexão como `arquivo` e retorna se ele está disponível
+
+    Sem `criar`, um arquivo que ainda não existe não é criado (nada foi arquivado).
+    Deve ser chamada fora de uma transação; anexar de novo não faz nada.
+    """
+    bancos = {nome: arquivo for _, nome, arquivo in conn.execute("PRAGMA database_list")}
+    if "arquivo" in bancos:
+        return True
+    caminho = bancos.get("main")
+    if not caminho:
+        # Banco em memória: não há arquivo ao lado
+        return False
+    caminho = caminho_arquivo(caminho)
+    if not criar and not os.path.exists(caminho):
+        return False
+
+    conn.execute("ATTACH DATABASE ? AS arquivo", (caminho,))
+    for comando in ESQUEMA_ARQUIVO:
+        conn.execute(comando)
+    return True
+
+class CheckpointWAL:
+    """Executa checkpoints do WAL periodicamente em uma thread própria"""
+    
+    def __init__(self, caminho=None, intervalo=INTERVALO_CHECKPOINT):
+        self.caminho = caminho or caminho_banco()
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+    
+    def iniciar(self):
+        """Inicia a thread de checkpoint"""
+        self._thread = threading.Thread(target=self._executar, name="checkpoint-wal", daemon=True)
+        self._thread.start()
+    
+    def parar(self):
+        """Interrompe a thread e aguarda o checkpoint final"""
+        self._parar.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    def _executar(self):
+        conn = abrir_conexao(self.caminho)
+        try:
+            # PASSIVE nunca espera por leitores ou escritores ativos
+            while not self._parar.wait(self.intervalo):
+                try:
+                    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                except sqlite3.Error as e:
+                    print(f"Erro no checkpoint do WAL: {str(e)}")
+            
+            # Ao encerrar, trunca o WAL para não deixar o arquivo crescido em disco
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                print(f"Erro no checkpoint final do WAL: {str(e)}")
+        finally:
+            conn.close()
+
+def _preencher_contas(conn):
+    """Indexa os emails já cadastrados; em emails repetidos vale a primeira conta (investidores antes)"""
+    conn.execute('''
+        INSERT OR IGNORE INTO contas (email_normalizado, tipo_conta, conta_id)
+        SELECT lower(trim(email)), 'user', id FROM users ORDER BY id
+    ''')
+    conn.execute('''
+        INSERT OR IGNORE INTO contas (email_normalizado, tipo_conta, conta_id)
+        SELECT lower(trim(email)), 'empresa', id FROM empresas ORDER BY id
+    ''')
+    repetidos = conn.execute('''
+        SELECT (SELECT COUNT(*) FROM users) + (SELECT COUNT(*) FROM empresas) - COUNT(*) FROM contas
+    ''').fetchone()[0]
+    if repetidos:
+        print(f"Aviso: {repetidos} conta(s) com email repetido ficaram fora do índice de login")
+
+def _recriar_tabela(tabela, definicao):
+    """Comando de migração que recria a tabela com outra definição, mantendo linhas, ids, índices e gatilhos
+
+    É o procedimento do SQLite para o que o ALTER TABLE não faz, como trocar chaves
+    estrangeiras; exige PRAGMA foreign_keys desligado, o que aplicar_migracoes garante.
+    """
+    def recriar(conn):
+        objetos = [sql for (sql,) in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+            (tabela,)
+        )]
+        colunas = ", ".join(linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})"))
+        sequencia = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tabela,)).fetchone()
+        
+        conn.execute(f"CREATE TABLE {tabela}_nova ({definicao})")
+        conn.execute(f"INSERT INTO {tabela}_nova ({colunas}) SELECT {colunas} FROM {tabela}")
+        conn.execute(f"DROP TABLE {tabela}")
+        # Gatilhos de outras tabelas citam esta pelo nome; no modo legado o RENAME não os revalida
+        conn.execute("PRAGMA legacy_alter_table = ON")
+        try:
+            conn.execute(f"ALTER TABLE {tabela}_nova RENAME TO {tabela}")
+        finally:
+            conn.execute("PRAGMA legacy_alter_table = OFF")
+        for sql in objetos:
+            conn.execute(sql)
+        
+        # Ids de linhas já excluídas não voltam a ser usados
+        if sequencia:
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (tabela,))
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (tabela, sequencia[0]))
+    return recriar
+
+def _normalizar_cnpjs(conn):
+    """Grava os CNPJs só com dígitos; os inválidos e os que repetiriam outro vão para cnpjs_conflitantes
+
+    Num CNPJ repetido fica com o número a empresa que já o tinha só com dígitos ou, se
+    nenhuma, a mais antiga; as demais mantêm o valor original até o operador resolver.
+    """
+    # Importada aqui: o serviço de contas depende deste módulo
+    from boss_bridge.servicos.contas import normalizar_cnpj
+
+    pendentes = []
+    for empresa_id, cnpj in conn.execute("SELECT id, cnpj FROM empresas ORDER BY id").fetchall():
+        try:
+            normalizado = normalizar_cnpj(str(cnpj))
+        except ErroValidacao:
+            conn.execute("INSERT INTO cnpjs_conflitantes (empresa_id, cnpj) VALUES (?, ?)", (empresa_id, cnpj))
+            continue
+        if normalizado != cnpj:
+            pendentes.append((empresa_id, cnpj, normalizado))
+
+    for empresa_id, cnpj, normalizado in pendentes:
+        if conn.execute("SELECT 1 FROM empresas WHERE cnpj = ?", (normalizado,)).fetchone():
+            conn.execute(
+                "INSERT INTO cnpjs_conflitantes (empresa_id, cnpj, cnpj_normalizado) VALUES (?, ?, ?)",
+                (empresa_id, cnpj, normalizado)
+            )
+        else:
+            conn.execute("UPDATE empresas SET cnpj = ? WHERE id = ?", (normalizado, empresa_id))
+
+def _conta_ativa(tipo_conta, conta_id):
+    """Condição SQL: a conta não está marcada como excluída (uma conta já removida conta como ativa)"""
+    return f"""(NOT EXISTS (SELECT 1 FROM users WHERE {tipo_conta} = 'user' AND id = {conta_id} AND excluida_em IS NOT NULL)
+            AND NOT EXISTS (SELECT 1 FROM empresas WHERE {tipo_conta} = 'empresa' AND id = {conta_id} AND excluida_em IS NOT NULL))"""
+
+def _contadores_da_exclusao(tabela, tipo_conta):
+    """Gatilhos que tiram (ou devolvem) das outras partes as conexões e mensagens da conta marcada como excluída
+
+    Antes de remover uma conta marcada, os totais são devolvidos: as cascatas rodam com a
+    conta já removida, que conta como ativa, e os descontam de novo linha a linha.
+    """
+    coluna, outra_coluna, outro_tipo = (("user_id", "empresa_id", "empresa") if tipo_conta == "user"
+                                        else ("empresa_id", "user_id", "user"))
+
+    def ajustar(linha, sinal):
+        return f'''
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas + {sinal}
+                WHERE tipo_conta = '{outro_tipo}' AND conta_id IN (
+                    SELECT {outra_coluna} FROM conexoes WHERE {coluna} = {linha}.id AND status = 'aceita'
+                );
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas + {sinal} * (
+                    SELECT COUNT(*) FROM mensagens
+                    WHERE remetente_id = {linha}.id AND tipo_remetente = '{tipo_conta}'
+                      AND destinatario_id = contadores.conta_id AND tipo_destinatario = contadores.tipo_conta
+                      AND lida = 0
+                )
+                WHERE (tipo_conta, conta_id) IN (
+                    SELECT tipo_destinatario, destinatario_id FROM mensagens
+                    WHERE remetente_id = {linha}.id AND tipo_remetente = '{tipo_conta}' AND lida = 0
+                );'''
+
+    return [
+        f'''
+            CREATE TRIGGER IF NOT EXISTS {tabela}_contadores_exclusao_au AFTER UPDATE OF excluida_em ON {tabela}
+            WHEN (old.excluida_em IS NULL) != (new.excluida_em IS NULL) BEGIN{
+                ajustar("new", "(CASE WHEN new.excluida_em IS NULL THEN 1 ELSE -1 END)")}
+            END
+        ''',
+        f'''
+            CREATE TRIGGER IF NOT EXISTS {tabela}_contadores_exclusao_bd BEFORE DELETE ON {tabela}
+            WHEN old.excluida_em IS NOT NULL BEGIN{ajustar("old", "1")}
+            END
+        ''',
+    ]
+
+def _verificar_chaves_estrangeiras(conn):
+    """Interrompe a migração se alguma linha ficou apontando para um registro inexistente"""
+    falhas = conn.execute("PRAGMA foreign_key_check").fetchall()
+    if falhas:
+        tabela, linha, pai, _ = falhas[0]
+        raise sqlite3.IntegrityError(
+            f"{len(falhas)} referência(s) inválida(s), a primeira em {tabela} (rowid {linha}) para {pai}"
+        )
+
+# Migrações do esquema, em ordem. A versão aplicada fica em PRAGMA user_version.
+# Cada migração é (versão, descrição, comandos); um comando pode ser SQL ou uma
+# função que recebe a conexão. Migrações já publicadas nunca devem ser alteradas.
+MIGRACOES = [
+    (1, "Esquema inicial com índices secundários", [
+        # Tabela de usuários (investidores)
+        '''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                genero TEXT,
+                senha TEXT NOT NULL,
+                numero TEXT,
+                imagem_perfil TEXT,
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''',
+        # Tabela de empresas
+        '''
+            CREATE TABLE IF NOT EXISTS empresas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cnpj TEXT UNIQUE NOT NULL,
+                nome_empresa TEXT NOT NULL,
+                razao_social TEXT NOT NULL,
+                logradouro TEXT,
+                numero_endereco TEXT,
+                complemento TEXT,
+                cidade TEXT,
+                estado TEXT,
+                cep TEXT,
+                email TEXT UNIQUE NOT NULL,
+                senha TEXT NOT NULL,
+                imagem_perfil TEXT,
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''',
+        # Tabela de conexões entre usuários and empresas
+        '''
+            CREATE TABLE IF NOT EXISTS conexoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                empresa_id INTEGER,
+                data_conexao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                status TEXT DEFAULT 'pendente',
+                FOREIGN KEY (user_id) REFERENCES users (id),
+                FOREIGN KEY (empresa_id) REFERENCES empresas (id)
+            )
+        ''',
+        # Tabela de mensagens
+        '''
+            CREATE TABLE IF NOT EXISTS mensagens (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                remetente_id INTEGER,
+                destinatario_id INTEGER,
+                tipo_remetente TEXT,
+                tipo_destinatario TEXT,
+                mensagem TEXT,
+                data_envio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                lida INTEGER DEFAULT 0
+            )
+        ''',
+        # Tabela de notificações
+        '''
+            CREATE TABLE IF NOT EXISTS notificacoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                usuario_id INTEGER,
+                tipo_usuario TEXT,
+                titulo TEXT,
+                mensagem TEXT,
+                data_notificacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                lida INTEGER DEFAULT 0
+            )
+        ''',
+        # Índices para os filtros do dashboard, da busca e das conversas
+        "CREATE INDEX IF NOT EXISTS idx_conexoes_user_status ON conexoes (user_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_conexoes_empresa_status ON conexoes (empresa_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_mensagens_destinatario ON mensagens (destinatario_id, tipo_destinatario, lida)",
+        "CREATE INDEX IF NOT EXISTS idx_mensagens_par ON mensagens (remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, data_envio)",
+        "CREATE INDEX IF NOT EXISTS idx_notificacoes_usuario ON notificacoes (usuario_id, tipo_usuario, lida)",
+    ]),
+    (2, "Índices de texto completo (FTS5) para a busca", [
+        # Índices externos: o texto fica nas tabelas originais, o FTS guarda só os tokens
+        '''
+            CREATE VIRTUAL TABLE IF NOT EXISTS empresas_fts USING fts5(
+                nome_empresa, razao_social, email,
+                content='empresas', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''',
+        '''
+            CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+                nome, email,
+                content='users', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''',
+        # Gatilhos que mantêm os índices sincronizados
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_fts_ai AFTER INSERT ON empresas BEGIN
+                INSERT INTO empresas_fts (rowid, nome_empresa, razao_social, email)
+                VALUES (new.id, new.nome_empresa, new.razao_social, new.email);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_fts_ad AFTER DELETE ON empresas BEGIN
+                INSERT INTO empresas_fts (empresas_fts, rowid, nome_empresa, razao_social, email)
+                VALUES ('delete', old.id, old.nome_empresa, old.razao_social, old.email);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_fts_au AFTER UPDATE OF nome_empresa, razao_social, email ON empresas BEGIN
+                INSERT INTO empresas_fts (empresas_fts, rowid, nome_empresa, razao_social, email)
+                VALUES ('delete', old.id, old.nome_empresa, old.razao_social, old.email);
+                INSERT INTO empresas_fts (rowid, nome_empresa, razao_social, email)
+                VALUES (new.id, new.nome_empresa, new.razao_social, new.email);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+                INSERT INTO users_fts (rowid, nome, email) VALUES (new.id, new.nome, new.email);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+                INSERT INTO users_fts (users_fts, rowid, nome, email) VALUES ('delete', old.id, old.nome, old.email);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF nome, email ON users BEGIN
+                INSERT INTO users_fts (users_fts, rowid, nome, email) VALUES ('delete', old.id, old.nome, old.email);
+                INSERT INTO users_fts (rowid, nome, email) VALUES (new.id, new.nome, new.email);
+            END
+        ''',
+        # Indexar as contas já existentes
+        "INSERT INTO empresas_fts (empresas_fts) VALUES ('rebuild')",
+        "INSERT INTO users_fts (users_fts) VALUES ('rebuild')",
+    ]),
+    (3, "Contadores do dashboard mantidos por gatilhos", [
+        # Uma linha por conta com os totais exibidos no dashboard
+        '''
+            CREATE TABLE IF NOT EXISTS contadores (
+                tipo_conta TEXT NOT NULL,
+                conta_id INTEGER NOT NULL,
+                conexoes_ativas INTEGER NOT NULL DEFAULT 0,
+                mensagens_nao_lidas INTEGER NOT NULL DEFAULT 0,
+                notificacoes_nao_lidas INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (tipo_conta, conta_id)
+            ) WITHOUT ROWID
+        ''',
+        # A linha nasce e morre com a conta
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_contadores_ai AFTER INSERT ON users BEGIN
+                INSERT INTO contadores (tipo_conta, conta_id) VALUES ('user', new.id);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_contadores_ad AFTER DELETE ON users BEGIN
+                DELETE FROM contadores WHERE tipo_conta = 'user' AND conta_id = old.id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_contadores_ai AFTER INSERT ON empresas BEGIN
+                INSERT INTO contadores (tipo_conta, conta_id) VALUES ('empresa', new.id);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_contadores_ad AFTER DELETE ON empresas BEGIN
+                DELETE FROM contadores WHERE tipo_conta = 'empresa' AND conta_id = old.id;
+            END
+        ''',
+        # Conexões aceitas contam para o investidor e para a empresa
+        '''
+            CREATE TRIGGER IF NOT EXISTS conexoes_contadores_ai AFTER INSERT ON conexoes
+            WHEN new.status = 'aceita' BEGIN
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas + 1
+                WHERE (tipo_conta = 'user' AND conta_id = new.user_id)
+                   OR (tipo_conta = 'empresa' AND conta_id = new.empresa_id);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS conexoes_contadores_ad AFTER DELETE ON conexoes
+            WHEN old.status = 'aceita' BEGIN
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas - 1
+                WHERE (tipo_conta = 'user' AND conta_id = old.user_id)
+                   OR (tipo_conta = 'empresa' AND conta_id = old.empresa_id);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS conexoes_contadores_au AFTER UPDATE OF status, user_id, empresa_id ON conexoes BEGIN
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas - 1
+                WHERE old.status = 'aceita'
+                  AND ((tipo_conta = 'user' AND conta_id = old.user_id)
+                    OR (tipo_conta = 'empresa' AND conta_id = old.empresa_id));
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas + 1
+                WHERE new.status = 'aceita'
+                  AND ((tipo_conta = 'user' AND conta_id = new.user_id)
+                    OR (tipo_conta = 'empresa' AND conta_id = new.empresa_id));
+            END
+        ''',
+        # Mensagens não lidas contam para o destinatário
+        '''
+            CREATE TRIGGER IF NOT EXISTS mensagens_contadores_ai AFTER INSERT ON mensagens
+            WHEN new.lida = 0 BEGIN
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas + 1
+                WHERE tipo_conta = new.tipo_destinatario AND conta_id = new.destinatario_id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS mensagens_contadores_ad AFTER DELETE ON mensagens
+            WHEN old.lida = 0 BEGIN
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas - 1
+                WHERE tipo_conta = old.tipo_destinatario AND conta_id = old.destinatario_id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS mensagens_contadores_au AFTER UPDATE OF lida, destinatario_id, tipo_destinatario ON mensagens BEGIN
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas - 1
+                WHERE old.lida = 0 AND tipo_conta = old.tipo_destinatario AND conta_id = old.destinatario_id;
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas + 1
+                WHERE new.lida = 0 AND tipo_conta = new.tipo_destinatario AND conta_id = new.destinatario_id;
+            END
+        ''',
+        # Notificações não lidas contam para o usuário notificado
+        '''
+            CREATE TRIGGER IF NOT EXISTS notificacoes_contadores_ai AFTER INSERT ON notificacoes
+            WHEN new.lida = 0 BEGIN
+                UPDATE contadores SET notificacoes_nao_lidas = notificacoes_nao_lidas + 1
+                WHERE tipo_conta = new.tipo_usuario AND conta_id = new.usuario_id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS notificacoes_contadores_ad AFTER DELETE ON notificacoes
+            WHEN old.lida = 0 BEGIN
+                UPDATE contadores SET notificacoes_nao_lidas = notificacoes_nao_lidas - 1
+                WHERE tipo_conta = old.tipo_usuario AND conta_id = old.usuario_id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS notificacoes_contadores_au AFTER UPDATE OF lida, usuario_id, tipo_usuario ON notificacoes BEGIN
+                UPDATE contadores SET notificacoes_nao_lidas = notificacoes_nao_lidas - 1
+                WHERE old.lida = 0 AND tipo_conta = old.tipo_usuario AND conta_id = old.usuario_id;
+                UPDATE contadores SET notificacoes_nao_lidas = notificacoes_nao_lidas + 1
+                WHERE new.lida = 0 AND tipo_conta = new.tipo_usuario AND conta_id = new.usuario_id;
+            END
+        ''',
+        # Preencher os contadores das contas existentes, uma única vez, pelos índices da migração 1
+        '''
+            INSERT OR REPLACE INTO contadores
+            (tipo_conta, conta_id, conexoes_ativas, mensagens_nao_lidas, notificacoes_nao_lidas)
+            SELECT 'user', u.id,
+                (SELECT COUNT(*) FROM conexoes WHERE user_id = u.id AND status = 'aceita'),
+                (SELECT COUNT(*) FROM mensagens WHERE destinatario_id = u.id AND tipo_destinatario = 'user' AND lida = 0),
+                (SELECT COUNT(*) FROM notificacoes WHERE usuario_id = u.id AND tipo_usuario = 'user' AND lida = 0)
+            FROM users u
+        ''',
+        '''
+            INSERT OR REPLACE INTO contadores
+            (tipo_conta, conta_id, conexoes_ativas, mensagens_nao_lidas, notificacoes_nao_lidas)
+            SELECT 'empresa', e.id,
+                (SELECT COUNT(*) FROM conexoes WHERE empresa_id = e.id AND status = 'aceita'),
+                (SELECT COUNT(*) FROM mensagens WHERE destinatario_id = e.id AND tipo_destinatario = 'empresa' AND lida = 0),
+                (SELECT COUNT(*) FROM notificacoes WHERE usuario_id = e.id AND tipo_usuario = 'empresa' AND lida = 0)
+            FROM empresas e
+        ''',
+    ]),
+    (4, "Conversas com a última mensagem desnormalizada", [
+        # Uma conversa por par investidor-empresa
+        '''
+            CREATE TABLE IF NOT EXISTS conversas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                empresa_id INTEGER NOT NULL,
+                ultima_mensagem TEXT,
+                ultima_data TIMESTAMP,
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (user_id, empresa_id),
+                FOREIGN KEY (user_id) REFERENCES users (id),
+                FOREIGN KEY (empresa_id) REFERENCES empresas (id)
+            )
+        ''',
+        # Listas de conversas de cada lado, da mais recente para a mais antiga
+        "CREATE INDEX IF NOT EXISTS idx_conversas_user_recentes ON conversas (user_id, ultima_data)",
+        "CREATE INDEX IF NOT EXISTS idx_conversas_empresa_recentes ON conversas (empresa_id, ultima_data)",
+        "ALTER TABLE mensagens ADD COLUMN conversa_id INTEGER REFERENCES conversas (id)",
+        "CREATE INDEX IF NOT EXISTS idx_mensagens_conversa ON mensagens (conversa_id, data_envio, id)",
+        # Conexão aceita abre a conversa
+        '''
+            CREATE TRIGGER IF NOT EXISTS conexoes_conversa_ai AFTER INSERT ON conexoes
+            WHEN new.status = 'aceita' BEGIN
+                INSERT OR IGNORE INTO conversas (user_id, empresa_id) VALUES (new.user_id, new.empresa_id);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS conexoes_conversa_au AFTER UPDATE OF status ON conexoes
+            WHEN new.status = 'aceita' BEGIN
+                INSERT OR IGNORE INTO conversas (user_id, empresa_id) VALUES (new.user_id, new.empresa_id);
+            END
+        ''',
+        # Mensagem enviada sem conversa_id é ligada à conversa do par; a conversa guarda a última mensagem
+        '''
+            CREATE TRIGGER IF NOT EXISTS mensagens_conversa_ai AFTER INSERT ON mensagens BEGIN
+                INSERT OR IGNORE INTO conversas (user_id, empresa_id)
+                SELECT CASE new.tipo_remetente WHEN 'user' THEN new.remetente_id ELSE new.destinatario_id END,
+                       CASE new.tipo_remetente WHEN 'user' THEN new.destinatario_id ELSE new.remetente_id END
+                WHERE new.conversa_id IS NULL;
+                UPDATE mensagens SET conversa_id = (
+                    SELECT id FROM conversas
+                    WHERE user_id = CASE new.tipo_remetente WHEN 'user' THEN new.remetente_id ELSE new.destinatario_id END
+                      AND empresa_id = CASE new.tipo_remetente WHEN 'user' THEN new.destinatario_id ELSE new.remetente_id END
+                )
+                WHERE id = new.id AND new.conversa_id IS NULL;
+                UPDATE conversas SET ultima_mensagem = new.mensagem, ultima_data = new.data_envio
+                WHERE id = (SELECT conversa_id FROM mensagens WHERE id = new.id)
+                  AND (ultima_data IS NULL OR ultima_data <= new.data_envio);
+            END
+        ''',
+        # Excluir a última mensagem devolve a conversa à anterior
+        '''
+            CREATE TRIGGER IF NOT EXISTS mensagens_conversa_ad AFTER DELETE ON mensagens BEGIN
+                UPDATE conversas SET (ultima_mensagem, ultima_data) = (
+                    SELECT mensagem, data_envio FROM mensagens
+                    WHERE conversa_id = old.conversa_id
+                    ORDER BY data_envio DESC, id DESC
+                    LIMIT 1
+                )
+                WHERE id = old.conversa_id AND ultima_data = old.data_envio;
+            END
+        ''',
+        # Preencher as conversas a partir das conexões aceitas e das mensagens existentes
+        '''
+            INSERT OR IGNORE INTO conversas (user_id, empresa_id)
+            SELECT user_id, empresa_id FROM conexoes
+            WHERE status = 'aceita' AND user_id IS NOT NULL AND empresa_id IS NOT NULL
+        ''',
+        '''
+            INSERT OR IGNORE INTO conversas (user_id, empresa_id)
+            SELECT DISTINCT
+                CASE tipo_remetente WHEN 'user' THEN remetente_id ELSE destinatario_id END,
+                CASE tipo_remetente WHEN 'user' THEN destinatario_id ELSE remetente_id END
+            FROM mensagens
+            WHERE remetente_id IS NOT NULL AND destinatario_id IS NOT NULL
+              AND tipo_remetente <> tipo_destinatario
+        ''',
+        '''
+            UPDATE mensagens SET conversa_id = (
+                SELECT id FROM conversas
+                WHERE user_id = CASE mensagens.tipo_remetente WHEN 'user' THEN mensagens.remetente_id ELSE mensagens.destinatario_id END
+                  AND empresa_id = CASE mensagens.tipo_remetente WHEN 'user' THEN mensagens.destinatario_id ELSE mensagens.remetente_id END
+            )
+            WHERE conversa_id IS NULL
+        ''',
+        '''
+            UPDATE conversas SET (ultima_mensagem, ultima_data) = (
+                SELECT mensagem, data_envio FROM mensagens
+                WHERE conversa_id = conversas.id
+                ORDER BY data_envio DESC, id DESC
+                LIMIT 1
+            )
+        ''',
+    ]),
+    (5, "Índice único de contas por email normalizado", [
+        # Identidade de login: um email (minúsculo, sem espaços nas pontas) aponta para uma conta
+        '''
+            CREATE TABLE IF NOT EXISTS contas (
+                email_normalizado TEXT PRIMARY KEY,
+                tipo_conta TEXT NOT NULL,
+                conta_id INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''',
+        _preencher_contas,
+        # Gatilhos: um email já usado por qualquer conta faz o INSERT falhar
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_contas_ai AFTER INSERT ON users BEGIN
+                INSERT INTO contas (email_normalizado, tipo_conta, conta_id)
+                VALUES (lower(trim(new.email)), 'user', new.id);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_contas_au AFTER UPDATE OF email ON users BEGIN
+                UPDATE contas SET email_normalizado = lower(trim(new.email))
+                WHERE email_normalizado = lower(trim(old.email)) AND tipo_conta = 'user' AND conta_id = old.id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_contas_ad AFTER DELETE ON users BEGIN
+                DELETE FROM contas
+                WHERE email_normalizado = lower(trim(old.email)) AND tipo_conta = 'user' AND conta_id = old.id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_contas_ai AFTER INSERT ON empresas BEGIN
+                INSERT INTO contas (email_normalizado, tipo_conta, conta_id)
+                VALUES (lower(trim(new.email)), 'empresa', new.id);
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_contas_au AFTER UPDATE OF email ON empresas BEGIN
+                UPDATE contas SET email_normalizado = lower(trim(new.email))
+                WHERE email_normalizado = lower(trim(old.email)) AND tipo_conta = 'empresa' AND conta_id = old.id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_contas_ad AFTER DELETE ON empresas BEGIN
+                DELETE FROM contas
+                WHERE email_normalizado = lower(trim(old.email)) AND tipo_conta = 'empresa' AND conta_id = old.id;
+            END
+        ''',
+    ]),
+    (6, "Exclusão lógica de contas e exclusões em cascata", [
+        # A conta some da aplicação na hora; os dados são removidos depois, em lotes (ManutencaoBanco)
+        "ALTER TABLE users ADD COLUMN excluida_em TIMESTAMP",
+        "ALTER TABLE empresas ADD COLUMN excluida_em TIMESTAMP",
+        # Índices parciais: só guardam as contas à espera da purga
+        "CREATE INDEX IF NOT EXISTS idx_users_excluidas ON users (excluida_em) WHERE excluida_em IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_empresas_excluidas ON empresas (excluida_em) WHERE excluida_em IS NOT NULL",
+        # Chaves estrangeiras com ON DELETE CASCADE: excluir a conta leva junto o que depende dela
+        _recriar_tabela("conexoes", '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            empresa_id INTEGER,
+            data_conexao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pendente',
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            FOREIGN KEY (empresa_id) REFERENCES empresas (id) ON DELETE CASCADE
+        '''),
+        _recriar_tabela("conversas", '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            empresa_id INTEGER NOT NULL,
+            ultima_mensagem TEXT,
+            ultima_data TIMESTAMP,
+            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (user_id, empresa_id),
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            FOREIGN KEY (empresa_id) REFERENCES empresas (id) ON DELETE CASCADE
+        '''),
+        _recriar_tabela("mensagens", '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            remetente_id INTEGER,
+            destinatario_id INTEGER,
+            tipo_remetente TEXT,
+            tipo_destinatario TEXT,
+            mensagem TEXT,
+            data_envio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            lida INTEGER DEFAULT 0,
+            conversa_id INTEGER REFERENCES conversas (id) ON DELETE CASCADE
+        '''),
+        # Órfãos de quando as chaves não eram verificadas; os gatilhos já recriados acertam os contadores
+        '''
+            DELETE FROM conexoes
+            WHERE (user_id IS NOT NULL AND user_id NOT IN (SELECT id FROM users))
+               OR (empresa_id IS NOT NULL AND empresa_id NOT IN (SELECT id FROM empresas))
+        ''',
+        '''
+            DELETE FROM conversas
+            WHERE user_id NOT IN (SELECT id FROM users) OR empresa_id NOT IN (SELECT id FROM empresas)
+        ''',
+        "DELETE FROM mensagens WHERE conversa_id IS NOT NULL AND conversa_id NOT IN (SELECT id FROM conversas)",
+        _verificar_chaves_estrangeiras,
+    ]),
+    (7, "Central de notificações: paginação por conta e retenção das lidas", [
+        # Página da central: as notificações da conta em ordem de id, sem ordenar em memória
+        "CREATE INDEX IF NOT EXISTS idx_notificacoes_conta ON notificacoes (usuario_id, tipo_usuario, id)",
+        # Retenção: só as lidas entram no índice, na ordem em que expiram
+        "CREATE INDEX IF NOT EXISTS idx_notificacoes_lidas ON notificacoes (data_notificacao) WHERE lida = 1",
+    ]),
+    (8, "Arquivamento de mensagens antigas em um banco anexado", [
+        # Data da mensagem mais nova já arquivada de cada conversa (NULL: nada arquivado)
+        "ALTER TABLE conversas ADD COLUMN arquivada_ate TIMESTAMP",
+        # Arquivamento: só as lidas entram no índice, da mais antiga para a mais nova
+        "CREATE INDEX IF NOT EXISTS idx_mensagens_lidas ON mensagens (data_envio) WHERE lida = 1",
+    ]),
+    (9, "Registro das contas que ficaram fora do índice de login", [
+        # Contas cujo email já pertencia a outra quando a migração 5 montou o índice: sem
+        # linha em contas, não conseguem entrar até o operador trocar o email (cli resolve-conflict)
+        '''
+            CREATE TABLE IF NOT EXISTS contas_conflitantes (
+                tipo_conta TEXT NOT NULL,
+                conta_id INTEGER NOT NULL,
+                email_normalizado TEXT NOT NULL,
+                data_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (tipo_conta, conta_id)
+            ) WITHOUT ROWID
+        ''',
+        '''
+            INSERT OR IGNORE INTO contas_conflitantes (tipo_conta, conta_id, email_normalizado)
+            SELECT 'user', u.id, lower(trim(u.email)) FROM users u
+            WHERE NOT EXISTS (
+                SELECT 1 FROM contas c
+                WHERE c.email_normalizado = lower(trim(u.email)) AND c.tipo_conta = 'user' AND c.conta_id = u.id
+            )
+        ''',
+        '''
+            INSERT OR IGNORE INTO contas_conflitantes (tipo_conta, conta_id, email_normalizado)
+            SELECT 'empresa', e.id, lower(trim(e.email)) FROM empresas e
+            WHERE NOT EXISTS (
+                SELECT 1 FROM contas c
+                WHERE c.email_normalizado = lower(trim(e.email)) AND c.tipo_conta = 'empresa' AND c.conta_id = e.id
+            )
+        ''',
+        # Uma conta conflitante removida (purga ou exclusão) sai do registro
+        '''
+            CREATE TRIGGER IF NOT EXISTS users_conflitantes_ad AFTER DELETE ON users BEGIN
+                DELETE FROM contas_conflitantes WHERE tipo_conta = 'user' AND conta_id = old.id;
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_conflitantes_ad AFTER DELETE ON empresas BEGIN
+                DELETE FROM contas_conflitantes WHERE tipo_conta = 'empresa' AND conta_id = old.id;
+            END
+        ''',
+    ]),
+    (10, "CNPJs só com dígitos e registro dos inválidos ou repetidos", [
+        # Empresas cujo CNPJ não pôde ser normalizado: cnpj é o valor guardado, cnpj_normalizado
+        # o número que já pertence a outra empresa (NULL: CNPJ inválido)
+        '''
+            CREATE TABLE IF NOT EXISTS cnpjs_conflitantes (
+                empresa_id INTEGER PRIMARY KEY,
+                cnpj TEXT NOT NULL,
+                cnpj_normalizado TEXT,
+                data_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''',
+        # Cadastro e importação comparam o CNPJ normalizado com a coluna, pelo índice único
+        _normalizar_cnpjs,
+        '''
+            CREATE TRIGGER IF NOT EXISTS empresas_cnpjs_conflitantes_ad AFTER DELETE ON empresas BEGIN
+                DELETE FROM cnpjs_conflitantes WHERE empresa_id = old.id;
+            END
+        ''',
+    ]),
+    (11, "Uma conexão por par investidor-empresa", [
+        # Pedidos repetidos de antes do índice: fica a conexão aceita, senão a pendente, senão a
+        # mais antiga; os gatilhos da migração 3 descontam dos contadores as aceitas removidas
+        '''
+            DELETE FROM conexoes WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id, empresa_id
+                        ORDER BY status = 'aceita' DESC, status = 'pendente' DESC, id
+                    ) AS ordem
+                    FROM conexoes
+                    WHERE user_id IS NOT NULL AND empresa_id IS NOT NULL
+                )
+                WHERE ordem > 1
+            )
+        ''',
+        # Dois pedidos simultâneos do mesmo par: o segundo INSERT falha (criar_conexao)
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_conexoes_par ON conexoes (user_id, empresa_id)",
+    ]),
+    (12, "Contadores sem as conexões e mensagens de contas excluídas", [
+        # A conta some das listas ao ser marcada como excluída; os totais das outras partes
+        # deixam de contá-la na mesma hora, não só quando a purga remove as linhas
+        "DROP TRIGGER IF EXISTS conexoes_contadores_ai",
+        "DROP TRIGGER IF EXISTS conexoes_contadores_ad",
+        "DROP TRIGGER IF EXISTS conexoes_contadores_au",
+        "DROP TRIGGER IF EXISTS mensagens_contadores_ai",
+        "DROP TRIGGER IF EXISTS mensagens_contadores_ad",
+        "DROP TRIGGER IF EXISTS mensagens_contadores_au",
+        # Conexões aceitas contam para cada parte enquanto a outra estiver ativa
+        f'''
+            CREATE TRIGGER IF NOT EXISTS conexoes_contadores_ai AFTER INSERT ON conexoes
+            WHEN new.status = 'aceita' BEGIN
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas + 1
+                WHERE (tipo_conta = 'user' AND conta_id = new.user_id AND {_conta_ativa("'empresa'", "new.empresa_id")})
+                   OR (tipo_conta = 'empresa' AND conta_id = new.empresa_id AND {_conta_ativa("'user'", "new.user_id")});
+            END
+        ''',
+        f'''
+            CREATE TRIGGER IF NOT EXISTS conexoes_contadores_ad AFTER DELETE ON conexoes
+            WHEN old.status = 'aceita' BEGIN
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas - 1
+                WHERE (tipo_conta = 'user' AND conta_id = old.user_id AND {_conta_ativa("'empresa'", "old.empresa_id")})
+                   OR (tipo_conta = 'empresa' AND conta_id = old.empresa_id AND {_conta_ativa("'user'", "old.user_id")});
+            END
+        ''',
+        f'''
+            CREATE TRIGGER IF NOT EXISTS conexoes_contadores_au AFTER UPDATE OF status, user_id, empresa_id ON conexoes BEGIN
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas - 1
+                WHERE old.status = 'aceita'
+                  AND ((tipo_conta = 'user' AND conta_id = old.user_id AND {_conta_ativa("'empresa'", "old.empresa_id")})
+                    OR (tipo_conta = 'empresa' AND conta_id = old.empresa_id AND {_conta_ativa("'user'", "old.user_id")}));
+                UPDATE contadores SET conexoes_ativas = conexoes_ativas + 1
+                WHERE new.status = 'aceita'
+                  AND ((tipo_conta = 'user' AND conta_id = new.user_id AND {_conta_ativa("'empresa'", "new.empresa_id")})
+                    OR (tipo_conta = 'empresa' AND conta_id = new.empresa_id AND {_conta_ativa("'user'", "new.user_id")}));
+            END
+        ''',
+        # Mensagens não lidas contam para o destinatário enquanto o remetente estiver ativo
+        f'''
+            CREATE TRIGGER IF NOT EXISTS mensagens_contadores_ai AFTER INSERT ON mensagens
+            WHEN new.lida = 0 AND {_conta_ativa("new.tipo_remetente", "new.remetente_id")} BEGIN
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas + 1
+                WHERE tipo_conta = new.tipo_destinatario AND conta_id = new.destinatario_id;
+            END
+        ''',
+        f'''
+            CREATE TRIGGER IF NOT EXISTS mensagens_contadores_ad AFTER DELETE ON mensagens
+            WHEN old.lida = 0 AND {_conta_ativa("old.tipo_remetente", "old.remetente_id")} BEGIN
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas - 1
+                WHERE tipo_conta = old.tipo_destinatario AND conta_id = old.destinatario_id;
+            END
+        ''',
+        f'''
+            CREATE TRIGGER IF NOT EXISTS mensagens_contadores_au AFTER UPDATE OF lida, destinatario_id, tipo_destinatario ON mensagens
+            WHEN {_conta_ativa("new.tipo_remetente", "new.remetente_id")} BEGIN
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas - 1
+                WHERE old.lida = 0 AND tipo_conta = old.tipo_destinatario AND conta_id = old.destinatario_id;
+                UPDATE contadores SET mensagens_nao_lidas = mensagens_nao_lidas + 1
+                WHERE new.lida = 0 AND tipo_conta = new.tipo_destinatario AND conta_id = new.destinatario_id;
+            END
+        ''',
+        *_contadores_da_exclusao("users", "user"),
+        *_contadores_da_exclusao("empresas", "empresa"),
+        # Contas excluídas antes desta versão e ainda não purgadas
+        f'''
+            UPDATE contadores SET
+                conexoes_ativas = (
+                    SELECT COUNT(*) FROM conexoes c
+                    WHERE c.status = 'aceita' AND (
+                        (contadores.tipo_conta = 'user' AND c.user_id = contadores.conta_id
+                         AND {_conta_ativa("'empresa'", "c.empresa_id")})
+                        OR (contadores.tipo_conta = 'empresa' AND c.empresa_id = contadores.conta_id
+                            AND {_conta_ativa("'user'", "c.user_id")}))
+                ),
+                mensagens_nao_lidas = (
+                    SELECT COUNT(*) FROM mensagens m
+                    WHERE m.destinatario_id = contadores.conta_id AND m.tipo_destinatario = contadores.tipo_conta
+                      AND m.lida = 0 AND {_conta_ativa("m.tipo_remetente", "m.remetente_id")}
+                )
+        ''',
+    ]),
+]
+
+# Esquema do banco de arquivo, aplicado sempre que ele é anexado. Sem chaves estrangeiras:
+# elas não valem entre bancos; a purga de contas remove as mensagens arquivadas explicitamente.
+ESQUEMA_ARQUIVO = [
+    "PRAGMA arquivo.journal_mode = WAL",
+    '''
+        CREATE TABLE IF NOT EXISTS arquivo.mensagens (
+            id INTEGER PRIMARY KEY,
+            remetente_id INTEGER,
+            destinatario_id INTEGER,
+            tipo_remetente TEXT,
+            tipo_destinatario TEXT,
+            mensagem TEXT,
+            data_envio TIMESTAMP,
+            lida INTEGER,
+            conversa_id INTEGER
+        )
+    ''',
+    # Mesmo índice do histórico do chat no banco principal
+    "CREATE INDEX IF NOT EXISTS arquivo.idx_mensagens_conversa ON mensagens (conversa_id, data_envio, id)",
+]
+
+# Consultas das telas principais (todas devem ser atendidas pelos índices das migrações).
+# Contas marcadas como excluídas somem do login, da busca e das listas antes da purga dos dados.
+CONSULTAS = {
+    # Login e cadastro: uma busca pela chave primária de contas
+    "credenciais": '''
+        SELECT c.conta_id, c.tipo_conta, COALESCE(u.nome, e.nome_empresa), COALESCE(u.senha, e.senha)
+        FROM contas c
+        LEFT JOIN users u ON c.tipo_conta = 'user' AND u.id = c.conta_id
+        LEFT JOIN empresas e ON c.tipo_conta = 'empresa' AND e.id = c.conta_id
+        WHERE c.email_normalizado = lower(trim(?))
+          AND COALESCE(u.excluida_em, e.excluida_em) IS NULL
+    ''',
+    "email_cadastrado": "SELECT 1 FROM contas WHERE email_normalizado = lower(trim(?))",
+    # Totais do dashboard, mantidos pelos gatilhos da migração 3
+    "contadores": '''
+        SELECT conexoes_ativas, mensagens_nao_lidas, notificacoes_nao_lidas
+        FROM contadores
+        WHERE tipo_conta = ? AND conta_id = ?
+    ''',
+    "atividades_user": '''
+        SELECT 'Nova conexão com ' || e.nome_empresa, data_conexao
+        FROM conexoes c
+        JOIN empresas e ON c.empresa_id = e.id
+        WHERE c.user_id = ? AND e.excluida_em IS NULL
+        ORDER BY data_conexao DESC
+        LIMIT 5
+    ''',
+    "atividades_empresa": '''
+        SELECT 'Nova conexão com ' || u.nome, data_conexao
+        FROM conexoes c
+        JOIN users u ON c.user_id = u.id
+        WHERE c.empresa_id = ? AND u.excluida_em IS NULL
+        ORDER BY data_conexao DESC
+        LIMIT 5
+    ''',
+    "conexoes_user": '''
+        SELECT c.id, e.nome_empresa, e.email, c.status, c.data_conexao
+        FROM conexoes c
+        JOIN empresas e ON c.empresa_id = e.id
+        WHERE c.user_id = ? AND e.excluida_em IS NULL
+        ORDER BY c.id DESC
+        LIMIT ? OFFSET ?
+    ''',
+    "conexoes_empresa": '''
+        SELECT c.id, u.nome, u.email, c.status, c.data_conexao
+        FROM conexoes c
+        JOIN users u ON c.user_id = u.id
+        WHERE c.empresa_id = ? AND u.excluida_em IS NULL
+        ORDER BY c.id DESC
+        LIMIT ? OFFSET ?
+    ''',
+    "status_conexoes_user": "SELECT empresa_id, status FROM conexoes WHERE user_id = ?",
+    "status_conexoes_empresa": "SELECT user_id, status FROM conexoes WHERE empresa_id = ?",
+    # Nome pesa mais que razão social, que pesa mais que email
+    "busca_empresas": '''
+        SELECT e.id, e.nome_empresa, e.email, e.cidade, e.estado, e.razao_social
+        FROM empresas_fts
+        JOIN empresas e ON e.id = empresas_fts.rowid
+        WHERE empresas_fts MATCH ? AND e.excluida_em IS NULL
+        ORDER BY bm25(empresas_fts, 10.0, 5.0, 1.0)
+        LIMIT ? OFFSET ?
+    ''',
+    "busca_users": '''
+        SELECT u.id, u.nome, u.email, u.genero, u.numero
+        FROM users_fts
+        JOIN users u ON u.id = users_fts.rowid
+        WHERE users_fts MATCH ? AND u.excluida_em IS NULL
+        ORDER BY bm25(users_fts, 10.0, 1.0)
+        LIMIT ? OFFSET ?
+    ''',
+    # Conversas mais recentes primeiro, direto do índice (conta, última data)
+    "conversas_user": '''
+        SELECT e.id, e.nome_empresa, cv.ultima_mensagem, cv.ultima_data, cv.id
+        FROM conversas cv
+        JOIN empresas e ON e.id = cv.empresa_id
+        WHERE cv.user_id = ? AND e.excluida_em IS NULL
+        ORDER BY cv.ultima_data DESC, cv.id DESC
+        LIMIT ? OFFSET ?
+    ''',
+    "conversas_empresa": '''
+        SELECT u.id, u.nome, cv.ultima_mensagem, cv.ultima_data, cv.id
+        FROM conversas cv
+        JOIN users u ON u.id = cv.user_id
+        WHERE cv.empresa_id = ? AND u.excluida_em IS NULL
+        ORDER BY cv.ultima_data DESC, cv.id DESC
+        LIMIT ? OFFSET ?
+    ''',
+    # Central de notificações por keyset: a página seguinte começa antes do menor id exibido
+    "notificacoes_recentes": '''
+        SELECT id, titulo, mensagem, data_notificacao, lida
+        FROM notificacoes
+        WHERE usuario_id = ? AND tipo_usuario = ?
+        ORDER BY id DESC
+        LIMIT ?
+    ''',
+    "notificacoes_anteriores": '''
+        SELECT id, titulo, mensagem, data_notificacao, lida
+        FROM notificacoes
+        WHERE usuario_id = ? AND tipo_usuario = ? AND id < ?
+        ORDER BY id DESC
+        LIMIT ?
+    ''',
+    # "Marcar todas como lidas": um único UPDATE pelas não lidas da conta
+    "marcar_notificacoes_lidas": '''
+        UPDATE notificacoes SET lida = 1
+        WHERE usuario_id = ? AND tipo_usuario = ? AND lida = 0
+    ''',
+    # Retenção: um lote das lidas mais antigas que o prazo, pelo índice parcial
+    "notificacoes_expiradas": '''
+        DELETE FROM notificacoes WHERE id IN (
+            SELECT id FROM notificacoes
+            WHERE lida = 1 AND data_notificacao < datetime('now', ?)
+            LIMIT ?
+        )
+    ''',
+    # Histórico do chat por keyset: a página seguinte começa antes da mensagem mais antiga exibida
+    "mensagens_recentes": '''
+        SELECT id, remetente_id, tipo_remetente, mensagem, data_envio
+        FROM mensagens
+        WHERE conversa_id = ?
+        ORDER BY data_envio DESC, id DESC
+        LIMIT ?
+    ''',
+    "mensagens_anteriores": '''
+        SELECT id, remetente_id, tipo_remetente, mensagem, data_envio
+        FROM mensagens
+        WHERE conversa_id = ? AND (data_envio, id) < (?, ?)
+        ORDER BY data_envio DESC, id DESC
+        LIMIT ?
+    ''',
+    # Arquivamento: um lote das lidas mais antigas que o prazo, pelo índice parcial; a última
+    # mensagem de cada conversa fica no banco principal (é a exibida na lista de conversas)
+    "mensagens_arquivaveis": '''
+        SELECT m.id, m.conversa_id, m.data_envio
+        FROM mensagens m
+        JOIN conversas cv ON cv.id = m.conversa_id
+        WHERE m.lida = 1 AND m.data_envio < datetime('now', ?) AND m.data_envio < cv.ultima_data
+        ORDER BY m.data_envio
+        LIMIT ?
+    ''',
+}
+
+def aplicar_migracoes(conn):
+    """Aplica as migrações pendentes e retorna a versão final do esquema"""
+    versao_atual = conn.execute("PRAGMA user_version").fetchone()[0]
+    versao_alvo = MIGRACOES[-1][0]
+    
+    # Caminho rápido: esquema já atualizado, nenhuma DDL é executada
+    if versao_atual >= versao_alvo:
+        return versao_atual
+    
+    # Recriar tabelas exige as chaves estrangeiras desligadas (DROP TABLE dispararia as
+    # cascatas); o PRAGMA não tem efeito dentro de uma transação, por isso fica fora do laço
+    chaves_estrangeiras = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for versao, descricao, comandos in MIGRACOES:
+            if versao <= versao_atual:
+                continue
+        
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Outra instância pode ter migrado enquanto aguardávamos o lock
+                versao_atual = conn.execute("PRAGMA user_version").fetchone()[0]
+                if versao <= versao_atual:
+                    conn.rollback()
+                    continue
+            
+                for comando in comandos:
+                    if callable(comando):
+                        comando(conn)
+                    else:
+                        conn.execute(comando)
+                conn.execute(f"PRAGMA user_version = {versao}")
+                conn.commit()
+                versao_atual = versao
+                print(f"Migração {versao} aplicada: {descricao}")
+            except Exception:
+                conn.rollback()
+                raise
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {chaves_estrangeiras}")
+    
+    return versao_atual
+
+def verificar_planos_consulta(conn):
+    """Executa EXPLAIN QUERY PLAN em cada consulta e retorna as que fazem SCAN completo"""
+    falhas = []
+    for nome, sql in CONSULTAS.items():
+        parametros = (None,) * sql.count("?")
+        for linha in conn.execute("EXPLAIN QUERY PLAN " + sql, parametros):
+            detalhe = linha[-1]
+            # Tabelas virtuais (FTS5) usam o próprio índice, não um SCAN de tabela
+            if detalhe.startswith("SCAN ") and "VIRTUAL TABLE" not in detalhe:
+                falhas.append((nome, detalhe))
+    return falhas
+
+class ExecutorBanco:
+    """Executa operações de banco em uma thread dedicada com conexão própria"""
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or caminho_banco()
+        self._fila = queue.Queue()
+        self._trava = threading.Lock()
+        self._conn = None
+        self._atual = None         # Future da operação em andamento
+        self._interrompido = False
+        self._erro = None          # falha ao abrir a conexão: a thread terminou sem executar nada
+        self._thread = threading.Thread(target=self._executar, name="executor-banco", daemon=True)
+        self._thread.start()
+
+    def submeter(self, funcao, *args, **kwargs):
+        """Agenda funcao(conn, *args, **kwargs) e retorna um Future com o resultado"""
+        futuro = Future()
+        with self._trava:
+            # Sem a thread, nada da fila seria executado: o Future falha na hora
+            if self._erro is not None:
+                futuro.set_exception(self._erro)
+                return futuro
+            self._fila.put((futuro, funcao, args, kwargs))
+        return futuro
+
+    def cancelar(self, futuro):
+        """Descarta a operação se ainda estiver na fila ou interrompe a consulta em andamento"""
+        if futuro.cancel():
+            return
+        with self._trava:
+            # A trava garante que a interrupção não atinja a operação seguinte
+            if self._atual is futuro:
+                self._interrompido = True
+                self._conn.interrupt()
+
+    def encerrar(self):
+        """Conclui as operações pendentes e fecha a conexão da thread"""
+        self._fila.put(None)
+        self._thread.join()
+
+    def _falhar(self, erro):
+        """Registra a falha da thread e a entrega a todas as operações que estavam na fila"""
+        with self._trava:
+            self._erro = erro
+        while True:
+            try:
+                item = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[0].set_running_or_notify_cancel():
+                item[0].set_exception(erro)
+
+    def _executar(self):
+        try:
+            conn = self._conn = abrir_conexao(self.caminho)
+        except Exception as e:
+            self._falhar(e)
+            return
+
+        try:
+            while True:
+                item = self._fila.get()
+                if item is None:
+                    break
+
+                futuro, funcao, args, kwargs = item
+                if not futuro.set_running_or_notify_cancel():
+                    continue
+
+                with self._trava:
+                    self._atual = futuro
+                    self._interrompido = False
+                try:
+                    resultado = funcao(conn, *args, **kwargs)
+                except BaseException as e:
+                    # Nunca deixar uma transação aberta para a próxima operação
+                    if conn.in_transaction:
+                        conn.rollback()
+                    with self._trava:
+                        self._atual = None
+                        interrompido = self._interrompido
+                    futuro.set_exception(CancelledError() if interrompido else e)
+                else:
+                    with self._trava:
+                        self._atual = None
+                    futuro.set_result(resultado)
+        finally:
+            conn.close()
@@ -0,0 +1,85 @@
+"""Cache de resultados da busca"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from boss_bridge.servicos.diretorio import corresponde_termos
+
+class CacheBusca:
+    """LRU com expiração para páginas da busca, chaveado por (tipo da conta, consulta, offset, limite)"""
+
+    def __init__(self, max_entradas=200, ttl=300):
+        self.max_entradas = max_entradas
+        self.ttl = ttl            # segundos
+        self.acertos = 0
+        self.falhas = 0
+        self.geracao = 0          # muda a cada invalidação
+        self._entradas = OrderedDict()  # chave -> (expira_em, linhas)
+        self._trava = threading.Lock()
+
+    def obter(self, chave):
+        """Retorna as linhas da página em cache ou None"""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada and entrada[0] > time.monotonic():
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada[1]
+            if entrada:
+                del self._entradas[chave]
+            self.falhas += 1
+            return None
+
+    def guardar(self, chave, linhas, geracao):
+        """Guarda a página; ignora resultados consultados antes da última invalidação"""
+        with self._trava:
+            if geracao != self.geracao:
+                return
+            self._entradas[chave] = (time.monotonic() + self.ttl, linhas)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar_conta(self, tipo_conta, conta_id=None, textos=()):
+        """Remove as buscas afetadas por uma conta criada, editada ou excluída
+
+        Uma busca é afetada se alguma página contém a conta ou se os novos textos
+        da conta atendem à consulta. Todas as páginas da busca saem juntas, já que
+        a conta pode deslocar a ordem das páginas seguintes.
+        """
+        # Empresas aparecem nas buscas de investidores e vice-versa
+        tipo_busca = "user" if tipo_conta == "empresa" else "empresa"
+        with self._trava:
+            self.geracao += 1
+            afetadas = set()
+            for (tipo, consulta, _offset, _limite), (_expira, linhas) in self._entradas.items():
+                if tipo != tipo_busca or (tipo, consulta) in afetadas:
+                    continue
+                if (conta_id is not None and any(linha[0] == conta_id for linha in linhas)) \
+                        or (textos and corresponde_termos(textos, consulta.split())):
+                    afetadas.add((tipo, consulta))
+            for chave in [c for c in self._entradas if c[:2] in afetadas]:
+                del self._entradas[chave]
+
+    def limpar(self):
+        with self._trava:
+            self.geracao += 1
+            self._entradas.clear()
+
+    def estatisticas(self):
+        """Retorna acertos, falhas, taxa de acerto e quantidade de entradas"""
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "entradas": len(self._entradas),
+            }
+
+    def resumo(self):
+        """Estatísticas em uma linha, para o console e para o benchmark"""
+        e = self.estatisticas()
+        return (f"Cache da busca: {e['acertos']} acertos, {e['falhas']} falhas "
+                f"({e['taxa_acerto']:.1%} de acerto), {e['entradas']} entradas")
@@ -0,0 +1,235 @@
+"""Comandos de linha de comando, sem interface gráfica
+
+    python -m boss_bridge.cli check-query-plans
+    python -m boss_bridge.cli import empresas.csv --credenciais senhas.csv --rejeitados rejeitados.csv
+    python -m boss_bridge.cli export mensagens --formato jsonl --marca marcas.json
+    python -m boss_bridge.cli archive --dias 180
+    python -m boss_bridge.cli conflicts
+    python -m boss_bridge.cli resolve-conflict empresa 42 contato@empresa.com.br
+    python -m boss_bridge.cli resolve-cnpj-conflict 42 11.222.333/0001-81
+
+Só depende do pacote boss_bridge e da biblioteca padrão: roda em servidores e
+agendadores sem o customtkinter instalado.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from boss_bridge.banco import (
+    CONSULTAS, abrir_conexao, aplicar_migracoes, caminho_arquivo, verificar_planos_consulta
+)
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.servicos.contas import (
+    listar_cnpjs_conflitantes, listar_contas_conflitantes, resolver_cnpj_conflitante, resolver_conta_conflitante
+)
+from boss_bridge.servicos.exportacao import FORMATOS, TABELAS_EXPORTACAO, exportar
+from boss_bridge.servicos.importacao import importar_csv_empresas
+from boss_bridge.servicos.mensagens import ARQUIVAMENTO_MENSAGENS_DIAS, arquivar_mensagens
+
+def verificar_planos(args):
+    """Verifica os planos em um banco em memória com o esquema atual"""
+    conn = sqlite3.connect(":memory:")
+    aplicar_migracoes(conn)
+    falhas = verificar_planos_consulta(conn)
+    for nome, detalhe in falhas:
+        print(f"SCAN completo em '{nome}': {detalhe}")
+    print(f"{len(CONSULTAS)} consultas verificadas, {len(falhas)} com SCAN completo")
+    return 1 if falhas else 0
+
+def importar(args):
+    """Importação em massa de empresas a partir de CSV, cada uma com sua senha inicial aleatória"""
+    if os.path.exists(args.credenciais):
+        print(f"Erro: o arquivo de credenciais {args.credenciais} já existe")
+        return 1
+
+    conn = abrir_conexao(args.banco)
+    inicio = time.perf_counter()
+
+    def progresso(lidas, importadas, rejeitadas):
+        decorrido = time.perf_counter() - inicio
+        print(f"{lidas} linhas: {importadas} importadas, {rejeitadas} rejeitadas "
+              f"({lidas / decorrido:.0f} linhas/s)")
+
+    try:
+        aplicar_migracoes(conn)
+        importadas, rejeitadas = importar_csv_empresas(
+            conn, args.csv, args.credenciais, args.rejeitados, progresso
+        )
+    except ErroValidacao as e:
+        print(f"Erro: {e}")
+        return 1
+    finally:
+        conn.close()
+    print(f"Importação concluída em {time.perf_counter() - inicio:.1f} s: "
+          f"{importadas} empresas importadas, {rejeitadas} linhas rejeitadas")
+    print(f"Senhas iniciais em {args.credenciais}: entregue cada uma só à respectiva empresa")
+    return 0
+
+def exportar_tabela(args):
+    """Exportação em fluxo; no WAL a leitura não bloqueia a aplicação"""
+    marcas = {}
+    if args.marca and os.path.exists(args.marca):
+        with open(args.marca, encoding="utf-8") as arquivo:
+            marcas = json.load(arquivo)
+    apos_id = args.apos_id if args.apos_id is not None else marcas.get(args.tabela)
+    conta = (args.conta_id, args.tipo_conta) if args.conta_id is not None else None
+
+    conn = abrir_conexao(args.banco)
+    try:
+        # Avisos das migrações no stderr: a saída padrão pode ser o próprio arquivo exportado
+        with contextlib.redirect_stdout(sys.stderr):
+            aplicar_migracoes(conn)
+    except Exception:
+        conn.close()
+        raise
+    conn.execute("PRAGMA query_only = ON")
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", newline="", encoding="utf-8")
+    try:
+        linhas, ultimo_id = exportar(
+            conn, args.tabela, saida, args.formato,
+            progresso=lambda total: print(f"{total} linhas exportadas", file=sys.stderr),
+            desde=args.desde, ate=args.ate, status=args.status, conta=conta, apos_id=apos_id
+        )
+    except ErroValidacao as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+        conn.close()
+
+    # A marca só avança depois que a saída foi gravada por completo
+    if args.marca and ultimo_id is not None:
+        marcas[args.tabela] = ultimo_id
+        with open(args.marca, "w", encoding="utf-8") as arquivo:
+            json.dump(marcas, arquivo, indent=2)
+    print(f"{linhas} linhas de {args.tabela} exportadas (último id: {ultimo_id})", file=sys.stderr)
+    return 0
+
+def arquivar(args):
+    """Arquiva agora tudo o que está pendente, sem esperar a manutenção em segundo plano"""
+    conn = abrir_conexao(args.banco)
+    inicio = time.perf_counter()
+    total = 0
+    try:
+        aplicar_migracoes(conn)
+        while True:
+            movidas = arquivar_mensagens(conn, args.dias)
+            if not movidas:
+                break
+            total += movidas
+            print(f"{total} mensagens arquivadas ({total / (time.perf_counter() - inicio):.0f} mensagens/s)")
+    finally:
+        conn.close()
+    print(f"Arquivamento concluído em {time.perf_counter() - inicio:.1f} s: "
+          f"{total} mensagens movidas para {caminho_arquivo(args.banco)}")
+    return 0
+
+def listar_conflitos(args):
+    """Lista as contas sem acesso por email repetido e as empresas com CNPJ inválido ou repetido"""
+    conn = abrir_conexao(args.banco)
+    try:
+        aplicar_migracoes(conn)
+        conflitos = listar_contas_conflitantes(conn)
+        cnpjs = listar_cnpjs_conflitantes(conn)
+    finally:
+        conn.close()
+    for tipo_conta, conta_id, email, tipo_dono, id_dono in conflitos:
+        dono = f"{tipo_dono} {id_dono}" if id_dono is not None else "nenhuma conta (email livre)"
+        print(f"{tipo_conta} {conta_id}: {email} pertence a {dono}")
+    print(f"{len(conflitos)} conta(s) sem acesso; resolva com: resolve-conflict TIPO ID NOVO_EMAIL")
+    for empresa_id, nome, cnpj, id_dono in cnpjs:
+        situacao = f"repete o da empresa {id_dono}" if id_dono is not None else "inválido"
+        print(f"empresa {empresa_id} ({nome}): CNPJ {cnpj} {situacao}")
+    print(f"{len(cnpjs)} empresa(s) com CNPJ inválido ou repetido; "
+          "resolva com: resolve-cnpj-conflict ID CNPJ (ou exclua a empresa repetida)")
+    return 1 if conflitos or cnpjs else 0
+
+def resolver_conflito(args):
+    """Dá um novo email a uma conta conflitante, liberando o login dela"""
+    conn = abrir_conexao(args.banco)
+    try:
+        aplicar_migracoes(conn)
+        resolver_conta_conflitante(conn, args.tipo_conta, args.conta_id, args.email)
+    except ErroValidacao as e:
+        print(f"Erro: {e}")
+        return 1
+    finally:
+        conn.close()
+    print(f"{args.tipo_conta} {args.conta_id} agora entra com {args.email}")
+    return 0
+
+def resolver_conflito_cnpj(args):
+    """Grava o CNPJ correto em uma empresa com CNPJ inválido ou repetido"""
+    conn = abrir_conexao(args.banco)
+    try:
+        aplicar_migracoes(conn)
+        resolver_cnpj_conflitante(conn, args.empresa_id, args.cnpj)
+    except ErroValidacao as e:
+        print(f"Erro: {e}")
+        return 1
+    finally:
+        conn.close()
+    print(f"empresa {args.empresa_id} agora tem o CNPJ {args.cnpj}")
+    return 0
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="python -m boss_bridge.cli", description="Ferramentas do Boss Bridge")
+    parser.add_argument("--banco", help="arquivo do banco (padrão: o da aplicação)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    comando = comandos.add_parser("check-query-plans", help="procura SCAN completo nas consultas das telas")
+    comando.set_defaults(executar=verificar_planos)
+
+    comando = comandos.add_parser("import", help="importa empresas de um arquivo CSV")
+    comando.add_argument("csv")
+    comando.add_argument("--credenciais", metavar="CSV", required=True,
+                         help="arquivo novo (permissão 0600) onde são gravadas as senhas iniciais geradas")
+    comando.add_argument("--rejeitados", metavar="CSV", help="grava as linhas rejeitadas com o motivo")
+    comando.set_defaults(executar=importar)
+
+    comando = comandos.add_parser("export", help="exporta uma tabela para CSV ou JSONL")
+    comando.add_argument("tabela", choices=list(TABELAS_EXPORTACAO))
+    comando.add_argument("--saida", default="-", help="arquivo de saída (padrão: saída padrão)")
+    comando.add_argument("--formato", choices=FORMATOS, default="csv")
+    comando.add_argument("--desde", help="data inicial, AAAA-MM-DD")
+    comando.add_argument("--ate", help="data final (inclusive), AAAA-MM-DD")
+    comando.add_argument("--status", help="status das conexões (aceita, pendente, recusada)")
+    comando.add_argument("--conta-id", type=int, help="exporta só o que envolve esta conta")
+    comando.add_argument("--tipo-conta", choices=["user", "empresa"], default="user")
+    comando.add_argument("--apos-id", type=int, help="exporta só linhas com id maior que este")
+    comando.add_argument("--marca", metavar="JSON",
+                         help="exportação incremental: lê e atualiza o último id exportado de cada tabela")
+    comando.set_defaults(executar=exportar_tabela)
+
+    comando = comandos.add_parser("archive", help="move as mensagens lidas antigas para o banco de arquivo")
+    comando.add_argument("--dias", type=int, default=ARQUIVAMENTO_MENSAGENS_DIAS,
+                         help="idade mínima das mensagens arquivadas, em dias (padrão: %(default)s)")
+    comando.set_defaults(executar=arquivar)
+
+    comando = comandos.add_parser("conflicts", help="lista as contas sem acesso por email repetido e os CNPJs inválidos ou repetidos")
+    comando.set_defaults(executar=listar_conflitos)
+
+    comando = comandos.add_parser("resolve-conflict", help="dá um novo email a uma conta sem acesso")
+    comando.add_argument("tipo_conta", choices=["user", "empresa"])
+    comando.add_argument("conta_id", type=int)
+    comando.add_argument("email")
+    comando.set_defaults(executar=resolver_conflito)
+
+    comando = comandos.add_parser("resolve-cnpj-conflict", help="grava o CNPJ correto em uma empresa conflitante")
+    comando.add_argument("empresa_id", type=int)
+    comando.add_argument("cnpj")
+    comando.set_defaults(executar=resolver_conflito_cnpj)
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    return args.executar(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
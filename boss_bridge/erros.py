@@ -0,0 +1,4 @@
+"""Exceções compartilhadas pelos serviços"""
+
+class ErroValidacao(Exception):
+    """Regra de negócio violada; a mensagem é exibida diretamente ao usuário"""
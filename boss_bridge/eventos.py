@@ -0,0 +1,38 @@
+"""Eventos publicados após uma escrita concluída, com os dados em argumentos nomeados"""
+
+import traceback
+
+EVENTO_CONEXAO_SOLICITADA = "conexao_solicitada"  # conexao_id, outra_parte, nome, email, data
+EVENTO_CONEXAO_ACEITA = "conexao_aceita"          # conexao_id, outra_parte
+EVENTO_CONEXAO_RECUSADA = "conexao_recusada"      # conexao_id, outra_parte
+EVENTO_MENSAGEM_ENVIADA = "mensagem_enviada"      # conversa_id, mensagem, data_envio
+EVENTO_MENSAGENS_LIDAS = "mensagens_lidas"        # conversa_id, quantidade
+EVENTO_NOTIFICACOES_LIDAS = "notificacoes_lidas"  # quantidade
+
+class BarramentoEventos:
+    """Publicação/assinatura síncrona na thread da interface
+
+    Assinaturas com `tela` pertencem a uma tela montada e são removidas quando ela
+    é fechada; as demais duram a sessão inteira.
+    """
+
+    def __init__(self):
+        self._assinaturas = {}  # tipo -> [(callback, tela)]
+
+    def assinar(self, tipo, callback, tela=None):
+        """Registra callback(**dados) para os eventos do tipo"""
+        self._assinaturas.setdefault(tipo, []).append((callback, tela))
+
+    def encerrar_tela(self, tela):
+        """Remove as assinaturas da tela que foi fechada"""
+        for assinaturas in self._assinaturas.values():
+            assinaturas[:] = [a for a in assinaturas if a[1] != tela]
+
+    def publicar(self, tipo, **dados):
+        """Entrega o evento a cada assinante; a falha de um não impede os demais"""
+        for callback, _ in list(self._assinaturas.get(tipo, ())):
+            try:
+                callback(**dados)
+            except Exception as e:
+                print(f"Erro ao tratar o evento {tipo}: {str(e)}")
+                print(traceback.format_exc())
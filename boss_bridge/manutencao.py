@@ -0,0 +1,70 @@
+"""Manutenção do banco em segundo plano: purga de contas excluídas, retenção de notificações e arquivamento de mensagens"""
+
+import sqlite3
+import threading
+
+from boss_bridge.banco import abrir_conexao
+from boss_bridge.servicos.contas import purgar_conta_excluida
+from boss_bridge.servicos.mensagens import arquivar_mensagens
+from boss_bridge.servicos.notificacoes import expirar_notificacoes
+
+# Pausa (em segundos) entre lotes e intervalo entre verificações quando não há nada pendente
+PAUSA_MANUTENCAO = 0.05
+INTERVALO_MANUTENCAO = 60
+
+# Tarefas em ordem de prioridade; cada chamada remove um lote, em uma transação curta,
+# e retorna quantas linhas removeu ou moveu (0: nada pendente)
+TAREFAS = (purgar_conta_excluida, expirar_notificacoes, arquivar_mensagens)
+
+class ManutencaoBanco:
+    """Executa as tarefas de manutenção em lotes curtos, em uma thread com conexão própria"""
+
+    def __init__(self, caminho=None, intervalo=INTERVALO_MANUTENCAO, tarefas=TAREFAS):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.tarefas = tarefas
+        self._parar = threading.Event()
+        self._acordar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        """Inicia a thread de manutenção"""
+        self._thread = threading.Thread(target=self._executar, name="manutencao-banco", daemon=True)
+        self._thread.start()
+
+    def avisar(self):
+        """Antecipa a próxima verificação (por exemplo, logo após excluir uma conta)"""
+        self._acordar.set()
+
+    def parar(self):
+        """Interrompe a thread ao fim do lote em andamento; o restante fica para a próxima execução"""
+        self._parar.set()
+        self._acordar.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _executar(self):
+        conn = abrir_conexao(self.caminho)
+        try:
+            while not self._parar.is_set():
+                removidas = 0
+                for tarefa in self.tarefas:
+                    try:
+                        removidas = tarefa(conn)
+                    except sqlite3.Error as e:
+                        print(f"Erro na manutenção do banco ({tarefa.__name__}): {str(e)}")
+                        if conn.in_transaction:
+                            conn.rollback()
+                        removidas = 0
+                    if removidas:
+                        break
+
+                if removidas:
+                    # Pausa entre lotes: as outras sessões pegam a escrita entre um e outro
+                    self._parar.wait(PAUSA_MANUTENCAO)
+                else:
+                    self._acordar.wait(self.intervalo)
+                    self._acordar.clear()
+        finally:
+            conn.close()
@@ -0,0 +1,60 @@
+"""Hash e verificação de senhas
+
+Funções puras e lentas por design: a interface as executa no pool de senhas, nunca na
+thread do Tk.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+
+from boss_bridge.erros import ErroValidacao
+
+# Custo do scrypt: N = 2**ln, tamanho de bloco r e paralelismo p. Ao aumentar, os
+# hashes existentes são recalculados no próximo login bem-sucedido.
+CUSTO_SCRYPT = {"ln": 14, "r": 8, "p": 1}
+VERSAO_HASH = 1
+
+def _b64(dados):
+    return base64.b64encode(dados).decode("ascii").rstrip("=")
+
+def _de_b64(texto):
+    return base64.b64decode(texto + "=" * (-len(texto) % 4))
+
+def _scrypt(senha, sal, custo):
+    n, r, p = 2 ** custo["ln"], custo["r"], custo["p"]
+    return hashlib.scrypt(senha.encode(), salt=sal, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32)
+
+def _formatar_hash(custo, sal, chave):
+    parametros = ",".join(f"{nome}={custo[nome]}" for nome in ("ln", "r", "p"))
+    return f"$scrypt$v={VERSAO_HASH}${parametros}${_b64(sal)}${_b64(chave)}"
+
+def gerar_hash_senha(senha, custo=None):
+    """Retorna o hash da senha no formato $scrypt$v=1$ln=..,r=..,p=..$sal$chave"""
+    custo = custo or CUSTO_SCRYPT
+    sal = os.urandom(16)
+    return _formatar_hash(custo, sal, _scrypt(senha, sal, custo))
+
+# Conferido quando nenhuma conta tem o email, para o login levar o mesmo tempo e não
+# revelar quais emails estão cadastrados. Só o custo importa: a chave nula não confere.
+HASH_SENHA_AUSENTE = _formatar_hash(CUSTO_SCRYPT, bytes(16), bytes(32))
+
+def verificar_senha(senha, armazenado):
+    """Confere a senha com o hash armazenado e retorna (confere, precisa_recalcular)"""
+    if armazenado.startswith("$scrypt$"):
+        _, _, versao, parametros, sal, chave = armazenado.split("$")
+        custo = {nome: int(valor) for nome, valor in (item.split("=") for item in parametros.split(","))}
+        confere = hmac.compare_digest(_scrypt(senha, _de_b64(sal), custo), _de_b64(chave))
+        desatualizado = versao != f"v={VERSAO_HASH}" or custo != CUSTO_SCRYPT
+        return confere, confere and desatualizado
+
+    # Formato legado: SHA-256 hexadecimal sem sal, sempre recalculado após o login
+    confere = hmac.compare_digest(hashlib.sha256(senha.encode()).hexdigest(), armazenado)
+    return confere, confere
+
+def trocar_hash_senha(senha_atual, armazenado, senha_nova):
+    """Confere a senha atual e retorna o hash da nova"""
+    if not verificar_senha(senha_atual, armazenado)[0]:
+        raise ErroValidacao("Senha atual incorreta!")
+    return gerar_hash_senha(senha_nova)
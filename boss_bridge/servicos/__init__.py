@@ -0,0 +1,6 @@
+"""Serviços da aplicação
+
+Cada função recebe a conexão como primeiro argumento e não depende da interface: a
+janela as executa na thread do ExecutorBanco, e scripts podem chamá-las diretamente
+com uma conexão de abrir_conexao.
+"""
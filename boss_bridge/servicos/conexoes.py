@@ -0,0 +1,71 @@
+"""Solicitações de conexão entre investidores e empresas"""
+
+import sqlite3
+
+from boss_bridge.banco import CONSULTAS
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.servicos.notificacoes import notificar
+
+def partes_conexao(conta_id, tipo_conta, alvo_id, tipo_alvo):
+    """Retorna (user_id, empresa_id) da conexão entre a conta e o alvo, ou None se são do mesmo tipo"""
+    if tipo_conta == "user" and tipo_alvo == "empresa":
+        return conta_id, alvo_id
+    if tipo_conta == "empresa" and tipo_alvo == "user":
+        return alvo_id, conta_id
+    return None
+
+def listar_conexoes(conn, conta_id, tipo_conta, offset, limite):
+    """Retorna uma página de (id, nome, email, status, data) das conexões da conta"""
+    if tipo_conta == "user":
+        return conn.execute(CONSULTAS["conexoes_user"], (conta_id, limite, offset)).fetchall()
+    return conn.execute(CONSULTAS["conexoes_empresa"], (conta_id, limite, offset)).fetchall()
+
+def listar_status_conexoes(conn, conta_id, tipo_conta):
+    """Retorna {id da outra parte: status} de todas as conexões da conta"""
+    if tipo_conta == "user":
+        return dict(conn.execute(CONSULTAS["status_conexoes_user"], (conta_id,)))
+    return dict(conn.execute(CONSULTAS["status_conexoes_empresa"], (conta_id,)))
+
+def criar_conexao(conn, user_id, empresa_id, tipo_alvo):
+    """Registra a solicitação de conexão, notifica a outra parte e retorna (id da conexão, data)"""
+    try:
+        cursor = conn.execute(
+            "INSERT INTO conexoes (user_id, empresa_id) VALUES (?, ?)",
+            (user_id, empresa_id)
+        )
+    except sqlite3.IntegrityError as e:
+        # O INSERT que falhou deixou a transação aberta, segurando a escrita do banco
+        conn.rollback()
+        # Chave estrangeira: a outra conta foi excluída desde que apareceu na busca
+        if "FOREIGN KEY" in str(e):
+            raise ErroValidacao("Esta conta não está mais disponível.")
+        # Índice único do par (migração 11): outra sessão já fez o mesmo pedido
+        raise ErroValidacao("Solicitação de conexão já existe!")
+
+    # Adicionar notificação
+    if tipo_alvo == "user":
+        notificar(conn, user_id, "user", "Nova solicitação de conexão",
+                  "Uma empresa deseja se conectar com você")
+    else:
+        notificar(conn, empresa_id, "empresa", "Nova solicitação de conexão",
+                  "Um investidor deseja se conectar com sua empresa")
+    conn.commit()
+    return conn.execute("SELECT id, data_conexao FROM conexoes WHERE id = ?", (cursor.lastrowid,)).fetchone()
+
+def responder_conexao(conn, conexao_id, resposta):
+    """Atualiza o status da conexão e notifica o investidor"""
+    cursor = conn.execute(
+        "UPDATE conexoes SET status = ? WHERE id = ?",
+        (resposta, conexao_id)
+    )
+    if cursor.rowcount == 0:
+        # Removida pela purga de uma conta excluída depois que a lista foi carregada
+        conn.rollback()
+        raise ErroValidacao("Esta conexão não está mais disponível.")
+    user_id = conn.execute("SELECT user_id FROM conexoes WHERE id = ?", (conexao_id,)).fetchone()[0]
+
+    status_text = "aceita" if resposta == "aceita" else "recusada"
+    notificar(conn, user_id, "user", "Solicitação de conexão respondida",
+              f"Sua solicitação de conexão foi {status_text}")
+    conn.commit()
+    return user_id, status_text
@@ -0,0 +1,279 @@
+"""Cadastro, autenticação, perfil, senha e exclusão de contas"""
+
+import sqlite3
+
+from boss_bridge.banco import CONSULTAS, anexar_arquivo
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.seguranca import HASH_SENHA_AUSENTE, gerar_hash_senha, verificar_senha
+
+# Linhas removidas por transação na purga de contas excluídas
+LOTE_PURGA = 500
+
+# Pesos dos dois dígitos verificadores do CNPJ (módulo 11)
+PESOS_CNPJ = ([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2], [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+
+# Pontuação aceita em CNPJs digitados ou importados (12.345.678/0001-95)
+_PONTUACAO_CNPJ = str.maketrans("", "", "./- ")
+
+def digitos_verificadores_cnpj(base):
+    """Calcula os dois dígitos verificadores a partir dos 12 primeiros dígitos do CNPJ"""
+    digitos = [int(d) for d in base]
+    for pesos in PESOS_CNPJ:
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return f"{digitos[12]}{digitos[13]}"
+
+def normalizar_cnpj(cnpj):
+    """Retorna o CNPJ só com os 14 dígitos; levanta ErroValidacao se não for válido"""
+    digitos = cnpj.strip().translate(_PONTUACAO_CNPJ)
+    if (len(digitos) != 14 or not digitos.isascii() or not digitos.isdigit()
+            or digitos == digitos[0] * 14 or digitos[12:] != digitos_verificadores_cnpj(digitos[:12])):
+        raise ErroValidacao("CNPJ inválido!")
+    return digitos
+
+def validar_cadastro_usuario(nome, email, genero, senha, confirmar_senha):
+    """Confere os campos do formulário de investidor antes do hash e da inserção"""
+    if not nome or not email or not senha or not confirmar_senha:
+        raise ErroValidacao("Todos os campos obrigatórios devem ser preenchidos!")
+    if senha != confirmar_senha:
+        raise ErroValidacao("As senhas não coincidem!")
+    if genero == "Selecione":
+        raise ErroValidacao("Selecione um gênero!")
+
+def validar_cadastro_empresa(cnpj, nome_empresa, razao_social, email, senha, confirmar_senha):
+    """Confere os campos do formulário de empresa antes do hash e da inserção"""
+    if not cnpj or not nome_empresa or not razao_social or not email or not senha or not confirmar_senha:
+        raise ErroValidacao("Todos os campos obrigatórios devem ser preenchidos!")
+    normalizar_cnpj(cnpj)
+    if senha != confirmar_senha:
+        raise ErroValidacao("As senhas não coincidem!")
+
+def validar_troca_senha(senha_atual, senha_nova, confirmar_senha):
+    """Confere os campos do formulário de alteração de senha"""
+    if not senha_atual or not senha_nova or not confirmar_senha:
+        raise ErroValidacao("Todos os campos devem ser preenchidos!")
+    if senha_nova != confirmar_senha:
+        raise ErroValidacao("As novas senhas não coincidem!")
+
+def buscar_credenciais(conn, email):
+    """Retorna (id, tipo, nome, hash da senha) da conta com o email, sem diferenciar maiúsculas, ou None"""
+    return conn.execute(CONSULTAS["credenciais"], (email,)).fetchone()
+
+def obter_hash_senha(conn, conta_id, tipo_conta):
+    """Retorna o hash de senha armazenado da conta"""
+    tabela = "users" if tipo_conta == "user" else "empresas"
+    return conn.execute(f"SELECT senha FROM {tabela} WHERE id = ?", (conta_id,)).fetchone()[0]
+
+def atualizar_hash_senha(conn, conta_id, tipo_conta, hash_antigo, hash_novo):
+    """Grava o hash recalculado se a senha não mudou desde a verificação; retorna se gravou"""
+    tabela = "users" if tipo_conta == "user" else "empresas"
+    cursor = conn.execute(
+        f"UPDATE {tabela} SET senha = ? WHERE id = ? AND senha = ?",
+        (hash_novo, conta_id, hash_antigo)
+    )
+    conn.commit()
+    return cursor.rowcount == 1
+
+def autenticar(conn, email, senha):
+    """Login completo em uma só thread: retorna (id, tipo, nome) ou None se não confere
+
+    Hashes legados ou com custo antigo são recalculados na hora. A interface faz os
+    mesmos passos, mas divide o scrypt entre o pool de senhas e o executor de banco.
+    """
+    conta = buscar_credenciais(conn, email)
+    if not conta:
+        # Mesmo custo de um email cadastrado, para o tempo não revelar quais existem
+        verificar_senha(senha, HASH_SENHA_AUSENTE)
+        return None
+
+    conta_id, tipo_conta, nome, armazenado = conta
+    confere, precisa_recalcular = verificar_senha(senha, armazenado)
+    if not confere:
+        return None
+    if precisa_recalcular:
+        atualizar_hash_senha(conn, conta_id, tipo_conta, armazenado, gerar_hash_senha(senha))
+    return conta_id, tipo_conta, nome
+
+def cadastrar_usuario(conn, nome, email, genero, numero, senha_hash):
+    """Insere um novo investidor e retorna seu id"""
+    if conn.execute(CONSULTAS["email_cadastrado"], (email,)).fetchone():
+        raise ErroValidacao("Este email já está cadastrado!")
+
+    cursor = conn.execute(
+        "INSERT INTO users (nome, email, genero, numero, senha) VALUES (?, ?, ?, ?, ?)",
+        (nome, email, genero, numero, senha_hash)
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+def cadastrar_empresa(conn, cnpj, nome_empresa, razao_social, logradouro, numero_endereco,
+                      complemento, cidade, estado, cep, email, senha_hash):
+    """Insere uma nova empresa e retorna seu id"""
+    # Mesmo formato da importação em massa, para que a checagem de duplicados valha entre os dois
+    cnpj = normalizar_cnpj(cnpj)
+    if conn.execute("SELECT id FROM empresas WHERE cnpj = ?", (cnpj,)).fetchone():
+        raise ErroValidacao("Este CNPJ já está cadastrado!")
+
+    if conn.execute(CONSULTAS["email_cadastrado"], (email,)).fetchone():
+        raise ErroValidacao("Este email já está cadastrado!")
+
+    cursor = conn.execute(
+        """INSERT INTO empresas
+        (cnpj, nome_empresa, razao_social, logradouro, numero_endereco,
+         complemento, cidade, estado, cep, email, senha)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (cnpj, nome_empresa, razao_social, logradouro, numero_endereco,
+         complemento, cidade, estado, cep, email, senha_hash)
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+def consultar_perfil(conn, conta_id, tipo_conta):
+    """Retorna os dados de perfil exibidos na tela Meu Perfil"""
+    if tipo_conta == "user":
+        return conn.execute(
+            "SELECT nome, email, genero, numero, data_criacao FROM users WHERE id = ?",
+            (conta_id,)
+        ).fetchone()
+
+    return conn.execute(
+        """SELECT cnpj, nome_empresa, razao_social, logradouro, numero_endereco,
+        complemento, cidade, estado, cep, email, data_criacao
+        FROM empresas WHERE id = ?""",
+        (conta_id,)
+    ).fetchone()
+
+def alterar_senha(conn, conta_id, tipo_conta, hash_conferido, hash_novo):
+    """Troca a senha se o hash armazenado ainda é o que foi conferido com a senha atual"""
+    if not atualizar_hash_senha(conn, conta_id, tipo_conta, hash_conferido, hash_novo):
+        raise ErroValidacao("A senha foi alterada em outra sessão. Tente novamente.")
+
+def listar_contas_conflitantes(conn):
+    """Retorna (tipo, id, email, tipo e id da conta que ficou com o email) das contas sem acesso por email repetido"""
+    return conn.execute(
+        """SELECT cc.tipo_conta, cc.conta_id, cc.email_normalizado, c.tipo_conta, c.conta_id
+        FROM contas_conflitantes cc
+        LEFT JOIN contas c ON c.email_normalizado = cc.email_normalizado
+        ORDER BY cc.data_registro, cc.tipo_conta, cc.conta_id"""
+    ).fetchall()
+
+def resolver_conta_conflitante(conn, tipo_conta, conta_id, novo_email):
+    """Dá à conta conflitante um email ainda livre e a inclui no índice de login"""
+    if not conn.execute(
+        "SELECT 1 FROM contas_conflitantes WHERE tipo_conta = ? AND conta_id = ?", (tipo_conta, conta_id)
+    ).fetchone():
+        raise ErroValidacao("Esta conta não está entre as conflitantes.")
+    if not novo_email or "@" not in novo_email:
+        raise ErroValidacao("Email inválido!")
+    if conn.execute(CONSULTAS["email_cadastrado"], (novo_email,)).fetchone():
+        raise ErroValidacao("Este email já está cadastrado!")
+
+    tabela = "users" if tipo_conta == "user" else "empresas"
+    try:
+        # A conta não tem linha em contas: o gatilho de UPDATE do email não a alcança
+        conn.execute(f"UPDATE {tabela} SET email = ? WHERE id = ?", (novo_email, conta_id))
+        conn.execute(
+            "INSERT INTO contas (email_normalizado, tipo_conta, conta_id) VALUES (lower(trim(?)), ?, ?)",
+            (novo_email, tipo_conta, conta_id)
+        )
+        conn.execute("DELETE FROM contas_conflitantes WHERE tipo_conta = ? AND conta_id = ?", (tipo_conta, conta_id))
+        conn.commit()
+    except sqlite3.IntegrityError:
+        # Outra conta conflitante usa este mesmo email
+        conn.rollback()
+        raise ErroValidacao("Este email já está cadastrado!")
+    except BaseException:
+        conn.rollback()
+        raise
+
+def listar_cnpjs_conflitantes(conn):
+    """Retorna (id, nome, CNPJ guardado, id da empresa que ficou com o CNPJ) das empresas com CNPJ inválido ou repetido"""
+    return conn.execute(
+        """SELECT cc.empresa_id, e.nome_empresa, cc.cnpj, d.id
+        FROM cnpjs_conflitantes cc
+        JOIN empresas e ON e.id = cc.empresa_id
+        LEFT JOIN empresas d ON d.cnpj = cc.cnpj_normalizado
+        ORDER BY cc.empresa_id"""
+    ).fetchall()
+
+def resolver_cnpj_conflitante(conn, empresa_id, novo_cnpj):
+    """Grava na empresa conflitante um CNPJ válido e ainda livre, tirando-a do registro"""
+    if not conn.execute("SELECT 1 FROM cnpjs_conflitantes WHERE empresa_id = ?", (empresa_id,)).fetchone():
+        raise ErroValidacao("Esta empresa não está entre as conflitantes.")
+    cnpj = normalizar_cnpj(novo_cnpj)
+    if conn.execute("SELECT 1 FROM empresas WHERE cnpj = ?", (cnpj,)).fetchone():
+        raise ErroValidacao("Este CNPJ já está cadastrado!")
+
+    try:
+        conn.execute("UPDATE empresas SET cnpj = ? WHERE id = ?", (cnpj, empresa_id))
+        conn.execute("DELETE FROM cnpjs_conflitantes WHERE empresa_id = ?", (empresa_id,))
+        conn.commit()
+    except sqlite3.IntegrityError:
+        # Cadastrado por outra sessão depois da checagem
+        conn.rollback()
+        raise ErroValidacao("Este CNPJ já está cadastrado!")
+    except BaseException:
+        conn.rollback()
+        raise
+
+def excluir_conta(conn, conta_id, tipo_conta):
+    """Marca a conta como excluída; os dados relacionados são removidos depois pela ManutencaoBanco"""
+    tabela = "users" if tipo_conta == "user" else "empresas"
+    conn.execute(
+        f"UPDATE {tabela} SET excluida_em = CURRENT_TIMESTAMP WHERE id = ? AND excluida_em IS NULL",
+        (conta_id,)
+    )
+    conn.commit()
+
+def _remover_lote(conn, tabela, selecao, parametros, limite):
+    cursor = conn.execute(f"DELETE FROM {tabela} WHERE id IN ({selecao} LIMIT ?)", (*parametros, limite))
+    return cursor.rowcount
+
+def purgar_conta_excluida(conn, limite=LOTE_PURGA):
+    """Remove um lote de até `limite` linhas de uma conta excluída e retorna quantas removeu (0: nada pendente)
+
+    Históricos longos saem primeiro, em lotes; a exclusão final da conta leva pelas
+    chaves estrangeiras (ON DELETE CASCADE) o que ainda restar, e os gatilhos limpam
+    contas, contadores e índices de busca. Cada chamada é uma transação curta.
+    """
+    conta = conn.execute(
+        "SELECT 'user', id FROM users WHERE excluida_em IS NOT NULL LIMIT 1"
+    ).fetchone() or conn.execute(
+        "SELECT 'empresa', id FROM empresas WHERE excluida_em IS NOT NULL LIMIT 1"
+    ).fetchone()
+    if not conta:
+        return 0
+
+    tipo_conta, conta_id = conta
+    tabela, coluna = ("users", "user_id") if tipo_conta == "user" else ("empresas", "empresa_id")
+    etapas = [
+        ("mensagens", f"""SELECT m.id FROM conversas cv JOIN mensagens m ON m.conversa_id = cv.id
+                         WHERE cv.{coluna} = ?""", (conta_id,)),
+        ("mensagens", """SELECT id FROM mensagens
+                         WHERE remetente_id = ? AND tipo_remetente = ? AND conversa_id IS NULL""",
+         (conta_id, tipo_conta)),
+        ("mensagens", """SELECT id FROM mensagens
+                         WHERE destinatario_id = ? AND tipo_destinatario = ? AND conversa_id IS NULL""",
+         (conta_id, tipo_conta)),
+        ("conversas", f"SELECT id FROM conversas WHERE {coluna} = ?", (conta_id,)),
+        ("conexoes", f"SELECT id FROM conexoes WHERE {coluna} = ?", (conta_id,)),
+        ("notificacoes", "SELECT id FROM notificacoes WHERE usuario_id = ? AND tipo_usuario = ?",
+         (conta_id, tipo_conta)),
+    ]
+    if anexar_arquivo(conn):
+        # As cascatas não alcançam o banco de arquivo: as mensagens arquivadas saem antes das conversas
+        etapas.insert(3, ("arquivo.mensagens", f"""SELECT m.id FROM conversas cv JOIN arquivo.mensagens m
+                                                  ON m.conversa_id = cv.id WHERE cv.{coluna} = ?""", (conta_id,)))
+    try:
+        for tabela_etapa, selecao, parametros in etapas:
+            removidas = _remover_lote(conn, tabela_etapa, selecao, parametros, limite)
+            if removidas:
+                conn.commit()
+                return removidas
+
+        conn.execute(f"DELETE FROM {tabela} WHERE id = ?", (conta_id,))
+        conn.commit()
+        return 1
+    except BaseException:
+        conn.rollback()
+        raise
@@ -0,0 +1,43 @@
+"""Busca de empresas (para investidores) e de investidores (para empresas)"""
+
+import re
+import unicodedata
+
+from boss_bridge.banco import CONSULTAS
+
+# Quantidade máxima de resultados percorridos por uma busca (somando todas as páginas)
+LIMITE_BUSCA = 500
+
+def termos_busca(texto):
+    """Quebra o texto em termos minúsculos e sem acentos, como o tokenizador unicode61 dos índices FTS"""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.findall(r"[^\W_]+", texto)
+
+def expressao_fts(consulta):
+    """Converte o texto digitado em uma consulta FTS5 em que cada termo é um prefixo obrigatório"""
+    return " ".join(f'"{termo}"*' for termo in termos_busca(consulta))
+
+def corresponde_termos(textos, termos):
+    """Reproduz em memória o MATCH da busca: cada termo é prefixo de alguma palavra dos textos"""
+    palavras = [p for texto in textos if texto for p in termos_busca(texto)]
+    return all(any(p.startswith(termo) for p in palavras) for termo in termos)
+
+def corresponde_busca(tipo_conta, linha, termos):
+    """Verifica se uma linha de resultado de buscar_contas atende aos termos"""
+    if tipo_conta == "user":
+        textos = (linha[1], linha[5], linha[2])  # nome_empresa, razao_social, email
+    else:
+        textos = (linha[1], linha[2])            # nome, email
+    return corresponde_termos(textos, termos)
+
+def buscar_contas(conn, tipo_conta, consulta, offset, limite):
+    """Busca uma página de empresas (para investidores) ou investidores (para empresas)"""
+    expressao = expressao_fts(consulta)
+    limite = min(limite, LIMITE_BUSCA - offset)
+    if not expressao or limite <= 0:
+        return []
+
+    if tipo_conta == "user":
+        return conn.execute(CONSULTAS["busca_empresas"], (expressao, limite, offset)).fetchall()
+    return conn.execute(CONSULTAS["busca_users"], (expressao, limite, offset)).fetchall()
@@ -0,0 +1,140 @@
+"""Exportação em fluxo de empresas, investidores, conexões e mensagens para CSV ou JSONL"""
+
+import csv
+import heapq
+import itertools
+import json
+from operator import itemgetter
+
+from boss_bridge.banco import anexar_arquivo
+from boss_bridge.erros import ErroValidacao
+
+# Linhas por fetchmany: a memória usada não depende do tamanho da tabela
+LOTE_EXPORTACAO = 5000
+
+FORMATOS = ("csv", "jsonl")
+
+# Colunas exportadas e coluna de data de cada tabela; hashes de senha nunca saem do banco
+TABELAS_EXPORTACAO = {
+    "empresas": (
+        ("id", "cnpj", "nome_empresa", "razao_social", "logradouro", "numero_endereco", "complemento",
+         "cidade", "estado", "cep", "email", "data_criacao"),
+        "data_criacao",
+    ),
+    "users": (
+        ("id", "nome", "email", "genero", "numero", "data_criacao"),
+        "data_criacao",
+    ),
+    "conexoes": (
+        ("id", "user_id", "empresa_id", "data_conexao", "status"),
+        "data_conexao",
+    ),
+    "mensagens": (
+        ("id", "conversa_id", "remetente_id", "tipo_remetente", "destinatario_id", "tipo_destinatario",
+         "mensagem", "data_envio", "lida"),
+        "data_envio",
+    ),
+}
+
+# Tabelas com linhas antigas movidas para o banco de arquivo (arquivar_mensagens)
+TABELAS_ARQUIVADAS = ("mensagens",)
+
+def consulta_exportacao(tabela, desde=None, ate=None, status=None, conta=None, apos_id=None, banco="main"):
+    """Monta (sql, parâmetros, colunas) da exportação, sempre em ordem crescente de id
+
+    `desde` e `ate` limitam a coluna de data (inclusive), `status` vale para conexões,
+    `conta` é um par (id, tipo) e `apos_id` é a marca da exportação incremental anterior.
+    `banco` escolhe entre o principal e o de arquivo (`arquivo`, já anexado).
+    """
+    if tabela not in TABELAS_EXPORTACAO:
+        raise ErroValidacao(f"Tabela desconhecida: {tabela} (opções: {', '.join(TABELAS_EXPORTACAO)})")
+    colunas, coluna_data = TABELAS_EXPORTACAO[tabela]
+
+    condicoes, parametros = [], []
+    if apos_id is not None:
+        condicoes.append("id > ?")
+        parametros.append(apos_id)
+    if desde:
+        condicoes.append(f"{coluna_data} >= ?")
+        parametros.append(desde)
+    if ate:
+        # Uma data sem hora inclui o dia inteiro
+        condicoes.append(f"{coluna_data} <= ?")
+        parametros.append(ate if len(ate) > 10 else f"{ate} 23:59:59")
+    if status:
+        if tabela != "conexoes":
+            raise ErroValidacao("O filtro de status vale apenas para conexões")
+        condicoes.append("status = ?")
+        parametros.append(status)
+    if conta:
+        conta_id, tipo_conta = conta
+        if tabela in ("empresas", "users"):
+            if tipo_conta != ("user" if tabela == "users" else "empresa"):
+                raise ErroValidacao(f"A conta informada não é da tabela {tabela}")
+            condicoes.append("id = ?")
+            parametros.append(conta_id)
+        elif tabela == "conexoes":
+            condicoes.append("user_id = ?" if tipo_conta == "user" else "empresa_id = ?")
+            parametros.append(conta_id)
+        else:
+            condicoes.append("((remetente_id = ? AND tipo_remetente = ?) OR (destinatario_id = ? AND tipo_destinatario = ?))")
+            parametros.extend([conta_id, tipo_conta, conta_id, tipo_conta])
+
+    sql = f"SELECT {', '.join(colunas)} FROM {banco}.{tabela}"
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    return sql + " ORDER BY id", parametros, colunas
+
+def exportar(conn, tabela, saida, formato="csv", progresso=None, lote=LOTE_EXPORTACAO, **filtros):
+    """Grava a tabela filtrada no arquivo de texto `saida` e retorna (linhas, maior id exportado)
+
+    O maior id é a marca para a próxima exportação incremental (apos_id); sem linhas,
+    retorna a própria marca recebida. progresso(linhas) é chamado a cada lote. Mensagens
+    já arquivadas são exportadas junto, na mesma ordem de id.
+    """
+    if formato not in FORMATOS:
+        raise ErroValidacao(f"Formato desconhecido: {formato} (opções: {', '.join(FORMATOS)})")
+    sql, parametros, colunas = consulta_exportacao(tabela, **filtros)
+
+    if formato == "csv":
+        escritor = csv.writer(saida)
+        escritor.writerow(colunas)
+        gravar = escritor.writerows
+    else:
+        def gravar(linhas):
+            saida.writelines(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False) + "\n" for linha in linhas)
+
+    cursores = [conn.execute(sql, parametros)]
+    # Mensagens antigas ficam no banco de arquivo: as duas fontes, cada uma já em ordem de id,
+    # são intercaladas em fluxo, sem ordenar a união inteira
+    if tabela in TABELAS_ARQUIVADAS and anexar_arquivo(conn):
+        sql_arquivo = consulta_exportacao(tabela, banco="arquivo", **filtros)[0]
+        cursores.append(conn.execute(sql_arquivo, parametros))
+    if len(cursores) == 1:
+        linhas_exportadas = cursores[0]
+    else:
+        linhas_exportadas = _sem_repetidas(heapq.merge(*cursores, key=itemgetter(0)))
+
+    total, ultimo_id = 0, filtros.get("apos_id")
+    try:
+        while True:
+            linhas = list(itertools.islice(linhas_exportadas, lote))
+            if not linhas:
+                break
+            gravar(linhas)
+            total += len(linhas)
+            ultimo_id = linhas[-1][0]
+            if progresso:
+                progresso(total)
+    finally:
+        for cursor in cursores:
+            cursor.close()
+    return total, ultimo_id
+
+def _sem_repetidas(linhas):
+    # Um lote de arquivamento interrompido entre a cópia e a remoção aparece nos dois bancos
+    anterior = None
+    for linha in linhas:
+        if linha[0] != anterior:
+            anterior = linha[0]
+            yield linha
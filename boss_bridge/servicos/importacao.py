@@ -0,0 +1,182 @@
+"""Importação em massa de empresas a partir de CSV"""
+
+import csv
+import json
+import os
+import secrets
+
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.seguranca import gerar_hash_senha
+from boss_bridge.servicos.contas import normalizar_cnpj
+
+# Linhas por transação: poucas transações grandes, sem segurar a escrita do banco por muito tempo
+LOTE_IMPORTACAO = 5000
+
+COLUNAS_OBRIGATORIAS = ("cnpj", "nome_empresa", "razao_social", "email")
+COLUNAS_OPCIONAIS = ("logradouro", "numero_endereco", "complemento", "cidade", "estado", "cep")
+COLUNAS_EMPRESA = COLUNAS_OBRIGATORIAS + COLUNAS_OPCIONAIS
+
+# Cada empresa importada recebe uma senha aleatória própria (~128 bits). Com essa entropia
+# o custo do scrypt não protege nada, então o hash é barato; como o custo difere de
+# CUSTO_SCRYPT, ele é recalculado com o custo normal no primeiro login.
+BYTES_SENHA_GERADA = 16
+CUSTO_SCRYPT_SENHA_GERADA = {"ln": 6, "r": 8, "p": 1}
+
+INSERIR_EMPRESA = """INSERT INTO empresas
+    (cnpj, nome_empresa, razao_social, email, logradouro, numero_endereco,
+     complemento, cidade, estado, cep, senha)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Duplicados de um lote inteiro em uma consulta por coluna, cada valor pelo índice único
+CNPJS_EXISTENTES = """
+    SELECT value FROM json_each(?)
+    WHERE EXISTS (SELECT 1 FROM empresas WHERE cnpj = value)
+"""
+EMAILS_EXISTENTES = """
+    SELECT value FROM json_each(?)
+    WHERE EXISTS (SELECT 1 FROM contas WHERE email_normalizado = lower(trim(value)))
+"""
+
+def ler_csv_empresas(arquivo):
+    """Gera (número da linha, {coluna: valor}) de um CSV aberto, separado por vírgula ou ponto e vírgula"""
+    amostra = arquivo.read(8192)
+    arquivo.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=",;")
+    except csv.Error:
+        dialeto = csv.excel
+
+    leitor = csv.DictReader(arquivo, dialect=dialeto)
+    cabecalho = [(coluna or "").strip().lower() for coluna in leitor.fieldnames or []]
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in cabecalho]
+    if faltando:
+        raise ErroValidacao(f"Colunas obrigatórias ausentes no CSV: {', '.join(faltando)}")
+    leitor.fieldnames = cabecalho
+
+    for campos in leitor:
+        yield leitor.line_num, campos
+
+def preparar_empresa(campos):
+    """Normaliza uma linha do CSV na tupla de INSERIR_EMPRESA, ainda sem a senha"""
+    valores = [(campos.get(coluna) or "").strip() for coluna in COLUNAS_EMPRESA]
+    vazios = [coluna for coluna, valor in zip(COLUNAS_OBRIGATORIAS, valores) if not valor]
+    if vazios:
+        raise ErroValidacao(f"Campos obrigatórios vazios: {', '.join(vazios)}")
+    valores[0] = normalizar_cnpj(valores[0])
+    if "@" not in valores[3]:
+        raise ErroValidacao("Email inválido!")
+    return valores
+
+def gerar_senha_inicial():
+    """Retorna (senha, hash) de uma senha aleatória para uma empresa importada"""
+    senha = secrets.token_urlsafe(BYTES_SENHA_GERADA)
+    return senha, gerar_hash_senha(senha, CUSTO_SCRYPT_SENHA_GERADA)
+
+def importar_empresas(conn, linhas, credenciais, rejeitar=None, progresso=None, lote=LOTE_IMPORTACAO):
+    """Insere as empresas de `linhas` (pares de ler_csv_empresas) e retorna (importadas, rejeitadas)
+
+    Cada empresa recebe uma senha aleatória própria, entregue a credenciais(número, cnpj,
+    email, senha) depois do commit do lote. Linhas inválidas ou com CNPJ/email já
+    cadastrados (no banco ou antes no próprio arquivo) vão para rejeitar(número, campos,
+    motivo) sem interromper a importação; progresso(lidas, importadas, rejeitadas) é
+    chamado a cada transação.
+    """
+    importadas = rejeitadas = 0
+    cnpjs_vistos, emails_vistos = set(), set()
+    pendentes = []
+
+    def rejeitar_linha(numero, campos, motivo):
+        nonlocal rejeitadas
+        rejeitadas += 1
+        if rejeitar:
+            rejeitar(numero, campos, motivo)
+
+    def gravar():
+        nonlocal importadas
+        # A escrita fica reservada desde a checagem: nenhuma outra sessão cadastra o
+        # mesmo CNPJ ou email entre ela e o INSERT
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cnpjs = {linha[0] for linha in conn.execute(
+                CNPJS_EXISTENTES, (json.dumps([valores[0] for _, _, valores, _ in pendentes]),))}
+            emails = {linha[0] for linha in conn.execute(
+                EMAILS_EXISTENTES, (json.dumps([valores[3] for _, _, valores, _ in pendentes]),))}
+            novas, entregues = [], []
+            for numero, campos, valores, (senha, senha_hash) in pendentes:
+                if valores[0] in cnpjs:
+                    rejeitar_linha(numero, campos, "Este CNPJ já está cadastrado!")
+                elif valores[3] in emails:
+                    rejeitar_linha(numero, campos, "Este email já está cadastrado!")
+                else:
+                    novas.append((*valores, senha_hash))
+                    entregues.append((numero, valores[0], valores[3], senha))
+            conn.executemany(INSERIR_EMPRESA, novas)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        for entregue in entregues:
+            credenciais(*entregue)
+        importadas += len(novas)
+        pendentes.clear()
+        if progresso:
+            progresso(importadas + rejeitadas, importadas, rejeitadas)
+
+    for numero, campos in linhas:
+        try:
+            valores = preparar_empresa(campos)
+        except ErroValidacao as e:
+            rejeitar_linha(numero, campos, str(e))
+            continue
+
+        # Duplicados dentro do arquivo; a comparação de emails é a mesma de contas
+        email = valores[3].lower()
+        if valores[0] in cnpjs_vistos:
+            rejeitar_linha(numero, campos, "CNPJ repetido no arquivo")
+            continue
+        if email in emails_vistos:
+            rejeitar_linha(numero, campos, "Email repetido no arquivo")
+            continue
+        cnpjs_vistos.add(valores[0])
+        emails_vistos.add(email)
+
+        # O hash é calculado fora da transação, que só reserva a escrita para checar e inserir
+        pendentes.append((numero, campos, valores, gerar_senha_inicial()))
+        if len(pendentes) >= lote:
+            gravar()
+
+    if pendentes:
+        gravar()
+    return importadas, rejeitadas
+
+def abrir_arquivo_credenciais(caminho):
+    """Cria o arquivo de senhas iniciais legível só pelo dono; recusa sobrescrever um existente"""
+    descritor = os.open(caminho, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    return os.fdopen(descritor, "w", newline="", encoding="utf-8")
+
+def importar_csv_empresas(conn, caminho, caminho_credenciais, caminho_rejeitados=None, progresso=None):
+    """Importa o arquivo CSV em `caminho`
+
+    As senhas iniciais vão para `caminho_credenciais` (criado com permissão 0600) e as
+    linhas rejeitadas, com o motivo, para `caminho_rejeitados`.
+    """
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo, \
+            abrir_arquivo_credenciais(caminho_credenciais) as saida_credenciais:
+        escritor_credenciais = csv.writer(saida_credenciais)
+        escritor_credenciais.writerow(["linha", "cnpj", "email", "senha"])
+
+        def credenciais(numero, cnpj, email, senha):
+            escritor_credenciais.writerow([numero, cnpj, email, senha])
+
+        if not caminho_rejeitados:
+            resultado = importar_empresas(conn, ler_csv_empresas(arquivo), credenciais, progresso=progresso)
+        else:
+            with open(caminho_rejeitados, "w", newline="", encoding="utf-8") as saida:
+                escritor = csv.writer(saida)
+                escritor.writerow(["linha", "motivo", *COLUNAS_EMPRESA])
+
+                def rejeitar(numero, campos, motivo):
+                    escritor.writerow([numero, motivo, *(campos.get(coluna) or "" for coluna in COLUNAS_EMPRESA)])
+
+                resultado = importar_empresas(conn, ler_csv_empresas(arquivo), credenciais, rejeitar, progresso)
+    return resultado
@@ -0,0 +1,155 @@
+"""Conversas e mensagens entre as partes de uma conexão"""
+
+import json
+import sqlite3
+
+from boss_bridge.banco import CONSULTAS, anexar_arquivo
+from boss_bridge.erros import ErroValidacao
+
+# Mensagens lidas há mais deste prazo vão para o banco de arquivo, em lotes, pela manutenção em segundo plano
+ARQUIVAMENTO_MENSAGENS_DIAS = 180
+LOTE_ARQUIVAMENTO = 1000
+
+COLUNAS_MENSAGEM = ("id, remetente_id, destinatario_id, tipo_remetente, tipo_destinatario, "
+                    "mensagem, data_envio, lida, conversa_id")
+
+# A cópia é idempotente: um lote copiado mas ainda não removido do principal é copiado de novo sem duplicar
+COPIAR_PARA_ARQUIVO = f"""
+    INSERT OR IGNORE INTO arquivo.mensagens ({COLUNAS_MENSAGEM})
+    SELECT {COLUNAS_MENSAGEM} FROM main.mensagens WHERE id IN (SELECT value FROM json_each(?))
+"""
+REMOVER_ARQUIVADAS = "DELETE FROM main.mensagens WHERE id IN (SELECT value FROM json_each(?))"
+AVANCAR_ARQUIVADA_ATE = """
+    UPDATE conversas SET arquivada_ate = ?
+    WHERE id = ? AND (arquivada_ate IS NULL OR arquivada_ate < ?)
+"""
+
+# Histórico arquivado, no mesmo formato e ordem de mensagens_recentes/mensagens_anteriores
+MENSAGENS_ARQUIVADAS_RECENTES = """
+    SELECT id, remetente_id, tipo_remetente, mensagem, data_envio
+    FROM arquivo.mensagens
+    WHERE conversa_id = ?
+    ORDER BY data_envio DESC, id DESC
+    LIMIT ?
+"""
+MENSAGENS_ARQUIVADAS_ANTERIORES = """
+    SELECT id, remetente_id, tipo_remetente, mensagem, data_envio
+    FROM arquivo.mensagens
+    WHERE conversa_id = ? AND (data_envio, id) < (?, ?)
+    ORDER BY data_envio DESC, id DESC
+    LIMIT ?
+"""
+
+def listar_conversas(conn, conta_id, tipo_conta, offset, limite):
+    """Retorna uma página de (id do contato, nome, última mensagem, data, id da conversa)"""
+    if tipo_conta == "user":
+        return conn.execute(CONSULTAS["conversas_user"], (conta_id, limite, offset)).fetchall()
+    return conn.execute(CONSULTAS["conversas_empresa"], (conta_id, limite, offset)).fetchall()
+
+def obter_conversa(conn, conexao_id):
+    """Retorna o id da conversa do par da conexão, criando-a se ainda não existir"""
+    conexao = conn.execute("SELECT user_id, empresa_id FROM conexoes WHERE id = ?", (conexao_id,)).fetchone()
+    if not conexao:
+        # Removida pela purga de uma conta excluída depois que a lista foi carregada
+        raise ErroValidacao("Esta conexão não está mais disponível.")
+    user_id, empresa_id = conexao
+    try:
+        conn.execute("INSERT OR IGNORE INTO conversas (user_id, empresa_id) VALUES (?, ?)", (user_id, empresa_id))
+    except sqlite3.IntegrityError:
+        # Chave estrangeira: a purga removeu a conta entre a consulta e a inserção
+        conn.rollback()
+        raise ErroValidacao("Esta conexão não está mais disponível.")
+    conn.commit()
+    return conn.execute(
+        "SELECT id FROM conversas WHERE user_id = ? AND empresa_id = ?", (user_id, empresa_id)
+    ).fetchone()[0]
+
+def listar_mensagens(conn, conversa_id, antes, limite):
+    """Retorna, em ordem cronológica, até `limite` mensagens anteriores a antes=(data_envio, id)
+
+    Com antes=None retorna as mais recentes. O custo não depende do tamanho do histórico.
+    Ao rolar além das mensagens do banco principal, a página é completada com as do
+    banco de arquivo, anexado só nesse momento.
+    """
+    if antes is None:
+        linhas = conn.execute(CONSULTAS["mensagens_recentes"], (conversa_id, limite)).fetchall()
+    else:
+        linhas = conn.execute(CONSULTAS["mensagens_anteriores"], (conversa_id, *antes, limite)).fetchall()
+
+    # O arquivo só tem mensagens até arquivada_ate: se a página cheia termina depois disso, está completa
+    conversa = conn.execute("SELECT arquivada_ate FROM conversas WHERE id = ?", (conversa_id,)).fetchone()
+    arquivada_ate = conversa[0] if conversa else None
+    if arquivada_ate and (len(linhas) < limite or linhas[-1][4] <= arquivada_ate) and anexar_arquivo(conn):
+        if antes is None:
+            arquivadas = conn.execute(MENSAGENS_ARQUIVADAS_RECENTES, (conversa_id, limite)).fetchall()
+        else:
+            arquivadas = conn.execute(MENSAGENS_ARQUIVADAS_ANTERIORES, (conversa_id, *antes, limite)).fetchall()
+        # Mensagens lidas mais antigas que uma não lida já foram arquivadas: as duas fontes se intercalam
+        vistas = {linha[0] for linha in linhas}
+        linhas.extend(linha for linha in arquivadas if linha[0] not in vistas)
+        linhas.sort(key=lambda linha: (linha[4], linha[0]), reverse=True)
+        del linhas[limite:]
+
+    linhas.reverse()
+    return linhas
+
+def enviar_mensagem(conn, conversa_id, conta_id, tipo_conta, texto):
+    """Grava a mensagem para a outra parte da conversa e retorna (id, data_envio)"""
+    conversa = conn.execute("SELECT user_id, empresa_id FROM conversas WHERE id = ?", (conversa_id,)).fetchone()
+    if not conversa:
+        # A outra parte excluiu a conta e a conversa já foi removida
+        raise ErroValidacao("Esta conversa não está mais disponível.")
+    user_id, empresa_id = conversa
+    if tipo_conta == "user":
+        destinatario_id, tipo_destinatario = empresa_id, "empresa"
+    else:
+        destinatario_id, tipo_destinatario = user_id, "user"
+
+    cursor = conn.execute(
+        """INSERT INTO mensagens
+        (conversa_id, remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, mensagem)
+        VALUES (?, ?, ?, ?, ?, ?)""",
+        (conversa_id, conta_id, tipo_conta, destinatario_id, tipo_destinatario, texto)
+    )
+    conn.commit()
+    return conn.execute("SELECT id, data_envio FROM mensagens WHERE id = ?", (cursor.lastrowid,)).fetchone()
+
+def marcar_mensagens_lidas(conn, conversa_id, conta_id, tipo_conta):
+    """Marca como lidas as mensagens da conversa recebidas pela conta e retorna quantas eram"""
+    cursor = conn.execute(
+        """UPDATE mensagens SET lida = 1
+        WHERE destinatario_id = ? AND tipo_destinatario = ? AND lida = 0 AND conversa_id = ?""",
+        (conta_id, tipo_conta, conversa_id)
+    )
+    conn.commit()
+    return cursor.rowcount
+
+def arquivar_mensagens(conn, dias=ARQUIVAMENTO_MENSAGENS_DIAS, limite=LOTE_ARQUIVAMENTO):
+    """Move para o banco de arquivo um lote de mensagens lidas há mais de `dias` e retorna quantas moveu
+
+    Cópia e remoção são transações separadas (o WAL não garante um commit atômico entre
+    dois bancos): uma interrupção entre elas deixa o lote nos dois, nunca em nenhum.
+    """
+    lote = conn.execute(CONSULTAS["mensagens_arquivaveis"], (f"-{dias} days", limite)).fetchall()
+    if not lote:
+        return 0
+    anexar_arquivo(conn, criar=True)
+    ids = json.dumps([mensagem_id for mensagem_id, _, _ in lote])
+
+    arquivada_ate = {}
+    for _, conversa_id, data_envio in lote:
+        arquivada_ate[conversa_id] = max(data_envio, arquivada_ate.get(conversa_id, data_envio))
+
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(COPIAR_PARA_ARQUIVO, (ids,))
+        conn.commit()
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(AVANCAR_ARQUIVADA_ATE, [(data, conversa_id, data) for conversa_id, data in arquivada_ate.items()])
+        cursor = conn.execute(REMOVER_ARQUIVADAS, (ids,))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return cursor.rowcount
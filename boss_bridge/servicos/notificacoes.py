@@ -0,0 +1,45 @@
+"""Notificações e o resumo exibido no dashboard"""
+
+from boss_bridge.banco import CONSULTAS
+
+# Notificações lidas são removidas depois deste prazo, em lotes, pela manutenção em segundo plano
+RETENCAO_NOTIFICACOES_DIAS = 90
+LOTE_RETENCAO = 1000
+
+def notificar(conn, usuario_id, tipo_usuario, titulo, mensagem):
+    """Cria uma notificação na transação em andamento (quem chama faz o commit)"""
+    conn.execute(
+        "INSERT INTO notificacoes (usuario_id, tipo_usuario, titulo, mensagem) VALUES (?, ?, ?, ?)",
+        (usuario_id, tipo_usuario, titulo, mensagem)
+    )
+
+def consultar_dashboard(conn, conta_id, tipo_conta):
+    """Retorna ((conexões, mensagens, notificações), atividades recentes) da conta"""
+    contadores = conn.execute(CONSULTAS["contadores"], (tipo_conta, conta_id)).fetchone()
+    if tipo_conta == "user":
+        atividades = conn.execute(CONSULTAS["atividades_user"], (conta_id,)).fetchall()
+    else:
+        atividades = conn.execute(CONSULTAS["atividades_empresa"], (conta_id,)).fetchall()
+    return tuple(contadores or (0, 0, 0)), atividades
+
+def listar_notificacoes(conn, conta_id, tipo_conta, antes_id, limite):
+    """Retorna uma página de (id, título, mensagem, data, lida), da mais nova para a mais antiga
+
+    Com antes_id=None retorna as mais recentes; senão, as anteriores a essa notificação.
+    O custo não depende de quantas notificações a conta acumulou.
+    """
+    if antes_id is None:
+        return conn.execute(CONSULTAS["notificacoes_recentes"], (conta_id, tipo_conta, limite)).fetchall()
+    return conn.execute(CONSULTAS["notificacoes_anteriores"], (conta_id, tipo_conta, antes_id, limite)).fetchall()
+
+def marcar_notificacoes_lidas(conn, conta_id, tipo_conta):
+    """Marca todas as notificações da conta como lidas e retorna quantas eram"""
+    cursor = conn.execute(CONSULTAS["marcar_notificacoes_lidas"], (conta_id, tipo_conta))
+    conn.commit()
+    return cursor.rowcount
+
+def expirar_notificacoes(conn, dias=RETENCAO_NOTIFICACOES_DIAS, limite=LOTE_RETENCAO):
+    """Remove um lote de notificações lidas há mais de `dias` e retorna quantas removeu"""
+    cursor = conn.execute(CONSULTAS["notificacoes_expiradas"], (f"-{dias} days", limite))
+    conn.commit()
+    return cursor.rowcount
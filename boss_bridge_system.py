@@ -1,35 +1,867 @@
+import time
+INICIO_PROCESSO = time.perf_counter()  # referência da linha do tempo de --startup-trace
+
 import customtkinter as ctk
-from tkinter import ttk, messagebox
-import sqlite3
-import hashlib
-import os
+from tkinter import messagebox
 import sys
-from PIL import Image, ImageTk
-import datetime
 import traceback
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from boss_bridge.banco import CheckpointWAL, ExecutorBanco, aplicar_migracoes, caminho_banco
+from boss_bridge.cache import CacheBusca
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.eventos import (
+    EVENTO_CONEXAO_ACEITA, EVENTO_CONEXAO_RECUSADA, EVENTO_CONEXAO_SOLICITADA, EVENTO_MENSAGEM_ENVIADA,
+    EVENTO_MENSAGENS_LIDAS, EVENTO_NOTIFICACOES_LIDAS, BarramentoEventos
+)
+from boss_bridge.manutencao import ManutencaoBanco
+from boss_bridge.seguranca import HASH_SENHA_AUSENTE, gerar_hash_senha, trocar_hash_senha, verificar_senha
+from boss_bridge.servicos.contas import (
+    alterar_senha, atualizar_hash_senha, buscar_credenciais, cadastrar_empresa, cadastrar_usuario,
+    consultar_perfil, excluir_conta, listar_cnpjs_conflitantes, listar_contas_conflitantes, obter_hash_senha,
+    validar_cadastro_empresa, validar_cadastro_usuario, validar_troca_senha
+)
+from boss_bridge.servicos.conexoes import (
+    criar_conexao, listar_conexoes, listar_status_conexoes, partes_conexao, responder_conexao
+)
+from boss_bridge.servicos.diretorio import LIMITE_BUSCA, buscar_contas, corresponde_busca, termos_busca
+from boss_bridge.servicos.mensagens import (
+    enviar_mensagem, listar_conversas, listar_mensagens, marcar_mensagens_lidas, obter_conversa
+)
+from boss_bridge.servicos.notificacoes import consultar_dashboard, listar_notificacoes, marcar_notificacoes_lidas
 
 # Configuração do tema da aplicação
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+class RegistroInicializacao:
+    """Linha do tempo das fases da inicialização, exibida com --startup-trace
+
+    Cada marca fecha uma fase; a duração conta desde a marca anterior da mesma trilha,
+    já que a interface e o banco inicializam em paralelo.
+    """
+    
+    def __init__(self, inicio=None, ativo=False):
+        self.inicio = inicio or time.perf_counter()
+        self.ativo = ativo
+        self._trava = threading.Lock()
+        self._anterior = {}  # trilha -> instante da última marca
+    
+    def iniciar_trilha(self, trilha):
+        """Começa a contar a primeira fase de uma trilha a partir de agora"""
+        with self._trava:
+            self._anterior[trilha] = time.perf_counter()
+    
+    def marcar(self, fase, trilha="interface"):
+        """Registra o fim de uma fase (pode ser chamado de qualquer thread)"""
+        if not self.ativo:
+            return
+        agora = time.perf_counter()
+        with self._trava:
+            anterior = self._anterior.get(trilha, self.inicio)
+            self._anterior[trilha] = agora
+            print(f"[startup] {(agora - self.inicio) * 1000:8.1f} ms  {trilha:<9}  "
+                  f"{fase:<24} {(agora - anterior) * 1000:8.1f} ms")
+
+# Intervalo (em ms) com que a interface verifica operações de banco concluídas
+INTERVALO_VERIFICACAO_MS = 15
+
+# Pausa na digitação (em ms) antes de disparar a busca incremental
+ATRASO_BUSCA_MS = 250
+
+# Componentes de interface
+
+# Linhas carregadas por página nas listas virtualizadas
+TAMANHO_PAGINA = 50
+
+class FontePaginada:
+    """Linhas de uma lista carregadas sob demanda, uma página por vez, pelo executor de banco"""
+
+    def __init__(self, executar, funcao, *args, tamanho_pagina=TAMANHO_PAGINA, cancelar=None, cache=None):
+        self.executar = executar  # BossBridgeSystem.executar_em_segundo_plano
+        self.funcao = funcao      # funcao(conn, *args, posicao, limite) -> lista de linhas
+        self.args = args
+        self.tamanho_pagina = tamanho_pagina
+        self.cancelar_operacao = cancelar  # BossBridgeSystem.cancelar_em_segundo_plano
+        self.cache = cache                 # CacheBusca, chaveado por (*args, posicao, limite)
+        self.linhas = []
+        self.completa = False
+        self.carregando = False
+        self.cancelada = False
+        self.versao = 0           # muda sempre que as linhas mudam
+        self.ao_mudar = None
+        self._futuro = None
+
+    @property
+    def total(self):
+        return len(self.linhas)
+
+    def posicao(self):
+        """Onde começa a próxima página: o offset, aqui; a chave da última linha em FonteKeyset"""
+        return len(self.linhas)
+
+    def garantir(self, quantidade):
+        """Solicita a próxima página se ainda faltam linhas para exibir `quantidade` itens"""
+        if self.completa or self.carregando or quantidade <= len(self.linhas):
+            return
+        chave = (*self.args, self.posicao(), self.tamanho_pagina)
+        if self.cache:
+            linhas = self.cache.obter(chave)
+            if linhas is not None:
+                self._pagina_carregada(linhas)
+                return
+
+        self.carregando = True
+        if self.cache:
+            geracao = self.cache.geracao
+
+            def ao_concluir(linhas):
+                if not self.cancelada:
+                    self.cache.guardar(chave, linhas, geracao)
+                self._pagina_carregada(linhas)
+        else:
+            ao_concluir = self._pagina_carregada
+        self._futuro = self.executar(
+            self.funcao, ao_concluir, *self.args, self.posicao(), self.tamanho_pagina,
+            ao_falhar=self._pagina_falhou
+        )
+
+    def cancelar(self):
+        """Abandona a fonte: a página pendente é descartada ou interrompida no executor"""
+        self.cancelada = True
+        self.ao_mudar = None
+        if self.carregando and self._futuro and self.cancelar_operacao:
+            self.cancelar_operacao(self._futuro)
+
+    def _pagina_falhou(self, erro):
+        """Libera a fonte para que a próxima rolagem tente a página de novo"""
+        self.carregando = False
+
+    def _pagina_carregada(self, linhas):
+        if self.cancelada:
+            return
+        self.carregando = False
+        self.linhas.extend(linhas)
+        self.completa = len(linhas) < self.tamanho_pagina
+        self.notificar()
+
+    def notificar(self):
+        """Avisa a lista que as linhas mudaram"""
+        self.versao += 1
+        if self.ao_mudar:
+            self.ao_mudar()
+
+    def alterar_linhas(self, funcao):
+        """Substitui cada linha por funcao(linha) e avisa a lista só se alguma mudou"""
+        novas = [funcao(linha) for linha in self.linhas]
+        if novas != self.linhas:
+            self.linhas = novas
+            self.notificar()
+
+    def inserir_no_inicio(self, linha):
+        """Adiciona uma linha recém-criada no topo (listas ordenadas da mais nova para a mais antiga)"""
+        self.linhas.insert(0, linha)
+        self.notificar()
+
+class FonteKeyset(FontePaginada):
+    """Fonte paginada por keyset: cada página começa depois da chave da última linha carregada
+
+    A primeira página recebe posicao=None. O custo de cada página não cresce com o
+    quanto já foi rolado, ao contrário do OFFSET.
+    """
+
+    def __init__(self, executar, funcao, *args, chave=lambda linha: linha[0], **kwargs):
+        super().__init__(executar, funcao, *args, **kwargs)
+        self.chave = chave
+
+    def posicao(self):
+        return self.chave(self.linhas[-1]) if self.linhas else None
+
+class FonteMemoria(FontePaginada):
+    """Fonte já completa, com linhas em memória (por exemplo, resultados filtrados de outra busca)"""
+
+    def __init__(self, linhas):
+        super().__init__(None, None)
+        self.linhas = list(linhas)
+        self.completa = True
+
+class LinhaVirtual:
+    """Base das linhas de uma ListaVirtual: widgets criados uma vez e religados a novos dados"""
+
+    def __init__(self, master, altura):
+        self.frame = ctk.CTkFrame(master, height=altura, fg_color="#2B2B2B", corner_radius=10)
+        self.frame.pack_propagate(False)
+
+    def vincular(self, dados):
+        """Atualiza os widgets da linha para exibir `dados`"""
+        raise NotImplementedError
+
+class ListaVirtual(ctk.CTkFrame):
+    """Lista rolável que só cria widgets para as linhas visíveis e os reaproveita ao rolar"""
+
+    ESPACO_ENTRE_LINHAS = 10
+    PASSO_RODA = 40
+
+    def __init__(self, master, criar_linha, altura_linha, texto_vazio="Nenhum resultado", buffer=2, **kwargs):
+        super().__init__(master, **kwargs)
+        self.criar_linha = criar_linha  # criar_linha(master, altura) -> LinhaVirtual
+        self.altura_linha = altura_linha
+        self.texto_vazio = texto_vazio
+        self.buffer = buffer
+        self.fonte = None
+        self.topo = 0      # deslocamento da rolagem, em pixels sem escala
+        self.linhas = []   # pool de linhas reaproveitadas
+
+        self.barra = ctk.CTkScrollbar(self, command=self._rolar_barra)
+        self.barra.pack(side="right", fill="y", pady=5)
+
+        self.area = ctk.CTkFrame(self, fg_color="transparent")
+        self.area.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        self.area.bind("<Configure>", lambda e: self._ajustar_pool(), add="+")
+        self._vincular_roda(self.area)
+
+        self.aviso = ctk.CTkLabel(
+            self.area,
+            text=texto_vazio,
+            font=ctk.CTkFont(size=14),
+            text_color="#CCCCCC"
+        )
+        self.aviso.place(relx=0.5, y=20, anchor="n")
+
+    def definir_fonte(self, fonte, texto_vazio=None):
+        """Troca os dados exibidos e volta ao topo; fonte=None esvazia a lista"""
+        if self.fonte and self.fonte is not fonte:
+            self.fonte.cancelar()
+        if texto_vazio is not None:
+            self.texto_vazio = texto_vazio
+
+        self.fonte = fonte
+        self.topo = 0
+        for linha in self.linhas:
+            linha.chave = None
+        if fonte:
+            fonte.ao_mudar = self.atualizar
+        self._ajustar_pool()
+
+    def religar(self):
+        """Religa as linhas visíveis, para refletir estado externo (ex.: status das conexões)"""
+        for linha in self.linhas:
+            linha.chave = None
+        self.atualizar()
+
+    def atualizar(self):
+        """Reposiciona o pool de linhas conforme a rolagem e religa as que mudaram de item"""
+        total = self.fonte.total if self.fonte else 0
+        altura_total = total * self.altura_linha
+        visivel = self._altura_visivel()
+        self.topo = max(0, min(self.topo, altura_total - visivel))
+        primeiro = int(self.topo // self.altura_linha)
+
+        for i, linha in enumerate(self.linhas):
+            indice = primeiro + i
+            if indice < total:
+                # Só religa os dados quando a linha passa a mostrar outro item
+                chave = (self.fonte.versao, indice)
+                if getattr(linha, "chave", None) != chave:
+                    linha.vincular(self.fonte.linhas[indice])
+                    linha.chave = chave
+                linha.frame.place(x=0, y=indice * self.altura_linha - self.topo, relwidth=1)
+            else:
+                linha.frame.place_forget()
+
+        if altura_total > visivel:
+            self.barra.set(self.topo / altura_total, (self.topo + visivel) / altura_total)
+        else:
+            self.barra.set(0, 1)
+
+        if total:
+            self.aviso.place_forget()
+        else:
+            carregando = self.fonte is not None and not self.fonte.completa
+            self.aviso.configure(text="Carregando..." if carregando else self.texto_vazio)
+            self.aviso.place(relx=0.5, y=20, anchor="n")
+
+        # Pedir a próxima página quando a área visível alcança o fim das linhas carregadas
+        if self.fonte:
+            self.fonte.garantir(primeiro + len(self.linhas))
+
+    def _escala(self):
+        return self._apply_widget_scaling(1.0)
+
+    def _altura_visivel(self):
+        return max(self.area.winfo_height() / self._escala(), 1)
+
+    def _ajustar_pool(self):
+        necessario = int(self._altura_visivel() // self.altura_linha) + 1 + self.buffer
+        while len(self.linhas) < necessario:
+            linha = self.criar_linha(self.area, self.altura_linha - self.ESPACO_ENTRE_LINHAS)
+            self._vincular_roda(linha.frame)
+            self.linhas.append(linha)
+        self.atualizar()
+
+    def _vincular_roda(self, widget):
+        widget.bind("<MouseWheel>", self._rolar_roda, add="+")
+        widget.bind("<Button-4>", self._rolar_roda, add="+")
+        widget.bind("<Button-5>", self._rolar_roda, add="+")
+        for filho in widget.winfo_children():
+            self._vincular_roda(filho)
+
+    def _rolar_roda(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.topo -= self.PASSO_RODA
+        else:
+            self.topo += self.PASSO_RODA
+        self.atualizar()
+
+    def _rolar_barra(self, acao, valor, unidade=None):
+        total = self.fonte.total if self.fonte else 0
+        if acao == "moveto":
+            self.topo = float(valor) * total * self.altura_linha
+        elif unidade == "pages":
+            self.topo += int(valor) * self._altura_visivel()
+        else:
+            self.topo += int(valor) * self.altura_linha
+        self.atualizar()
+
+class LinhaResultadoBusca(LinhaVirtual):
+    """Resultado da busca: empresa (para investidores) ou investidor (para empresas)"""
+
+    def __init__(self, master, altura, app):
+        super().__init__(master, altura)
+        self.app = app
+        self.conta_id = None
+
+        # Informações da conta
+        info_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        info_frame.pack(pady=10, padx=10, fill="x", side="left", expand=True)
+
+        self.name_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=16, weight="bold"),
+            text_color="#FFFFFF",
+            anchor="w"
+        )
+        self.name_label.pack(anchor="w")
+
+        self.email_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=14),
+            text_color="#CCCCCC",
+            anchor="w"
+        )
+        self.email_label.pack(anchor="w")
+
+        self.detail_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=14),
+            text_color="#888888",
+            anchor="w"
+        )
+        self.detail_label.pack(anchor="w")
+
+        actions_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        actions_frame.pack(pady=10, padx=10, side="right")
+
+        self.status_label = ctk.CTkLabel(actions_frame, text="", font=ctk.CTkFont(size=14))
+
+        self.connect_button = ctk.CTkButton(
+            actions_frame,
+            text="Conectar",
+            width=100,
+            height=30,
+            fg_color="#1E90FF",
+            hover_color="#0078D7",
+            command=self._conectar
+        )
+
+    def vincular(self, dados):
+        if self.app.user_type == "user":
+            self.conta_id, nome, email, cidade, estado, _ = dados
+            detalhe = f"{cidade}, {estado}" if cidade and estado else "Localização não informada"
+        else:
+            self.conta_id, nome, email, genero, numero = dados
+            detalhe = genero or "Gênero não informado"
+
+        self.name_label.configure(text=nome)
+        self.email_label.configure(text=email)
+        self.detail_label.configure(text=detalhe)
+
+        # Status da conexão vem do mapa da sessão, sem consulta por linha
+        conexao = self.app.status_conexoes.get(self.conta_id)
+        if conexao:
+            self.connect_button.pack_forget()
+            self.status_label.configure(
+                text=f"Status: {conexao}",
+                text_color="#1E90FF" if conexao == "aceita" else "#FFA500"
+            )
+            self.status_label.pack(pady=5)
+        else:
+            self.status_label.pack_forget()
+            self.connect_button.pack(pady=5)
+
+    def _conectar(self):
+        tipo_alvo = "empresa" if self.app.user_type == "user" else "user"
+        self.app.solicitar_conexao(
+            self.conta_id, tipo_alvo, self.name_label.cget("text"), self.email_label.cget("text")
+        )
+
+class LinhaConexao(LinhaVirtual):
+    """Conexão existente na aba Suas Conexões"""
+
+    def __init__(self, master, altura, app):
+        super().__init__(master, altura)
+        self.app = app
+        self.dados = None
+
+        # Informações da conexão
+        info_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        info_frame.pack(pady=10, padx=10, fill="x", side="left", expand=True)
+
+        self.name_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=16, weight="bold"),
+            text_color="#FFFFFF",
+            anchor="w"
+        )
+        self.name_label.pack(anchor="w")
+
+        self.email_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=14),
+            text_color="#CCCCCC",
+            anchor="w"
+        )
+        self.email_label.pack(anchor="w")
+
+        self.status_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=14),
+            anchor="w"
+        )
+        self.status_label.pack(anchor="w")
+
+        self.date_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="#888888",
+            anchor="w"
+        )
+        self.date_label.pack(anchor="w")
+
+        # Botões de ação
+        actions_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        actions_frame.pack(pady=10, padx=10, side="right")
+
+        self.accept_button = ctk.CTkButton(
+            actions_frame,
+            text="Aceitar",
+            width=80,
+            height=30,
+            fg_color="#00AA00",
+            hover_color="#008800",
+            command=lambda: self.app.responder_solicitacao(self.dados[0], "aceita")
+        )
+
+        self.reject_button = ctk.CTkButton(
+            actions_frame,
+            text="Recusar",
+            width=80,
+            height=30,
+            fg_color="#AA0000",
+            hover_color="#880000",
+            command=lambda: self.app.responder_solicitacao(self.dados[0], "recusada")
+        )
+
+        self.message_button = ctk.CTkButton(
+            actions_frame,
+            text="Mensagem",
+            width=100,
+            height=30,
+            fg_color="#1E90FF",
+            hover_color="#0078D7",
+            command=lambda: self.app.iniciar_conversa(self.dados[0], self.dados[1])
+        )
+
+    def vincular(self, dados):
+        self.dados = dados
+        conn_id, nome, email, status, data = dados
+
+        self.name_label.configure(text=nome)
+        self.email_label.configure(text=email)
+        self.status_label.configure(
+            text=f"Status: {status}",
+            text_color="#1E90FF" if status == "aceita" else "#FFA500"
+        )
+        self.date_label.configure(text=f"Data: {data.split()[0]}")
+
+        for button in (self.accept_button, self.reject_button, self.message_button):
+            button.pack_forget()
+        if status == "pendente" and self.app.user_type == "empresa":
+            self.accept_button.pack(pady=5)
+            self.reject_button.pack(pady=5)
+        elif status == "aceita":
+            self.message_button.pack(pady=5)
+
+class LinhaConversa(LinhaVirtual):
+    """Conversa na lista da tela Conversas"""
+
+    def __init__(self, master, altura, app):
+        super().__init__(master, altura)
+        self.app = app
+        self.dados = None
+
+        # Informações da conversa
+        info_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        info_frame.pack(pady=10, padx=10, fill="x", side="left", expand=True)
+
+        self.name_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=16, weight="bold"),
+            text_color="#FFFFFF",
+            anchor="w"
+        )
+        self.name_label.pack(anchor="w")
+
+        self.msg_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=14),
+            text_color="#CCCCCC",
+            anchor="w"
+        )
+        self.msg_label.pack(anchor="w")
+
+        self.date_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="#888888",
+            anchor="w"
+        )
+        self.date_label.pack(anchor="w")
+
+        # Botão para abrir conversa
+        open_button = ctk.CTkButton(
+            self.frame,
+            text="Abrir",
+            width=80,
+            height=30,
+            fg_color="#1E90FF",
+            hover_color="#0078D7",
+            command=lambda: self.app.abrir_conversa(self.dados[4], self.dados[1])
+        )
+        open_button.pack(pady=10, padx=10, side="right")
+
+    def vincular(self, dados):
+        self.dados = dados
+        contato_id, nome, ultima_msg, data_msg, _ = dados
+
+        self.name_label.configure(text=nome)
+        if ultima_msg:
+            self.msg_label.configure(text=ultima_msg[:50] + "..." if len(ultima_msg) > 50 else ultima_msg)
+        else:
+            self.msg_label.configure(text="")
+        self.date_label.configure(text=data_msg.split()[0] if data_msg else "")
+
+class LinhaNotificacao(LinhaVirtual):
+    """Notificação na Central de Notificações; as não lidas ficam destacadas"""
+
+    def __init__(self, master, altura, app):
+        super().__init__(master, altura)
+        self.app = app
+
+        info_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        info_frame.pack(pady=10, padx=10, fill="x", side="left", expand=True)
+
+        self.title_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=16, weight="bold"),
+            anchor="w"
+        )
+        self.title_label.pack(anchor="w")
+
+        self.msg_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=14),
+            text_color="#CCCCCC",
+            anchor="w"
+        )
+        self.msg_label.pack(anchor="w")
+
+        self.date_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="#888888",
+            anchor="w"
+        )
+        self.date_label.pack(anchor="w")
+
+    def vincular(self, dados):
+        _, titulo, mensagem, data, lida = dados
+
+        self.title_label.configure(text=titulo or "", text_color="#FFFFFF" if lida else "#1E90FF")
+        self.msg_label.configure(text=mensagem or "")
+        self.date_label.configure(text=data or "")
+        self.frame.configure(border_width=0 if lida else 2, border_color="#1E90FF")
+
+class BolhaMensagem(ctk.CTkFrame):
+    """Mensagem do chat; as enviadas pela conta ficam pendentes até a gravação ser confirmada"""
+
+    def __init__(self, master, texto, data_envio=None, propria=False):
+        super().__init__(master, fg_color="#1E90FF" if propria else "#3A3A3A", corner_radius=10)
+        self.propria = propria
+
+        texto_label = ctk.CTkLabel(
+            self,
+            text=texto,
+            font=ctk.CTkFont(size=14),
+            text_color="#FFFFFF",
+            wraplength=450,
+            justify="left"
+        )
+        texto_label.pack(padx=10, pady=(6, 0), anchor="w")
+
+        self.hora_label = ctk.CTkLabel(
+            self,
+            text=data_envio[:16] if data_envio else "Enviando...",
+            font=ctk.CTkFont(size=10),
+            text_color="#DDDDDD"
+        )
+        self.hora_label.pack(padx=10, pady=(0, 4), anchor="e")
+
+    def exibir(self, before=None):
+        """Posiciona a bolha à direita (enviada) ou à esquerda (recebida)"""
+        opcoes = {"before": before} if before else {}
+        self.pack(anchor="e" if self.propria else "w", padx=10, pady=4, **opcoes)
+
+    def confirmar(self, data_envio):
+        self.hora_label.configure(text=data_envio[:16], text_color="#DDDDDD")
+
+    def falhar(self):
+        self.hora_label.configure(text="Não enviada", text_color="#FF6B6B")
+
+class ChatMensagens(ctk.CTkScrollableFrame):
+    """Histórico de uma conversa: abre nas mensagens mais recentes e carrega as antigas ao rolar até o topo"""
+
+    def __init__(self, master, app, conversa_id, tamanho_pagina=TAMANHO_PAGINA, **kwargs):
+        super().__init__(master, **kwargs)
+        self.app = app
+        self.conversa_id = conversa_id
+        self.tamanho_pagina = tamanho_pagina
+        self.mais_antiga = None   # (data_envio, id) da primeira mensagem exibida
+        self.completa = False
+        self.carregando = False
+        self.iniciado = False
+        self.bolhas = []
+
+        self.aviso = ctk.CTkLabel(
+            self,
+            text="Carregando...",
+            font=ctk.CTkFont(size=14),
+            text_color="#CCCCCC"
+        )
+        self.aviso.pack(pady=20)
+
+        # Toda mudança de rolagem (roda, barra ou novo conteúdo) passa por aqui para detectar o topo
+        self._parent_canvas.configure(yscrollcommand=self._rolagem_alterada)
+
+    def carregar_anteriores(self):
+        """Busca a página anterior à mensagem mais antiga exibida"""
+        if self.carregando or self.completa:
+            return
+        self.carregando = True
+        self.app.executar_em_segundo_plano(
+            listar_mensagens,
+            self._pagina_carregada,
+            self.conversa_id, self.mais_antiga, self.tamanho_pagina,
+            erro="Ocorreu um erro ao carregar as mensagens.",
+            ao_falhar=self._pagina_falhou
+        )
+
+    def adicionar_enviada(self, texto):
+        """Exibe imediatamente uma mensagem da conta, ainda pendente"""
+        self.aviso.pack_forget()
+        bolha = BolhaMensagem(self, texto, propria=True)
+        bolha.exibir()
+        self.bolhas.append(bolha)
+        self._rolar_para_o_fim()
+        return bolha
+
+    def _pagina_falhou(self, erro):
+        """Libera o histórico para que a próxima rolagem até o topo tente de novo"""
+        self.carregando = False
+
+    def _pagina_carregada(self, linhas):
+        self.carregando = False
+        self.completa = len(linhas) < self.tamanho_pagina
+        primeira_pagina = not self.iniciado
+        self.iniciado = True
+
+        if primeira_pagina and not linhas and not self.bolhas:
+            self.aviso.configure(text="Nenhuma mensagem ainda. Envie a primeira!")
+            return
+        self.aviso.pack_forget()
+        if not linhas:
+            return
+
+        canvas = self._parent_canvas
+        self.update_idletasks()
+        altura_antes = self.winfo_reqheight()
+        inicio = canvas.yview()[0]
+
+        # Páginas mais antigas entram acima das bolhas já exibidas
+        antes = self.bolhas[0] if self.bolhas else None
+        novas = []
+        for mensagem_id, remetente_id, tipo_remetente, texto, data_envio in linhas:
+            propria = remetente_id == self.app.current_user and tipo_remetente == self.app.user_type
+            bolha = BolhaMensagem(self, texto, data_envio, propria)
+            bolha.exibir(before=antes)
+            novas.append(bolha)
+        self.bolhas[:0] = novas
+        self.mais_antiga = (linhas[0][4], linhas[0][0])
+
+        if primeira_pagina:
+            self._rolar_para_o_fim()
+        else:
+            # Manter na tela a mensagem que estava no topo
+            self.update_idletasks()
+            altura_depois = self.winfo_reqheight()
+            canvas.yview_moveto((inicio * altura_antes + altura_depois - altura_antes) / altura_depois)
+
+    def _rolar_para_o_fim(self):
+        self.update_idletasks()
+        self._parent_canvas.yview_moveto(1.0)
+
+    def _rolagem_alterada(self, inicio, fim):
+        self._scrollbar.set(inicio, fim)
+        if float(inicio) <= 0 and self.iniciado:
+            self.carregar_anteriores()
+
+class Tela:
+    """Tela do menu principal montada uma vez por sessão"""
+
+    def __init__(self, frame, token):
+        self.frame = frame
+        self.token = token      # identifica a tela em executar_em_segundo_plano e nos eventos
+        self.atualizar = None   # recarrega só as partes ligadas a dados
+        self.suja = False       # dados mudaram enquanto a tela estava oculta
+
+class GerenciadorTelas:
+    """Mantém as telas do menu principal montadas e alterna entre elas sem reconstruí-las
+
+    Cada tela é construída na primeira visita por construir(frame), que pode retornar
+    uma função de atualização. Nas visitas seguintes o frame só volta a ser exibido, e a
+    atualização roda apenas se a tela foi marcada como suja enquanto estava oculta.
+    """
+
+    def __init__(self, app, container):
+        self.app = app
+        self.container = container
+        self.telas = {}   # nome -> Tela
+        self.atual = None
+
+    def exibir(self, nome, construir):
+        """Exibe a tela `nome`, construindo-a na primeira vez"""
+        if self.atual is not None and self.atual != nome:
+            self.telas[self.atual].frame.pack_forget()
+
+        tela = self.telas.get(nome)
+        nova = tela is None
+        if nova:
+            frame = ctk.CTkFrame(self.container, fg_color="transparent")
+            tela = self.telas[nome] = Tela(frame, self.app.abrir_tela())
+
+        tela.frame.pack(fill="both", expand=True)
+        self.atual = nome
+        self.app._tela_atual = tela.token
+
+        if nova:
+            try:
+                tela.atualizar = construir(tela.frame)
+            except Exception:
+                # Uma tela montada pela metade não fica guardada
+                self.descartar(nome)
+                raise
+        elif tela.suja:
+            tela.suja = False
+            if tela.atualizar:
+                tela.atualizar()
+        return tela
+
+    def marcar_suja(self, *nomes):
+        """Atualiza as telas na hora se estiverem visíveis, ou na próxima exibição"""
+        for nome in nomes:
+            tela = self.telas.get(nome)
+            if tela is None:
+                continue
+            if nome == self.atual:
+                if tela.atualizar:
+                    tela.atualizar()
+            else:
+                tela.suja = True
+
+    def descartar(self, nome):
+        """Destrói a tela; a próxima exibição a constrói de novo"""
+        tela = self.telas.pop(nome, None)
+        if tela is None:
+            return
+        if self.atual == nome:
+            self.atual = None
+        self.app.fechar_tela(tela.token)
+        tela.frame.destroy()
+
 class BossBridgeSystem:
-    def __init__(self):
+    def __init__(self, registro=None):
         try:
+            self.registro = registro or RegistroInicializacao()
+            
+            # Abrir o banco e verificar o esquema em paralelo com a montagem da janela
+            self.init_db()
+            
             self.root = ctk.CTk()
             self.root.title("Boss Bridge - Sistema de Conexões")
             self.root.geometry("1200x700")
             self.root.resizable(True, True)
-            
-            # Inicializar banco de dados
-            self.init_db()
+            self.registro.marcar("Tk iniciado")
             
             # Variáveis de controle
             self.current_user = None
             self.user_type = None
             self.user_name = None
+            self.status_conexoes = {}  # id da outra parte -> status da conexão
+            self._tela_atual = 0          # token da tela exibida
+            self._telas_abertas = set()   # tokens das telas que ainda recebem resultados
+            self._proximo_token = 0
+            self.telas = None             # GerenciadorTelas do menu principal
+            self._conversa_aberta = None  # conversa do chat montado
+            self.cache_busca = CacheBusca()
+            
+            # Hash e verificação de senhas (scrypt) fora da thread da interface
+            self.pool_senhas = ThreadPoolExecutor(max_workers=2, thread_name_prefix="senhas")
+            
+            # Eventos da sessão: o mapa de status acompanha as conexões criadas e respondidas
+            self.eventos = BarramentoEventos()
+            self.eventos.assinar(EVENTO_CONEXAO_SOLICITADA, lambda outra_parte, **_: self._definir_status(outra_parte, "pendente"))
+            self.eventos.assinar(EVENTO_CONEXAO_ACEITA, lambda outra_parte, **_: self._definir_status(outra_parte, "aceita"))
+            self.eventos.assinar(EVENTO_CONEXAO_RECUSADA, lambda outra_parte, **_: self._definir_status(outra_parte, "recusada"))
             
             # Mostrar tela de login inicialmente
             self.show_login_screen()
+            self.registro.marcar("tela de login montada")
+            self.root.after_idle(self.registro.marcar, "primeira pintura")
+            self.root.after(INTERVALO_VERIFICACAO_MS, self._verificar_banco)
             
         except Exception as e:
             print(f"Erro durante a inicialização: {str(e)}")
@@ -38,97 +870,122 @@ class BossBridgeSystem:
             sys.exit(1)
     
     def init_db(self):
-        """Inicializa o banco de dados SQLite com todas as tabelas necessárias"""
+        """Abre o banco e aplica as migrações na thread do executor, sem esperar o resultado"""
         try:
-            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "boss_bridge.db")
-            self.conn = sqlite3.connect(db_path)
-            self.cursor = self.conn.cursor()
+            db_path = caminho_banco()
             print("Banco de dados em:", db_path)
-
-            # Tabela de usuários (investidores)
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nome TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    genero TEXT,
-                    senha TEXT NOT NULL,
-                    numero TEXT,
-                    imagem_perfil TEXT,
-                    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Tabela de empresas
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS empresas (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cnpj TEXT UNIQUE NOT NULL,
-                    nome_empresa TEXT NOT NULL,
-                    razao_social TEXT NOT NULL,
-                    logradouro TEXT,
-                    numero_endereco TEXT,
-                    complemento TEXT,
-                    cidade TEXT,
-                    estado TEXT,
-                    cep TEXT,
-                    email TEXT UNIQUE NOT NULL,
-                    senha TEXT NOT NULL,
-                    imagem_perfil TEXT,
-                    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Tabela de conexões entre usuários and empresas
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS conexoes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    empresa_id INTEGER,
-                    data_conexao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'pendente',
-                    FOREIGN KEY (user_id) REFERENCES users (id),
-                    FOREIGN KEY (empresa_id) REFERENCES empresas (id)
-                )
-            ''')
-            
-            # Tabela de mensagens
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS mensagens (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    remetente_id INTEGER,
-                    destinatario_id INTEGER,
-                    tipo_remetente TEXT,
-                    tipo_destinatario TEXT,
-                    mensagem TEXT,
-                    data_envio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    lida INTEGER DEFAULT 0
-                )
-            ''')
-            
-            # Tabela de notificações
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notificacoes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    usuario_id INTEGER,
-                    tipo_usuario TEXT,
-                    titulo TEXT,
-                    mensagem TEXT,
-                    data_notificacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    lida INTEGER DEFAULT 0
-                )
-            ''')
             
-            self.conn.commit()
+            # Todo acesso ao banco passa pela thread do executor
+            self.registro.iniciar_trilha("banco")
+            self.db = ExecutorBanco(db_path)
+            self.db.submeter(lambda conn: self.registro.marcar("conexão aberta", "banco"))
+            
+            def preparar_esquema(conn):
+                # Criar ou atualizar o esquema (sem DDL quando já está na versão atual)
+                versao = aplicar_migracoes(conn)
+                conflitos = len(listar_contas_conflitantes(conn))
+                cnpjs = len(listar_cnpjs_conflitantes(conn))
+                if conflitos or cnpjs:
+                    print(f"Aviso: {conflitos} conta(s) sem acesso por email repetido e {cnpjs} empresa(s) "
+                          "com CNPJ inválido ou repetido; veja python -m boss_bridge.cli conflicts")
+                self.registro.marcar("esquema verificado", "banco")
+                return versao
+            
+            # A fila é FIFO: login e cadastro submetidos depois só rodam com o esquema pronto
+            self.banco_pronto = self.db.submeter(preparar_esquema)
             
         except Exception as e:
             print(f"Erro ao inicializar o banco de dados: {str(e)}")
             print(traceback.format_exc())
             raise
     
-    def hash_password(self, password):
-        """Cria hash da senha para armazenamento seguro"""
-        return hashlib.sha256(password.encode()).hexdigest()
+    def _verificar_banco(self):
+        """Acompanha a preparação do banco; sem banco a aplicação não tem como continuar"""
+        if not self.banco_pronto.done():
+            self.root.after(INTERVALO_VERIFICACAO_MS, self._verificar_banco)
+            return
+        
+        try:
+            self.banco_pronto.result()
+        except Exception as e:
+            print(f"Erro ao inicializar o banco de dados: {str(e)}")
+            print(traceback.format_exc())
+            messagebox.showerror("Erro", "Não foi possível abrir o banco de dados. A aplicação será encerrada.")
+            self.root.destroy()
+            return
+        
+        # Checkpoints do WAL fora da thread da interface
+        self.checkpoint = CheckpointWAL(self.db.caminho)
+        self.checkpoint.iniciar()
+        
+        # Remoção em lotes de contas excluídas e de notificações antigas (desta ou de outras sessões)
+        self.manutencao = ManutencaoBanco(self.db.caminho)
+        self.manutencao.iniciar()
+    
+    def executar_em_segundo_plano(self, funcao, ao_concluir, *args, erro="Ocorreu um erro ao acessar o banco de dados.",
+                                  ao_falhar=None):
+        """Executa funcao(conn, *args) no executor e entrega o resultado a ao_concluir na thread da interface"""
+        futuro = self.db.submeter(funcao, *args)
+        self._aguardar_resultado(futuro, ao_concluir, self._tela_atual, erro, ao_falhar)
+        return futuro
+    
+    def calcular_em_segundo_plano(self, funcao, ao_concluir, *args, erro="Ocorreu um erro ao processar a senha."):
+        """Executa funcao(*args) no pool de senhas e entrega o resultado a ao_concluir na thread da interface"""
+        futuro = self.pool_senhas.submit(funcao, *args)
+        self._aguardar_resultado(futuro, ao_concluir, self._tela_atual, erro)
+        return futuro
+    
+    def cancelar_em_segundo_plano(self, futuro):
+        """Cancela uma operação submetida por executar_em_segundo_plano; o callback não é chamado"""
+        self.db.cancelar(futuro)
+    
+    def _aguardar_resultado(self, futuro, ao_concluir, tela, erro, ao_falhar=None):
+        """Verifica o Future via root.after sem bloquear o loop do Tk"""
+        if not futuro.done():
+            self.root.after(INTERVALO_VERIFICACAO_MS, self._aguardar_resultado, futuro, ao_concluir, tela, erro, ao_falhar)
+            return
+        
+        # Descartar resultados de telas que já foram fechadas (telas ocultas continuam recebendo)
+        if futuro.cancelled() or tela not in self._telas_abertas:
+            return
+        
+        # Avisar quem chamou antes da mensagem de erro (ex.: desfazer uma atualização otimista)
+        falha = futuro.exception()
+        if ao_falhar and falha is not None and not isinstance(falha, CancelledError):
+            ao_falhar(falha)
+        
+        try:
+            resultado = futuro.result()
+        except CancelledError:
+            # Consulta interrompida por cancelar_em_segundo_plano
+            return
+        except ErroValidacao as e:
+            messagebox.showerror("Erro", str(e))
+            return
+        except Exception as e:
+            print(f"Erro em operação de banco: {str(e)}")
+            print(traceback.format_exc())
+            messagebox.showerror("Erro", erro)
+            return
+        
+        # Falhas do callback são da interface, não do banco: registradas à parte
+        try:
+            ao_concluir(resultado)
+        except Exception as e:
+            print(f"Erro ao exibir o resultado: {str(e)}")
+            print(traceback.format_exc())
+            messagebox.showerror("Erro", "Ocorreu um erro ao exibir os dados.")
+    
+    def show_loading(self, parent, text="Carregando..."):
+        """Exibe um indicador de carregamento até os dados chegarem"""
+        loading_label = ctk.CTkLabel(
+            parent, 
+            text=text,
+            font=ctk.CTkFont(size=14),
+            text_color="#CCCCCC"
+        )
+        loading_label.pack(pady=20)
+        return loading_label
     
     def show_login_screen(self):
         """Exibe a tela de login"""
@@ -523,37 +1380,22 @@ class BossBridgeSystem:
     def register_user(self, nome, email, genero, numero, senha, confirmar_senha):
         """Registra um novo usuário no banco de dados"""
         try:
-            # Validações
-            if not nome or not email or not senha or not confirmar_senha:
-                messagebox.showerror("Erro", "Todos os campos obrigatórios devem ser preenchidos!")
-                return
-            
-            if senha != confirmar_senha:
-                messagebox.showerror("Erro", "As senhas não coincidem!")
-                return
-            
-            if genero == "Selecione":
-                messagebox.showerror("Erro", "Selecione um gênero!")
-                return
-            
-            # Verificar se email já existe
-            self.cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-            if self.cursor.fetchone():
-                messagebox.showerror("Erro", "Este email já está cadastrado!")
-                return
-            
-            # Hash da senha
-            hashed_password = self.hash_password(senha)
-            
-            # Inserir no banco de dados
-            self.cursor.execute(
-                "INSERT INTO users (nome, email, genero, numero, senha) VALUES (?, ?, ?, ?, ?)",
-                (nome, email, genero, numero, hashed_password)
+            validar_cadastro_usuario(nome, email, genero, senha, confirmar_senha)
+            
+            # Hash da senha no pool, depois inserção no banco (a verificação de email duplicado ocorre no executor)
+            self.calcular_em_segundo_plano(
+                gerar_hash_senha,
+                lambda hashed_password: self.executar_em_segundo_plano(
+                    cadastrar_usuario,
+                    lambda conta_id: self._cadastro_concluido("user", conta_id, (nome, email)),
+                    nome, email, genero, numero, hashed_password,
+                    erro="Ocorreu um erro ao criar a conta."
+                ),
+                senha
             )
-            self.conn.commit()
-            messagebox.showinfo("Sucesso", "Conta criada com sucesso! Você já pode fazer login.")
-            self.show_login_screen()
             
+        except ErroValidacao as e:
+            messagebox.showerror("Erro", str(e))
         except Exception as e:
             print(f"Erro ao registrar usuário: {str(e)}")
             print(traceback.format_exc())
@@ -563,48 +1405,37 @@ class BossBridgeSystem:
                         complemento, cidade, estado, cep, email, senha, confirmar_senha):
         """Registra uma nova empresa no banco de dados"""
         try:
-            # Validações
-            if not cnpj or not nome_empresa or not razao_social or not email or not senha or not confirmar_senha:
-                messagebox.showerror("Erro", "Todos os campos obrigatórios devem be preenchidos!")
-                return
-            
-            if senha != confirmar_senha:
-                messagebox.showerror("Erro", "As senhas não coincidem!")
-                return
-            
-            # Verificar se CNPJ já existe
-            self.cursor.execute("SELECT id FROM empresas WHERE cnpj = ?", (cnpj,))
-            if self.cursor.fetchone():
-                messagebox.showerror("Erro", "Este CNPJ já está cadastrado!")
-                return
-            
-            # Verificar se email já existe
-            self.cursor.execute("SELECT id FROM empresas WHERE email = ?", (email,))
-            if self.cursor.fetchone():
-                messagebox.showerror("Erro", "Este email já está cadastrado!")
-                return
-            
-            # Hash da senha
-            hashed_password = self.hash_password(senha)
-            
-            # Inserir no banco de dados
-            self.cursor.execute(
-                """INSERT INTO empresas 
-                (cnpj, nome_empresa, razao_social, logradouro, numero_endereco, 
-                 complemento, cidade, estado, cep, email, senha) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (cnpj, nome_empresa, razao_social, logradouro, numero_endereco, 
-                 complemento, cidade, estado, cep, email, hashed_password)
+            validar_cadastro_empresa(cnpj, nome_empresa, razao_social, email, senha, confirmar_senha)
+            
+            # Hash da senha no pool, depois inserção no banco (a verificação de CNPJ e email duplicados ocorre no executor)
+            self.calcular_em_segundo_plano(
+                gerar_hash_senha,
+                lambda hashed_password: self.executar_em_segundo_plano(
+                    cadastrar_empresa,
+                    lambda conta_id: self._cadastro_concluido(
+                        "empresa", conta_id, (nome_empresa, razao_social, email)
+                    ),
+                    cnpj, nome_empresa, razao_social, logradouro, numero_endereco,
+                    complemento, cidade, estado, cep, email, hashed_password,
+                    erro="Ocorreu um erro ao criar a conta."
+                ),
+                senha
             )
-            self.conn.commit()
-            messagebox.showinfo("Sucesso", "Conta criada com sucesso! Você já pode fazer login.")
-            self.show_login_screen()
             
+        except ErroValidacao as e:
+            messagebox.showerror("Erro", str(e))
         except Exception as e:
             print(f"Erro ao registrar empresa: {str(e)}")
             print(traceback.format_exc())
             messagebox.showerror("Erro", f"Ocorreu um erro ao criar a conta: {str(e)}")
     
+    def _cadastro_concluido(self, tipo_conta, conta_id, textos):
+        """Retorna ao login após um cadastro bem-sucedido"""
+        # A nova conta pode entrar em buscas que já estão em cache
+        self.cache_busca.invalidar_conta(tipo_conta, conta_id, textos)
+        messagebox.showinfo("Sucesso", "Conta criada com sucesso! Você já pode fazer login.")
+        self.show_login_screen()
+    
     def login(self, email, senha):
         """Realiza o login do usuário ou empresa"""
         try:
@@ -612,39 +1443,71 @@ class BossBridgeSystem:
                 messagebox.showerror("Erro", "Por favor, preencha todos os campos!")
                 return
             
-            hashed_password = self.hash_password(senha)
-            
-            # Verificar se é um usuário
-            self.cursor.execute("SELECT id, nome FROM users WHERE email = ? AND senha = ?", 
-                               (email, hashed_password))
-            user = self.cursor.fetchone()
-            
-            if user:
-                self.current_user = user[0]
-                self.user_type = "user"
-                self.user_name = user[1]
-                self.show_main_menu()
-                return
-            
-            # Verificar se é uma empresa
-            self.cursor.execute("SELECT id, nome_empresa FROM empresas WHERE email = ? AND senha = ?", 
-                               (email, hashed_password))
-            empresa = self.cursor.fetchone()
-            
-            if empresa:
-                self.current_user = empresa[0]
-                self.user_type = "empresa"
-                self.user_name = empresa[1]
-                self.show_main_menu()
-                return
-            
-            messagebox.showerror("Erro", "Email ou senha incorretos!")
+            self.executar_em_segundo_plano(
+                buscar_credenciais,
+                lambda conta: self._credenciais_carregadas(conta, senha),
+                email,
+                erro="Ocorreu um erro durante o login."
+            )
             
         except Exception as e:
             print(f"Erro ao fazer login: {str(e)}")
             print(traceback.format_exc())
             messagebox.showerror("Erro", f"Ocorreu um erro durante o login: {str(e)}")
     
+    def _credenciais_carregadas(self, conta, senha):
+        """Confere a senha no pool, sem travar a interface durante o scrypt"""
+        if not conta:
+            # Mesmo custo de um email cadastrado, para o tempo não revelar quais existem
+            self.calcular_em_segundo_plano(
+                verificar_senha,
+                lambda resultado: self._login_concluido(None),
+                senha, HASH_SENHA_AUSENTE,
+                erro="Ocorreu um erro durante o login."
+            )
+            return
+        
+        self.calcular_em_segundo_plano(
+            verificar_senha,
+            lambda resultado: self._senha_verificada(conta, senha, resultado),
+            senha, conta[3],
+            erro="Ocorreu um erro durante o login."
+        )
+    
+    def _senha_verificada(self, conta, senha, resultado):
+        conta_id, tipo_conta, nome, armazenado = conta
+        confere, precisa_recalcular = resultado
+        if confere and precisa_recalcular:
+            # Hash legado ou com custo antigo: recalcular e gravar sem atrasar o login
+            futuro = self.pool_senhas.submit(gerar_hash_senha, senha)
+            futuro.add_done_callback(
+                lambda f: f.exception() is None and self.db.submeter(
+                    atualizar_hash_senha, conta_id, tipo_conta, armazenado, f.result()
+                )
+            )
+        self._login_concluido((conta_id, tipo_conta, nome) if confere else None)
+    
+    def _login_concluido(self, conta):
+        """Abre o menu principal com a conta autenticada"""
+        if not conta:
+            messagebox.showerror("Erro", "Email ou senha incorretos!")
+            return
+        
+        self.current_user, self.user_type, self.user_name = conta
+        
+        # Carregar o status de todas as conexões uma única vez por sessão
+        self.executar_em_segundo_plano(
+            listar_status_conexoes,
+            self._sessao_iniciada,
+            self.current_user, self.user_type,
+            erro="Ocorreu um erro durante o login."
+        )
+    
+    def _sessao_iniciada(self, status_conexoes):
+        """Guarda o mapa de status das conexões e abre o menu principal"""
+        self.status_conexoes = status_conexoes
+        self.show_main_menu()
+    
     def show_main_menu(self):
         """Exibe o menu principal após o login"""
         try:
@@ -657,7 +1520,7 @@ class BossBridgeSystem:
             # Barra lateral
             sidebar_frame = ctk.CTkFrame(self.root, width=200, corner_radius=0, fg_color="#1E1E1E")
             sidebar_frame.grid(row=0, column=0, rowspan=2, sticky="nsew")
-            sidebar_frame.grid_rowconfigure(7, weight=1)
+            sidebar_frame.grid_rowconfigure(8, weight=1)
             
             # Logo
             logo_label = ctk.CTkLabel(
@@ -683,6 +1546,7 @@ class BossBridgeSystem:
                 ("Meu Perfil", self.show_profile),
                 ("Conexões", self.show_connections),
                 ("Conversas", self.show_conversations),
+                ("Notificações", self.show_notifications),
                 ("Configurações", self.show_settings),
             ]
             
@@ -711,12 +1575,19 @@ class BossBridgeSystem:
                 hover_color="#1E1E1E",
                 height=40
             )
-            logout_button.grid(row=8, column=0, padx=10, pady=20, sticky="ew")
+            logout_button.grid(row=9, column=0, padx=10, pady=20, sticky="ew")
             
             # Área de conteúdo
             self.content_frame = ctk.CTkFrame(self.root, fg_color="#2B2B2B")
             self.content_frame.grid(row=0, column=1, rowspan=2, sticky="nsew", padx=10, pady=10)
             
+            # Telas montadas uma vez por sessão; a navegação só alterna entre elas
+            self.telas = GerenciadorTelas(self, self.content_frame)
+            
+            # Dados que os eventos não corrigem no lugar: recarregar na próxima exibição
+            self.assinar_na_tela(EVENTO_CONEXAO_SOLICITADA, lambda **_: self.telas.marcar_suja("dashboard"))
+            self.assinar_na_tela(EVENTO_CONEXAO_ACEITA, lambda **_: self.telas.marcar_suja("conversas"))
+            
             # Mostrar dashboard por padrão
             self.show_dashboard()
             
@@ -728,127 +1599,98 @@ class BossBridgeSystem:
     def show_dashboard(self):
         """Exibe o dashboard com estatísticas e notificações"""
         try:
-            self.clear_content()
-            
-            # Título
-            title_label = ctk.CTkLabel(
-                self.content_frame, 
-                text="Dashboard", 
-                font=ctk.CTkFont(size=24, weight="bold"),
-                text_color="#1E90FF"
-            )
-            title_label.pack(pady=(20, 30))
-            
-            # Estatísticas
-            stats_frame = ctk.CTkFrame(self.content_frame, fg_color="#1E1E1E")
-            stats_frame.pack(pady=10, padx=20, fill="x")
-            
-            # Obter estatísticas do banco de dados
-            if self.user_type == "user":
-                # Conexões do usuário
-                self.cursor.execute("SELECT COUNT(*) FROM conexoes WHERE user_id = ? AND status = 'aceita'", 
-                                   (self.current_user,))
-                conexoes = self.cursor.fetchone()[0]
-                
-                # Mensagens não lidas
-                self.cursor.execute("SELECT COUNT(*) FROM mensagens WHERE destinatario_id = ? AND tipo_destinatario = 'user' AND lida = 0", 
-                                   (self.current_user,))
-                mensagens = self.cursor.fetchone()[0]
-                
-                # Notificações não lidas
-                self.cursor.execute("SELECT COUNT(*) FROM notificacoes WHERE usuario_id = ? AND tipo_usuario = 'user' AND lida = 0", 
-                                   (self.current_user,))
-                notificacoes = self.cursor.fetchone()[0]
-                
-                stats_data = [
-                    ("Conexões Ativas", conexoes, "#1E90FF"),
-                    ("Mensagens Não Lidas", mensagens, "#00BFFF"),
-                    ("Notificações", notificacoes, "#4682B4")
-                ]
-            
-            else:  # Empresa
-                # Conexões da empresa
-                self.cursor.execute("SELECT COUNT(*) FROM conexoes WHERE empresa_id = ? AND status = 'aceita'", 
-                                   (self.current_user,))
-                conexoes = self.cursor.fetchone()[0]
+            self.telas.exibir("dashboard", self._construir_dashboard)
                 
-                # Mensagens não lidas
-                self.cursor.execute("SELECT COUNT(*) FROM mensagens WHERE destinatario_id = ? AND tipo_destinatario = 'empresa' AND lida = 0", 
-                                   (self.current_user,))
-                mensagens = self.cursor.fetchone()[0]
-                
-                # Notificações não lidas
-                self.cursor.execute("SELECT COUNT(*) FROM notificacoes WHERE usuario_id = ? AND tipo_usuario = 'empresa' AND lida = 0", 
-                                   (self.current_user,))
-                notificacoes = self.cursor.fetchone()[0]
-                
-                stats_data = [
-                    ("Conexões Ativas", conexoes, "#1E90FF"),
-                    ("Mensagens Não Lidas", mensagens, "#00BFFF"),
-                    ("Notificações", notificacoes, "#4682B4")
-                ]
-            
-            # Exibir estatísticas
-            for i, (title, value, color) in enumerate(stats_data):
-                stat_frame = ctk.CTkFrame(stats_frame, fg_color=color, corner_radius=10)
-                stat_frame.grid(row=0, column=i, padx=10, pady=10, sticky="nsew")
-                
-                title_label = ctk.CTkLabel(
-                    stat_frame, 
-                    text=title,
-                    font=ctk.CTkFont(size=16, weight="bold"),
-                    text_color="#FFFFFF"
-                )
-                title_label.pack(pady=(15, 5))
-                
-                value_label = ctk.CTkLabel(
-                    stat_frame, 
-                    text=str(value),
-                    font=ctk.CTkFont(size=24, weight="bold"),
-                    text_color="#FFFFFF"
-                )
-                value_label.pack(pady=(5, 15))
-            
-            stats_frame.columnconfigure((0, 1, 2), weight=1)
-            
-            # Atividades recentes
-            activities_frame = ctk.CTkFrame(self.content_frame, fg_color="#1E1E1E")
-            activities_frame.pack(pady=20, padx=20, fill="both", expand=True)
+        except Exception as e:
+            print(f"Erro ao exibir dashboard: {str(e)}")
+            print(traceback.format_exc())
+            messagebox.showerror("Erro", "Ocorreu um erro ao carregar o dashboard.")
+
+    def _construir_dashboard(self, tela):
+        """Monta o dashboard; retorna a função que recarrega estatísticas e atividades"""
+        # Título
+        title_label = ctk.CTkLabel(
+            tela, 
+            text="Dashboard", 
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#1E90FF"
+        )
+        title_label.pack(pady=(20, 30))
+        
+        # Estatísticas
+        stats_frame = ctk.CTkFrame(tela, fg_color="#1E1E1E")
+        stats_frame.pack(pady=10, padx=20, fill="x")
+        
+        stats_loading = self.show_loading(stats_frame)
+        
+        # Atividades recentes
+        activities_frame = ctk.CTkFrame(tela, fg_color="#1E1E1E")
+        activities_frame.pack(pady=20, padx=20, fill="both", expand=True)
+        
+        activities_label = ctk.CTkLabel(
+            activities_frame, 
+            text="Atividades Recentes",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#1E90FF"
+        )
+        activities_label.pack(pady=(15, 10))
+        
+        activities_loading = self.show_loading(activities_frame)
+        
+        valores = []        # [valor, label] de cada estatística, criados na primeira carga
+        atividades_ui = []  # widgets da lista de atividades, refeitos a cada carga
+        
+        def preencher(dados):
+            (conexoes, mensagens, notificacoes), atividades = dados
             
-            activities_label = ctk.CTkLabel(
-                activities_frame, 
-                text="Atividades Recentes",
-                font=ctk.CTkFont(size=18, weight="bold"),
-                text_color="#1E90FF"
-            )
-            activities_label.pack(pady=(15, 10))
+            stats_data = [
+                ("Conexões Ativas", conexoes, "#1E90FF"),
+                ("Mensagens Não Lidas", mensagens, "#00BFFF"),
+                ("Notificações", notificacoes, "#4682B4")
+            ]
             
-            # Obter atividades recentes
-            if self.user_type == "user":
-                self.cursor.execute('''
-                    SELECT 'Nova conexão com ' || e.nome_empresa, data_conexao 
-                    FROM conexoes c 
-                    JOIN empresas e ON c.empresa_id = e.id 
-                    WHERE c.user_id = ? 
-                    ORDER BY data_conexao DESC 
-                    LIMIT 5
-                ''', (self.current_user,))
+            if valores:
+                # Recarga: só os números mudam
+                for valor, (_, value, _) in zip(valores, stats_data):
+                    valor[0] = value
+                    valor[1].configure(text=str(value))
             else:
-                self.cursor.execute('''
-                    SELECT 'Nova conexão com ' || u.nome_completo, data_conexao 
-                    FROM conexoes c 
-                    JOIN users u ON c.user_id = u.id 
-                    WHERE c.empresa_id = ? 
-                    ORDER BY data_conexao DESC 
-                    LIMIT 5
-                ''', (self.current_user,))
+                stats_loading.destroy()
+                activities_loading.destroy()
+                
+                # Exibir estatísticas
+                for i, (title, value, color) in enumerate(stats_data):
+                    stat_frame = ctk.CTkFrame(stats_frame, fg_color=color, corner_radius=10)
+                    stat_frame.grid(row=0, column=i, padx=10, pady=10, sticky="nsew")
+                    
+                    title_label = ctk.CTkLabel(
+                        stat_frame, 
+                        text=title,
+                        font=ctk.CTkFont(size=16, weight="bold"),
+                        text_color="#FFFFFF"
+                    )
+                    title_label.pack(pady=(15, 5))
+                    
+                    value_label = ctk.CTkLabel(
+                        stat_frame, 
+                        text=str(value),
+                        font=ctk.CTkFont(size=24, weight="bold"),
+                        text_color="#FFFFFF"
+                    )
+                    value_label.pack(pady=(5, 15))
+                    valores.append([value, value_label])
+                
+                stats_frame.columnconfigure((0, 1, 2), weight=1)
             
-            atividades = self.cursor.fetchall()
+            for widget in atividades_ui:
+                widget.destroy()
+            atividades_ui.clear()
             
             if atividades:
                 for atividade, data in atividades:
                     activity_frame = ctk.CTkFrame(activities_frame, fg_color="#2B2B2B")
                     activity_frame.pack(pady=5, padx=10, fill="x")
+                    atividades_ui.append(activity_frame)
                     
                     activity_label = ctk.CTkLabel(
                         activity_frame, 
@@ -873,73 +1715,102 @@ class BossBridgeSystem:
                     text_color="#CCCCCC"
                 )
                 no_activity_label.pack(pady=20)
-                
-        except Exception as e:
-            print(f"Erro ao exibir dashboard: {str(e)}")
-            print(traceback.format_exc())
-            messagebox.showerror("Erro", "Ocorreu um erro ao carregar o dashboard.")
+                atividades_ui.append(no_activity_label)
+        
+        # Eventos ajustam os totais exibidos sem nova consulta, mesmo com a tela oculta
+        def somar(indice, delta):
+            if valores:
+                valores[indice][0] += delta
+                valores[indice][1].configure(text=str(valores[indice][0]))
+        
+        self.assinar_na_tela(EVENTO_CONEXAO_ACEITA, lambda **_: somar(0, 1))
+        self.assinar_na_tela(EVENTO_MENSAGENS_LIDAS, lambda quantidade, **_: somar(1, -quantidade))
+        self.assinar_na_tela(EVENTO_NOTIFICACOES_LIDAS, lambda quantidade: somar(2, -quantidade))
+        
+        def atualizar():
+            # Obter estatísticas e atividades sem bloquear a interface
+            self.executar_em_segundo_plano(
+                consultar_dashboard,
+                preencher,
+                self.current_user, self.user_type,
+                erro="Ocorreu um erro ao carregar o dashboard."
+            )
+        
+        atualizar()
+        return atualizar
 
     def show_profile(self):
         """Exibe o perfil do usuário ou empresa"""
         try:
-            self.clear_content()
-            
-            # Título
-            title_label = ctk.CTkLabel(
-                self.content_frame, 
-                text="Meu Perfil", 
-                font=ctk.CTkFont(size=24, weight="bold"),
-                text_color="#1E90FF"
-            )
-            title_label.pack(pady=(20, 30))
-            
-            # Frame principal com scroll
-            profile_frame = ctk.CTkScrollableFrame(self.content_frame, fg_color="#2B2B2B")
-            profile_frame.pack(pady=10, padx=20, fill="both", expand=True)
-            
-            # Foto de perfil
-            photo_frame = ctk.CTkFrame(profile_frame, fg_color="transparent")
-            photo_frame.pack(pady=20)
-            
-            # Placeholder para imagem (seria implementado com upload real)
-            photo_placeholder = ctk.CTkLabel(
-                photo_frame, 
-                text="📷",
-                font=ctk.CTkFont(size=40),
-                width=100,
-                height=100,
-                fg_color="#1E1E1E",
-                corner_radius=50
-            )
-            photo_placeholder.pack()
+            self.telas.exibir("perfil", self._construir_perfil)
             
-            upload_button = ctk.CTkButton(
-                photo_frame, 
-                text="Alterar Foto",
-                width=120,
-                height=30,
-                fg_color="#1E1E1E",
-                border_color="#1E90FF",
-                border_width=1,
-                text_color="#1E90FF",
-                hover_color="#2B2B2B"
-            )
-            upload_button.pack(pady=10)
+        except Exception as e:
+            print(f"Erro ao exibir perfil: {str(e)}")
+            print(traceback.format_exc())
+            messagebox.showerror("Erro", "Ocorreu um erro ao carregar o perfil.")
+
+    def _construir_perfil(self, tela):
+        """Monta a tela de perfil; os dados são carregados uma vez, pois nada na sessão os altera"""
+        # Título
+        title_label = ctk.CTkLabel(
+            tela, 
+            text="Meu Perfil", 
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#1E90FF"
+        )
+        title_label.pack(pady=(20, 30))
+        
+        # Frame principal com scroll
+        profile_frame = ctk.CTkScrollableFrame(tela, fg_color="#2B2B2B")
+        profile_frame.pack(pady=10, padx=20, fill="both", expand=True)
+        
+        # Foto de perfil
+        photo_frame = ctk.CTkFrame(profile_frame, fg_color="transparent")
+        photo_frame.pack(pady=20)
+        
+        # Placeholder para imagem (seria implementado com upload real)
+        photo_placeholder = ctk.CTkLabel(
+            photo_frame, 
+            text="📷",
+            font=ctk.CTkFont(size=40),
+            width=100,
+            height=100,
+            fg_color="#1E1E1E",
+            corner_radius=50
+        )
+        photo_placeholder.pack()
+        
+        upload_button = ctk.CTkButton(
+            photo_frame, 
+            text="Alterar Foto",
+            width=120,
+            height=30,
+            fg_color="#1E1E1E",
+            border_color="#1E90FF",
+            border_width=1,
+            text_color="#1E90FF",
+            hover_color="#2B2B2B"
+        )
+        upload_button.pack(pady=10)
+        
+        # Widgets ligados aos dados, refeitos a cada carga
+        dados_ui = [self.show_loading(profile_frame)]
+        
+        def preencher(dados):
+            for widget in dados_ui:
+                widget.destroy()
+            dados_ui.clear()
             
-            # Obter dados do perfil
             if self.user_type == "user":
-                self.cursor.execute(
-                    "SELECT nome, email, genero, numero, data_criacao FROM users WHERE id = ?",
-                    (self.current_user,)
-                )
-                user_data = self.cursor.fetchone()
-                
+                user_data = dados
+            
                 if user_data:
                     nome, email, genero, numero, data_criacao = user_data
-                    
+                
                     info_frame = ctk.CTkFrame(profile_frame, fg_color="#1E1E1E", corner_radius=10)
                     info_frame.pack(pady=10, padx=20, fill="x")
-                    
+                    dados_ui.append(info_frame)
+                
                     fields = [
                         ("Nome Completo", nome),
                         ("Email", email),
@@ -947,11 +1818,11 @@ class BossBridgeSystem:
                         ("Número", numero),
                         ("Data de Criação", data_criacao)
                     ]
-                    
+                
                     for i, (label, value) in enumerate(fields):
                         field_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
                         field_frame.pack(pady=10, padx=20, fill="x")
-                        
+                    
                         label_widget = ctk.CTkLabel(
                             field_frame, 
                             text=label + ":",
@@ -961,7 +1832,7 @@ class BossBridgeSystem:
                             anchor="w"
                         )
                         label_widget.pack(side="left")
-                        
+                    
                         value_widget = ctk.CTkLabel(
                             field_frame, 
                             text=value or "Não informado",
@@ -970,23 +1841,18 @@ class BossBridgeSystem:
                             anchor="w"
                         )
                         value_widget.pack(side="left", padx=(10, 0))
-            
+        
             else:  # Empresa
-                self.cursor.execute(
-                    """SELECT cnpj, nome_empresa, razao_social, logradouro, numero_endereco, 
-                    complemento, cidade, estado, cep, email, data_criacao 
-                    FROM empresas WHERE id = ?""",
-                    (self.current_user,)
-                )
-                empresa_data = self.cursor.fetchone()
-                
+                empresa_data = dados
+            
                 if empresa_data:
                     (cnpj, nome_empresa, razao_social, logradouro, numero_endereco, 
                      complemento, cidade, estado, cep, email, data_criacao) = empresa_data
-                    
+                
                     info_frame = ctk.CTkFrame(profile_frame, fg_color="#1E1E1E", corner_radius=10)
                     info_frame.pack(pady=10, padx=20, fill="x")
-                    
+                    dados_ui.append(info_frame)
+                
                     fields = [
                         ("CNPJ", cnpj),
                         ("Nome da Empresa", nome_empresa),
@@ -999,11 +1865,11 @@ class BossBridgeSystem:
                         ("Email", email),
                         ("Data de Criação", data_criacao)
                     ]
-                    
+                
                     for i, (label, value) in enumerate(fields):
                         field_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
                         field_frame.pack(pady=10, padx=20, fill="x")
-                        
+                    
                         label_widget = ctk.CTkLabel(
                             field_frame, 
                             text=label + ":",
@@ -1013,7 +1879,7 @@ class BossBridgeSystem:
                             anchor="w"
                         )
                         label_widget.pack(side="left")
-                        
+                    
                         value_widget = ctk.CTkLabel(
                             field_frame, 
                             text=value or "Não informado",
@@ -1022,7 +1888,7 @@ class BossBridgeSystem:
                             anchor="w"
                         )
                         value_widget.pack(side="left", padx=(10, 0))
-            
+        
             # Botão de editar perfil
             edit_button = ctk.CTkButton(
                 profile_frame, 
@@ -1034,11 +1900,15 @@ class BossBridgeSystem:
                 command=self.edit_profile
             )
             edit_button.pack(pady=30)
-            
-        except Exception as e:
-            print(f"Erro ao exibir perfil: {str(e)}")
-            print(traceback.format_exc())
-            messagebox.showerror("Erro", "Ocorreu um erro ao carregar o perfil.")
+            dados_ui.append(edit_button)
+        
+        # Obter dados do perfil sem bloquear a interface
+        self.executar_em_segundo_plano(
+            consultar_perfil,
+            preencher,
+            self.current_user, self.user_type,
+            erro="Ocorreu um erro ao carregar o perfil."
+        )
 
     def edit_profile(self):
         """Abre a tela de edição de perfil"""
@@ -1047,407 +1917,185 @@ class BossBridgeSystem:
     def show_connections(self):
         """Exibe a tela de conexões"""
         try:
-            self.clear_content()
+            self.telas.exibir("conexoes", self._construir_conexoes)
             
-            # Título
-            title_label = ctk.CTkLabel(
-                self.content_frame, 
-                text="Conexões", 
-                font=ctk.CTkFont(size=24, weight="bold"),
-                text_color="#1E90FF"
-            )
-            title_label.pack(pady=(20, 10))
-            
-            # Abas para Busca e Conexões Existentes
-            tabview = ctk.CTkTabview(self.content_frame, fg_color="#2B2B2B")
-            tabview.pack(pady=10, padx=20, fill="both", expand=True)
-            
-            tabview.add("Buscar")
-            tabview.add("Suas Conexões")
-            
-            # ABA 1: BUSCAR
-            search_frame = tabview.tab("Buscar")
-            
-            # Barra de pesquisa
-            search_entry = ctk.CTkEntry(
-                search_frame, 
-                placeholder_text="Digite para buscar...",
-                height=40
-            )
-            search_entry.pack(pady=10, padx=20, fill="x")
-            
-            search_button = ctk.CTkButton(
-                search_frame, 
-                text="Buscar",
-                height=40,
-                fg_color="#1E90FF",
-                hover_color="#0078D7",
-                command=lambda: self.perform_search(search_entry.get(), results_frame)
-            )
-            search_button.pack(pady=(0, 20), padx=20)
-            
-            # Frame para resultados
-            results_frame = ctk.CTkScrollableFrame(search_frame, fg_color="#1E1E1E")
-            results_frame.pack(pady=10, padx=20, fill="both", expand=True)
-            
-            # Texto inicial
-            initial_text = ctk.CTkLabel(
-                results_frame, 
-                text="Use a barra de busca para encontrar conexões",
-                font=ctk.CTkFont(size=14),
-                text_color="#CCCCCC"
-            )
-            initial_text.pack(pady=20)
-            
-            # ABA 2: SUAS CONEXÕES
-            connections_frame = tabview.tab("Suas Conexões")
-            
-            # Obter conexões do usuário
-            if self.user_type == "user":
-                self.cursor.execute('''
-                    SELECT c.id, e.nome_empresa, e.email, c.status, c.data_conexao 
-                    FROM conexoes c 
-                    JOIN empresas e ON c.empresa_id = e.id 
-                    WHERE c.user_id = ?
-                ''', (self.current_user,))
-            else:
-                self.cursor.execute('''
-                    SELECT c.id, u.nome_completo, u.email, c.status, c.data_conexao 
-                    FROM conexoes c 
-                    JOIN users u ON c.user_id = u.id 
-                    WHERE c.empresa_id = ?
-                ''', (self.current_user,))
-            
-            conexoes = self.cursor.fetchall()
-            
-            if conexoes:
-                connections_scroll = ctk.CTkScrollableFrame(connections_frame, fg_color="#1E1E1E")
-                connections_scroll.pack(pady=10, padx=20, fill="both", expand=True)
-                
-                for conn_id, nome, email, status, data in conexoes:
-                    conn_frame = ctk.CTkFrame(connections_scroll, fg_color="#2B2B2B", corner_radius=10)
-                    conn_frame.pack(pady=5, padx=5, fill="x")
-                    
-                    # Informações da conexão
-                    info_frame = ctk.CTkFrame(conn_frame, fg_color="transparent")
-                    info_frame.pack(pady=10, padx=10, fill="x", side="left", expand=True)
-                    
-                    name_label = ctk.CTkLabel(
-                        info_frame, 
-                        text=nome,
-                        font=ctk.CTkFont(size=16, weight="bold"),
-                        text_color="#FFFFFF",
-                        anchor="w"
-                    )
-                    name_label.pack(anchor="w")
-                    
-                    email_label = ctk.CTkLabel(
-                        info_frame, 
-                        text=email,
-                        font=ctk.CTkFont(size=14),
-                        text_color="#CCCCCC",
-                        anchor="w"
-                    )
-                    email_label.pack(anchor="w")
-                    
-                    status_label = ctk.CTkLabel(
-                        info_frame, 
-                        text=f"Status: {status}",
-                        font=ctk.CTkFont(size=14),
-                        text_color="#1E90FF" if status == "aceita" else "#FFA500",
-                        anchor="w"
-                    )
-                    status_label.pack(anchor="w")
-                    
-                    date_label = ctk.CTkLabel(
-                        info_frame, 
-                        text=f"Data: {data.split()[0]}",
-                        font=ctk.CTkFont(size=12),
-                        text_color="#888888",
-                        anchor="w"
-                    )
-                    date_label.pack(anchor="w")
-                    
-                    # Botões de ação
-                    if status == "pendente" and self.user_type == "empresa":
-                        actions_frame = ctk.CTkFrame(conn_frame, fg_color="transparent")
-                        actions_frame.pack(pady=10, padx=10, side="right")
-                        
-                        accept_button = ctk.CTkButton(
-                            actions_frame, 
-                            text="Aceitar",
-                            width=80,
-                            height=30,
-                            fg_color="#00AA00",
-                            hover_color="#008800",
-                            command=lambda cid=conn_id: self.responder_solicitacao(cid, "aceita")
-                        )
-                        accept_button.pack(pady=5)
-                        
-                        reject_button = ctk.CTkButton(
-                            actions_frame, 
-                            text="Recusar",
-                            width=80,
-                            height=30,
-                            fg_color="#AA0000",
-                            hover_color="#880000",
-                            command=lambda cid=conn_id: self.responder_solicitacao(cid, "recusada")
-                        )
-                        reject_button.pack(pady=5)
-                    
-                    elif status == "aceita":
-                        actions_frame = ctk.CTkFrame(conn_frame, fg_color="transparent")
-                        actions_frame.pack(pady=10, padx=10, side="right")
-                        
-                        message_button = ctk.CTkButton(
-                            actions_frame, 
-                            text="Mensagem",
-                            width=100,
-                            height=30,
-                            fg_color="#1E90FF",
-                            hover_color="#0078D7",
-                            command=lambda n=nome, e=email: self.iniciar_conversa(n, e)
-                        )
-                        message_button.pack(pady=5)
-            else:
-                no_connections_label = ctk.CTkLabel(
-                    connections_frame, 
-                    text="Você ainda não possui conexões",
-                    font=ctk.CTkFont(size=16),
-                    text_color="#CCCCCC"
-                )
-                no_connections_label.pack(pady=50)
-                
         except Exception as e:
             print(f"Erro ao exibir conexões: {str(e)}")
             print(traceback.format_exc())
             messagebox.showerror("Erro", "Ocorreu um erro ao carregar as conexões.")
 
-    def perform_search(self, query, results_frame):
+    def _construir_conexoes(self, tela):
+        """Monta as abas de busca e de conexões"""
+        # Título
+        title_label = ctk.CTkLabel(
+            tela, 
+            text="Conexões", 
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#1E90FF"
+        )
+        title_label.pack(pady=(20, 10))
+        
+        # Abas para Busca e Conexões Existentes
+        tabview = ctk.CTkTabview(tela, fg_color="#2B2B2B")
+        tabview.pack(pady=10, padx=20, fill="both", expand=True)
+        
+        tabview.add("Buscar")
+        tabview.add("Suas Conexões")
+        
+        # ABA 1: BUSCAR
+        search_frame = tabview.tab("Buscar")
+        
+        # Barra de pesquisa
+        search_entry = ctk.CTkEntry(
+            search_frame, 
+            placeholder_text="Digite para buscar...",
+            height=40
+        )
+        search_entry.pack(pady=10, padx=20, fill="x")
+        
+        # Busca enquanto digita; Enter e o botão buscam na hora
+        search_entry.bind("<KeyRelease>", lambda e: self.agendar_busca(search_entry, results_list))
+        search_entry.bind("<Return>", lambda e: self.buscar_agora(search_entry, results_list))
+        
+        search_button = ctk.CTkButton(
+            search_frame, 
+            text="Buscar",
+            height=40,
+            fg_color="#1E90FF",
+            hover_color="#0078D7",
+            command=lambda: self.buscar_agora(search_entry, results_list)
+        )
+        search_button.pack(pady=(0, 20), padx=20)
+        
+        # Lista virtualizada para resultados
+        results_list = ListaVirtual(
+            search_frame,
+            lambda master, altura: LinhaResultadoBusca(master, altura, self),
+            altura_linha=110,
+            texto_vazio="Use a barra de busca para encontrar conexões",
+            fg_color="#1E1E1E"
+        )
+        results_list.pack(pady=10, padx=20, fill="both", expand=True)
+        results_list.busca_agendada = None          # id do after da busca incremental
+        results_list.busca_anterior = ("", None)    # (termos normalizados, fonte exibida)
+        
+        # ABA 2: SUAS CONEXÕES
+        connections_frame = tabview.tab("Suas Conexões")
+        
+        connections_list = ListaVirtual(
+            connections_frame,
+            lambda master, altura: LinhaConexao(master, altura, self),
+            altura_linha=140,
+            texto_vazio="Você ainda não possui conexões",
+            fg_color="#1E1E1E"
+        )
+        connections_list.pack(pady=10, padx=20, fill="both", expand=True)
+        
+        # Conexões carregadas por página conforme a rolagem
+        connections_list.definir_fonte(FontePaginada(
+            self.executar_em_segundo_plano,
+            listar_conexoes,
+            self.current_user, self.user_type
+        ))
+        
+        # Manter as duas abas em dia sem consultar o banco de novo
+        def conexao_solicitada(conexao_id, nome, email, data, **_):
+            connections_list.fonte.inserir_no_inicio((conexao_id, nome, email, "pendente", data))
+            results_list.religar()
+        
+        def conexao_respondida(status):
+            def aplicar(conexao_id, **_):
+                connections_list.fonte.alterar_linhas(
+                    lambda linha: linha[:3] + (status,) + linha[4:] if linha[0] == conexao_id else linha
+                )
+                results_list.religar()
+            return aplicar
+        
+        self.assinar_na_tela(EVENTO_CONEXAO_SOLICITADA, conexao_solicitada)
+        self.assinar_na_tela(EVENTO_CONEXAO_ACEITA, conexao_respondida("aceita"))
+        self.assinar_na_tela(EVENTO_CONEXAO_RECUSADA, conexao_respondida("recusada"))
+
+    def agendar_busca(self, search_entry, results_list):
+        """Reinicia a espera a cada tecla; a busca só roda quando a digitação pausa"""
+        if results_list.busca_agendada:
+            results_list.after_cancel(results_list.busca_agendada)
+        results_list.busca_agendada = results_list.after(
+            ATRASO_BUSCA_MS, self.buscar_agora, search_entry, results_list
+        )
+    
+    def buscar_agora(self, search_entry, results_list):
+        """Descarta a busca agendada e busca o texto atual imediatamente"""
+        if results_list.busca_agendada:
+            results_list.after_cancel(results_list.busca_agendada)
+            results_list.busca_agendada = None
+        self.perform_search(search_entry.get(), results_list)
+    
+    def perform_search(self, query, results_list):
         """Realiza a busca por usuários ou empresas"""
         try:
-            # Limpar resultados anteriores
-            for widget in results_frame.winfo_children():
-                widget.destroy()
+            termos = termos_busca(query)
+            consulta = " ".join(termos)
+            anterior, fonte_anterior = results_list.busca_anterior
             
-            if not query:
-                no_results = ctk.CTkLabel(
-                    results_frame, 
-                    text="Digite algo para buscar",
-                    font=ctk.CTkFont(size=14),
-                    text_color="#CCCCCC"
-                )
-                no_results.pack(pady=20)
+            # Mesmo conjunto de termos: os resultados exibidos continuam válidos
+            if consulta and consulta == anterior:
                 return
             
-            if self.user_type == "user":
-                # Buscar empresas
-                self.cursor.execute('''
-                    SELECT id, nome_empresa, email, cidade, estado 
-                    FROM empresas 
-                    WHERE nome_empresa LIKE ? OR razao_social LIKE ? OR email LIKE ?
-                ''', (f'%{query}%', f'%{query}%', f'%{query}%'))
-                
-                resultados = self.cursor.fetchall()
-                
-                if resultados:
-                    for emp_id, nome, email, cidade, estado in resultados:
-                        emp_frame = ctk.CTkFrame(results_frame, fg_color="#2B2B2B", corner_radius=10)
-                        emp_frame.pack(pady=5, padx=5, fill="x")
-                        
-                        # Informações da empresa
-                        info_frame = ctk.CTkFrame(emp_frame, fg_color="transparent")
-                        info_frame.pack(pady=10, padx=10, fill="x", side="left", expand=True)
-                        
-                        name_label = ctk.CTkLabel(
-                            info_frame, 
-                            text=nome,
-                            font=ctk.CTkFont(size=16, weight="bold"),
-                            text_color="#FFFFFF",
-                            anchor="w"
-                        )
-                        name_label.pack(anchor="w")
-                        
-                        email_label = ctk.CTkLabel(
-                            info_frame, 
-                            text=email,
-                            font=ctk.CTkFont(size=14),
-                            text_color="#CCCCCC",
-                            anchor="w"
-                        )
-                        email_label.pack(anchor="w")
-                        
-                        location_label = ctk.CTkLabel(
-                            info_frame, 
-                            text=f"{cidade}, {estado}" if cidade and estado else "Localização não informada",
-                            font=ctk.CTkFont(size=14),
-                            text_color="#888888",
-                            anchor="w"
-                        )
-                        location_label.pack(anchor="w")
-                        
-                        # Verificar se já existe conexão
-                        self.cursor.execute(
-                            "SELECT status FROM conexoes WHERE user_id = ? AND empresa_id = ?",
-                            (self.current_user, emp_id)
-                        )
-                        conexao = self.cursor.fetchone()
-                        
-                        actions_frame = ctk.CTkFrame(emp_frame, fg_color="transparent")
-                        actions_frame.pack(pady=10, padx=10, side="right")
-                        
-                        if conexao:
-                            status_label = ctk.CTkLabel(
-                                actions_frame, 
-                                text=f"Status: {conexao[0]}",
-                                font=ctk.CTkFont(size=14),
-                                text_color="#1E90FF" if conexao[0] == "aceita" else "#FFA500"
-                            )
-                            status_label.pack(pady=5)
-                        else:
-                            connect_button = ctk.CTkButton(
-                                actions_frame, 
-                                text="Conectar",
-                                width=100,
-                                height=30,
-                                fg_color="#1E90FF",
-                                hover_color="#0078D7",
-                                command=lambda eid=emp_id: self.solicitar_conexao(eid, "empresa")
-                            )
-                            connect_button.pack(pady=5)
-                else:
-                    no_results = ctk.CTkLabel(
-                        results_frame, 
-                        text="Nenhuma empresa encontrada",
-                        font=ctk.CTkFont(size=14),
-                        text_color="#CCCCCC"
-                    )
-                    no_results.pack(pady=20)
+            if not consulta:
+                results_list.busca_anterior = ("", None)
+                results_list.definir_fonte(None, "Digite algo para buscar")
+                return
             
+            if self.user_type == "user":
+                texto_vazio = "Nenhuma empresa encontrada"
             else:  # Empresa buscando usuários
-                self.cursor.execute('''
-                    SELECT id, nome_completo, email, genero, numero 
-                    FROM users 
-                    WHERE nome_completo LIKE ? OR email LIKE ?
-                 ''', (f'%{query}%', f'%{query}%'))
-                
-                resultados = self.cursor.fetchall()
+                texto_vazio = "Nenhum usuário encontrado"
+            
+            if (anterior and consulta.startswith(anterior) and fonte_anterior.completa
+                    and fonte_anterior.total < LIMITE_BUSCA):
+                # A nova consulta só restringe a anterior, que já está inteira em memória
+                fonte = FonteMemoria(
+                    linha for linha in fonte_anterior.linhas
+                    if corresponde_busca(self.user_type, linha, termos)
+                )
+            else:
+                # Resultados carregados por página; a página pendente da busca anterior é cancelada
+                fonte = FontePaginada(
+                    self.executar_em_segundo_plano, buscar_contas, self.user_type, consulta,
+                    cancelar=self.cancelar_em_segundo_plano, cache=self.cache_busca
+                )
+            
+            results_list.busca_anterior = (consulta, fonte)
+            results_list.definir_fonte(fonte, texto_vazio)
                 
-                if resultados:
-                    for user_id, nome, email, genero, numero in resultados:
-                        user_frame = ctk.CTkFrame(results_frame, fg_color="#2B2B2B", corner_radius=10)
-                        user_frame.pack(pady=5, padx=5, fill="x")
-                        
-                        # Informações do usuário
-                        info_frame = ctk.CTkFrame(user_frame, fg_color="transparent")
-                        info_frame.pack(pady=10, padx=10, fill="x", side="left", expand=True)
-                        
-                        name_label = ctk.CTkLabel(
-                            info_frame, 
-                            text=nome,
-                            font=ctk.CTkFont(size=16, weight="bold"),
-                            text_color="#FFFFFF",
-                            anchor="w"
-                        )
-                        name_label.pack(anchor="w")
-                        
-                        email_label = ctk.CTkLabel(
-                            info_frame, 
-                            text=email,
-                            font=ctk.CTkFont(size=14),
-                            text_color="#CCCCCC",
-                            anchor="w"
-                        )
-                        email_label.pack(anchor="w")
-                        
-                        gender_label = ctk.CTkLabel(
-                            info_frame, 
-                            text=genero or "Gênero não informado",
-                            font=ctk.CTkFont(size=14),
-                            text_color="#888888",
-                            anchor="w"
-                        )
-                        gender_label.pack(anchor="w")
-                        
-                        # Verificar se já existe conexão
-                        self.cursor.execute(
-                            "SELECT status FROM conexoes WHERE empresa_id = ? AND user_id = ?",
-                            (self.current_user, user_id)
-                        )
-                        conexao = self.cursor.fetchone()
-                        
-                        actions_frame = ctk.CTkFrame(user_frame, fg_color="transparent")
-                        actions_frame.pack(pady=10, padx=10, side="right")
-                        
-                        if conexao:
-                            status_label = ctk.CTkLabel(
-                                actions_frame, 
-                                text=f"Status: {conexao[0]}",
-                                font=ctk.CTkFont(size=14),
-                                text_color="#1E90FF" if conexao[0] == "aceita" else "#FFA500"
-                            )
-                            status_label.pack(pady=5)
-                        else:
-                            connect_button = ctk.CTkButton(
-                                actions_frame, 
-                                text="Conectar",
-                                width=100,
-                                height=30,
-                                fg_color="#1E90FF",
-                                hover_color="#0078D7",
-                                command=lambda uid=user_id: self.solicitar_conexao(uid, "user")
-                            )
-                            connect_button.pack(pady=5)
-                else:
-                    no_results = ctk.CTkLabel(
-                        results_frame, 
-                        text="Nenhum usuário encontrado",
-                        font=ctk.CTkFont(size=14),
-                        text_color="#CCCCCC"
-                    )
-                    no_results.pack(pady=20)
-                    
         except Exception as e:
             print(f"Erro ao realizar busca: {str(e)}")
             print(traceback.format_exc())
             messagebox.showerror("Erro", "Ocorreu um erro durante a busca.")
 
-    def solicitar_conexao(self, target_id, target_type):
+    def solicitar_conexao(self, target_id, target_type, nome="", email=""):
         """Solicita uma conexão com usuário ou empresa"""
         try:
-            if self.user_type == "user" and target_type == "empresa":
-                self.cursor.execute(
-                    "INSERT INTO conexoes (user_id, empresa_id) VALUES (?, ?)",
-                    (self.current_user, target_id)
-                )
-                self.conn.commit()
-                messagebox.showinfo("Sucesso", "Solicitação de conexão enviada!")
+            partes = partes_conexao(self.current_user, self.user_type, target_id, target_type)
+            if partes is None:
+                return
+            user_id, empresa_id = partes
             
-            elif self.user_type == "empresa" and target_type == "user":
-                self.cursor.execute(
-                    "INSERT INTO conexoes (user_id, empresa_id) VALUES (?, ?)",
-                    (target_id, self.current_user)
+            def concluido(conexao):
+                conexao_id, data = conexao
+                self.eventos.publicar(
+                    EVENTO_CONEXAO_SOLICITADA,
+                    conexao_id=conexao_id, outra_parte=target_id, nome=nome, email=email, data=data
                 )
-                self.conn.commit()
                 messagebox.showinfo("Sucesso", "Solicitação de conexão enviada!")
             
-            # Adicionar notificação
-            if target_type == "user":
-                self.cursor.execute(
-                    "INSERT INTO notificacoes (usuario_id, tipo_usuario, titulo, mensagem) VALUES (?, ?, ?, ?)",
-                    (target_id, "user", "Nova solicitação de conexão", 
-                     f"Uma empresa deseja se conectar com você")
-                )
-            else:
-                self.cursor.execute(
-                    "INSERT INTO notificacoes (usuario_id, tipo_usuario, titulo, mensagem) VALUES (?, ?, ?, ?)",
-                    (target_id, "empresa", "Nova solicitação de conexão", 
-                     f"Um investidor deseja se conectar com sua empresa")
-                )
-            self.conn.commit()
+            self.executar_em_segundo_plano(
+                criar_conexao,
+                concluido,
+                user_id, empresa_id, target_type,
+                erro="Ocorreu um erro ao solicitar conexão."
+            )
                 
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Erro", "Solicitação de conexão já existe!")
         except Exception as e:
             print(f"Erro ao solicitar conexão: {str(e)}")
             print(traceback.format_exc())
@@ -1456,386 +2104,487 @@ class BossBridgeSystem:
     def responder_solicitacao(self, conexao_id, resposta):
         """Responde a uma solicitação de conexão (apenas para empresas)"""
         try:
-            self.cursor.execute(
-                "UPDATE conexoes SET status = ? WHERE id = ?",
-                (resposta, conexao_id)
+            def concluido(resultado):
+                user_id, status_text = resultado
+                evento = EVENTO_CONEXAO_ACEITA if resposta == "aceita" else EVENTO_CONEXAO_RECUSADA
+                self.eventos.publicar(evento, conexao_id=conexao_id, outra_parte=user_id)
+                messagebox.showinfo("Sucesso", f"Solicitação {status_text} com sucesso!")
+            
+            self.executar_em_segundo_plano(
+                responder_conexao,
+                concluido,
+                conexao_id, resposta,
+                erro="Ocorreu um erro ao responder a solicitação."
             )
-            self.conn.commit()
-            
-            # Obter informações para notificação
-            self.cursor.execute(
-                "SELECT user_id FROM conexoes WHERE id = ?",
-                (conexao_id,)
-            )
-            user_id = self.cursor.fetchone()[0]
-            
-            # Adicionar notificação
-            status_text = "aceita" if resposta == "aceita" else "recusada"
-            self.cursor.execute(
-                "INSERT INTO notificacoes (usuario_id, tipo_usuario, titulo, mensagem) VALUES (?, ?, ?, ?)",
-                (user_id, "user", "Solicitação de conexão respondida", 
-                 f"Sua solicitação de conexão foi {status_text}")
-            )
-            self.conn.commit()
-            
-            messagebox.showinfo("Sucesso", f"Solicitação {status_text} com sucesso!")
-            self.show_connections()  # Recarregar a tela
             
         except Exception as e:
             print(f"Erro ao responder solicitação: {str(e)}")
             print(traceback.format_exc())
             messagebox.showerror("Erro", f"Ocorreu um erro: {str(e)}")
 
-    def iniciar_conversa(self, nome, email):
-        """Inicia uma conversa com um usuário ou empresa"""
-        messagebox.showinfo("Info", f"Conversa com {nome} ({email}) será iniciada aqui!")
-        # Esta função seria implementada para abrir a interface de chat
+    def iniciar_conversa(self, conexao_id, nome):
+        """Abre o chat da conexão, criando a conversa se ainda não existir"""
+        self.executar_em_segundo_plano(
+            obter_conversa,
+            lambda conversa_id: self.abrir_conversa(conversa_id, nome),
+            conexao_id,
+            erro="Ocorreu um erro ao abrir a conversa."
+        )
 
     def show_conversations(self):
         """Exibe a tela de conversas"""
         try:
-            self.clear_content()
+            self.telas.exibir("conversas", self._construir_conversas)
             
-            # Título
-            title_label = ctk.CTkLabel(
-                self.content_frame, 
-                text="Conversas", 
-                font=ctk.CTkFont(size=24, weight="bold"),
-                text_color="#1E90FF"
-            )
-            title_label.pack(pady=(20, 30))
-            
-            # Obter conversas do banco de dados
-            if self.user_type == "user":
-                self.cursor.execute('''
-                    SELECT DISTINCT e.id, e.nome_empresa, 
-                    (SELECT mensagem FROM mensagens 
-                     WHERE (remetente_id = ? AND tipo_remetente = 'user' AND destinatario_id = e.id AND tipo_destinatario = 'empresa')
-                     OR (remetente_id = e.id AND tipo_remetente = 'empresa' AND destinatario_id = ? AND tipo_destinatario = 'user')
-                     ORDER BY data_envio DESC LIMIT 1) as ultima_mensagem,
-                    (SELECT data_envio FROM mensagens 
-                     WHERE (remetente_id = ? AND tipo_remetente = 'user' AND destinatario_id = e.id AND tipo_destinatario = 'empresa')
-                     OR (remetente_id = e.id AND tipo_remetente = 'empresa' AND destinatario_id = ? AND tipo_destinatario = 'user')
-                     ORDER BY data_envio DESC LIMIT 1) as data_ultima_mensagem
-                    FROM empresas e
-                    JOIN conexoes c ON e.id = c.empresa_id
-                    WHERE c.user_id = ? AND c.status = 'aceita'
-                ''', (self.current_user, self.current_user, self.current_user, self.current_user, self.current_user))
-            else:
-                self.cursor.execute('''
-                    SELECT DISTINCT u.id, u.nome_completo,
-                    (SELECT mensagem FROM mensagens 
-                     WHERE (remetente_id = ? AND tipo_remetente = 'empresa' AND destinatario_id = u.id AND tipo_destinatario = 'user')
-                     OR (remetente_id = u.id AND tipo_remetente = 'user' AND destinatario_id = ? AND tipo_destinatario = 'empresa')
-                     ORDER BY data_envio DESC LIMIT 1) as ultima_mensagem,
-                    (SELECT data_envio FROM mensagens 
-                     WHERE (remetente_id = ? AND tipo_remetente = 'empresa' AND destinatario_id = u.id AND tipo_destinatario = 'user')
-                     OR (remetente_id = u.id AND tipo_remetente = 'user' AND destinatario_id = ? AND tipo_destinatario = 'empresa')
-                     ORDER BY data_envio DESC LIMit 1) as data_ultima_mensagem
-                    FROM users u
-                    JOIN conexoes c ON u.id = c.user_id
-                    WHERE c.empresa_id = ? AND c.status = 'aceita'
-                ''', (self.current_user, self.current_user, self.current_user, self.current_user, self.current_user))
-            
-            conversas = self.cursor.fetchall()
-            
-            if conversas:
-                # Frame para lista de conversas
-                conversations_frame = ctk.CTkScrollableFrame(self.content_frame, fg_color="#1E1E1E")
-                conversations_frame.pack(pady=10, padx=20, fill="both", expand=True)
-                
-                for id, nome, ultima_msg, data_msg in conversas:
-                    conversation_frame = ctk.CTkFrame(conversations_frame, fg_color="#2B2B2B", corner_radius=10)
-                    conversation_frame.pack(pady=5, padx=5, fill="x")
-                    
-                    # Informações da conversa
-                    info_frame = ctk.CTkFrame(conversation_frame, fg_color="transparent")
-                    info_frame.pack(pady=10, padx=10, fill="x", side="left", expand=True)
-                    
-                    name_label = ctk.CTkLabel(
-                        info_frame, 
-                        text=nome,
-                        font=ctk.CTkFont(size=16, weight="bold"),
-                        text_color="#FFFFFF",
-                        anchor="w"
-                        )
-                    name_label.pack(anchor="w")
-                    
-                    if ultima_msg:
-                        msg_label = ctk.CTkLabel(
-                            info_frame, 
-                            text=ultima_msg[:50] + "..." if len(ultima_msg) > 50 else ultima_msg,
-                            font=ctk.CTkFont(size=14),
-                            text_color="#CCCCCC",
-                            anchor="w"
-                        )
-                        msg_label.pack(anchor="w")
-                    
-                    if data_msg:
-                        date_label = ctk.CTkLabel(
-                            info_frame, 
-                            text=data_msg.split()[0],
-                            font=ctk.CTkFont(size=12),
-                            text_color="#888888",
-                            anchor="w"
-                        )
-                        date_label.pack(anchor="w")
-                    
-                    # Botão para abrir conversa
-                    open_button = ctk.CTkButton(
-                        conversation_frame, 
-                        text="Abrir",
-                        width=80,
-                        height=30,
-                        fg_color="#1E90FF",
-                        hover_color="#0078D7",
-                        command=lambda cid=id, cnome=nome: self.abrir_conversa(cid, cnome)
-                    )
-                    open_button.pack(pady=10, padx=10, side="right")
-            else:
-                no_conversations_label = ctk.CTkLabel(
-                    self.content_frame, 
-                    text="Nenhuma conversa encontrada",
-                    font=ctk.CTkFont(size=16),
-                    text_color="#CCCCCC"
-                )
-                no_conversations_label.pack(pady=50)
-                
         except Exception as e:
             print(f"Erro ao exibir conversas: {str(e)}")
             print(traceback.format_exc())
             messagebox.showerror("Erro", "Ocorreu um erro ao carregar as conversas.")
 
-        def abrir_conversa(self, contato_id, contato_nome):
-            """Abre a conversa com um contato específico"""
-            messagebox.showinfo("Info", f"Conversa com {contato_nome} será aberta aqui!")
-        # Esta função seria implementada para abrir a interface de chat completa
+    def _construir_conversas(self, tela):
+        """Monta a lista de conversas; retorna a função que a recarrega"""
+        # Título
+        title_label = ctk.CTkLabel(
+            tela, 
+            text="Conversas", 
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#1E90FF"
+        )
+        title_label.pack(pady=(20, 30))
+        
+        # Lista virtualizada de conversas, carregada por página
+        conversations_list = ListaVirtual(
+            tela,
+            lambda master, altura: LinhaConversa(master, altura, self),
+            altura_linha=110,
+            texto_vazio="Nenhuma conversa encontrada",
+            fg_color="#1E1E1E"
+        )
+        conversations_list.pack(pady=10, padx=20, fill="both", expand=True)
+        
+        def atualizar():
+            conversations_list.definir_fonte(FontePaginada(
+                self.executar_em_segundo_plano,
+                listar_conversas,
+                self.current_user, self.user_type
+            ))
+        
+        # Mensagem enviada leva a conversa para o topo com o novo texto
+        def mensagem_enviada(conversa_id, mensagem, data_envio):
+            fonte = conversations_list.fonte
+            for i, linha in enumerate(fonte.linhas):
+                if linha[4] == conversa_id:
+                    del fonte.linhas[i]
+                    fonte.inserir_no_inicio((linha[0], linha[1], mensagem, data_envio, conversa_id))
+                    break
+        
+        self.assinar_na_tela(EVENTO_MENSAGEM_ENVIADA, mensagem_enviada)
+        
+        atualizar()
+        return atualizar
 
-    def show_settings(self):
-        """Exibe a tela de configurações"""
+    def abrir_conversa(self, conversa_id, contato_nome):
+        """Abre o chat de uma conversa"""
         try:
-            self.clear_content()
-            
-            # Título
-            title_label = ctk.CTkLabel(
-                self.content_frame, 
-                text="Configurações", 
-                font=ctk.CTkFont(size=24, weight="bold"),
-                text_color="#1E90FF"
-            )
-            title_label.pack(pady=(20, 30))
-            
-            # Frame principal
-            settings_frame = ctk.CTkScrollableFrame(self.content_frame, fg_color="#2B2B2B")
-            settings_frame.pack(pady=10, padx=20, fill="both", expand=True)
-            
-            # Seção de preferências
-            prefs_label = ctk.CTkLabel(
-                settings_frame, 
-                text="Preferências",
-                font=ctk.CTkFont(size=18, weight="bold"),
-                text_color="#1E90FF"
-            )
-            prefs_label.pack(pady=(10, 20), anchor="w")
-            
-            # Tema
-            theme_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
-            theme_frame.pack(pady=10, padx=20, fill="x")
-            
-            theme_label = ctk.CTkLabel(
-                theme_frame, 
-                text="Tema:",
-                font=ctk.CTkFont(size=14, weight="bold"),
-                text_color="#FFFFFF"
-            )
-            theme_label.pack(side="left")
-            
-            theme_var = ctk.StringVar(value="Escuro")
-            theme_option = ctk.CTkOptionMenu(
-                theme_frame, 
-                variable=theme_var,
-                values=["Escuro", "Claro"],
-                width=120
-            )
-            theme_option.pack(side="right")
-            
-            # Notificações
-            notif_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
-            notif_frame.pack(pady=10, padx=20, fill="x")
-            
-            notif_label = ctk.CTkLabel(
-                notif_frame, 
-                text="Notificações:",
-                font=ctk.CTkFont(size=14, weight="bold"),
-                text_color="#FFFFFF"
-            )
-            notif_label.pack(side="left")
-            
-            notif_var = ctk.StringVar(value="Ativadas")
-            notif_option = ctk.CTkOptionMenu(
-                notif_frame, 
-                variable=notif_var,
-                values=["Ativadas", "Desativadas"],
-                width=120
-            )
-            notif_option.pack(side="right")
-            
-            # Seção de conta
-            account_label = ctk.CTkLabel(
-                settings_frame, 
-                text="Conta",
-                font=ctk.CTkFont(size=18, weight="bold"),
-                text_color="#1E90FF"
+            # Um único chat fica montado: abrir outra conversa substitui o anterior
+            if self._conversa_aberta != conversa_id:
+                self.telas.descartar("chat")
+                self._conversa_aberta = conversa_id
+            self.telas.exibir("chat", lambda tela: self._construir_chat(tela, conversa_id, contato_nome))
+            
+            self.executar_em_segundo_plano(
+                marcar_mensagens_lidas,
+                lambda quantidade: quantidade and self.eventos.publicar(
+                    EVENTO_MENSAGENS_LIDAS, conversa_id=conversa_id, quantidade=quantidade
+                ),
+                conversa_id, self.current_user, self.user_type,
+                erro="Ocorreu um erro ao atualizar as mensagens."
             )
-            account_label.pack(pady=(30, 20), anchor="w")
             
-            # Alterar senha
-            change_pass_button = ctk.CTkButton(
-                settings_frame, 
-                text="Alterar Senha",
-                width=200,
-                height=40,
-                fg_color="#1E1E1E",
-                border_color="#1E90FF",
-                border_width=1,
-                text_color="#1E90FF",
-                hover_color="#2B2B2B",
-                command=self.show_change_password
-            )
-            change_pass_button.pack(pady=10)
+        except Exception as e:
+            print(f"Erro ao abrir conversa: {str(e)}")
+            print(traceback.format_exc())
+            messagebox.showerror("Erro", "Ocorreu um erro ao abrir a conversa.")
+
+    def _construir_chat(self, tela, conversa_id, contato_nome):
+        """Monta o cabeçalho, o histórico e o campo de envio da conversa"""
+        # Cabeçalho com o contato
+        header_frame = ctk.CTkFrame(tela, fg_color="transparent")
+        header_frame.pack(pady=(20, 10), padx=20, fill="x")
+        
+        back_button = ctk.CTkButton(
+            header_frame,
+            text="← Voltar",
+            width=90,
+            height=30,
+            fg_color="#333333",
+            hover_color="#444444",
+            command=self.show_conversations
+        )
+        back_button.pack(side="left")
+        
+        title_label = ctk.CTkLabel(
+            header_frame, 
+            text=contato_nome, 
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#1E90FF"
+        )
+        title_label.pack(side="left", padx=20)
+        
+        # Histórico: só a página mais recente é carregada ao abrir
+        chat = ChatMensagens(tela, self, conversa_id, fg_color="#1E1E1E")
+        chat.pack(pady=10, padx=20, fill="both", expand=True)
+        
+        # Campo de envio
+        input_frame = ctk.CTkFrame(tela, fg_color="transparent")
+        input_frame.pack(pady=(0, 20), padx=20, fill="x")
+        
+        message_entry = ctk.CTkEntry(
+            input_frame,
+            placeholder_text="Digite sua mensagem...",
+            height=40
+        )
+        message_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        message_entry.bind("<Return>", lambda e: self.enviar_mensagem_chat(chat, message_entry))
+        
+        send_button = ctk.CTkButton(
+            input_frame,
+            text="Enviar",
+            width=100,
+            height=40,
+            fg_color="#1E90FF",
+            hover_color="#0078D7",
+            command=lambda: self.enviar_mensagem_chat(chat, message_entry)
+        )
+        send_button.pack(side="right")
+        
+        chat.carregar_anteriores()
+
+    def _mensagem_enviada(self, conversa_id, texto, bolha, resultado):
+        _mensagem_id, data_envio = resultado
+        bolha.confirmar(data_envio)
+        self.eventos.publicar(EVENTO_MENSAGEM_ENVIADA, conversa_id=conversa_id, mensagem=texto, data_envio=data_envio)
+
+    def enviar_mensagem_chat(self, chat, message_entry):
+        """Exibe a mensagem na hora e grava em segundo plano"""
+        texto = message_entry.get().strip()
+        if not texto:
+            return
+        message_entry.delete(0, "end")
+        
+        bolha = chat.adicionar_enviada(texto)
+        self.executar_em_segundo_plano(
+            enviar_mensagem,
+            lambda resultado: self._mensagem_enviada(chat.conversa_id, texto, bolha, resultado),
+            chat.conversa_id, self.current_user, self.user_type, texto,
+            erro="Não foi possível enviar a mensagem.",
+            ao_falhar=lambda e: bolha.falhar()
+        )
+
+    def show_notifications(self):
+        """Exibe a central de notificações"""
+        try:
+            # Notificações chegam também de outras sessões, sem evento: a primeira página é sempre recarregada
+            self.telas.marcar_suja("notificacoes")
+            self.telas.exibir("notificacoes", self._construir_notificacoes)
             
-            # Excluir conta
-            delete_button = ctk.CTkButton(
-                settings_frame, 
-                text="Excluir Conta",
-                width=200,
-                height=40,
-                fg_color="#1E1E1E",
-                border_color="#FF5555",
-                border_width=1,
-                text_color="#FF5555",
-                hover_color="#2B2B2B",
-                command=self.confirmar_exclusao_conta
+        except Exception as e:
+            print(f"Erro ao exibir notificações: {str(e)}")
+            print(traceback.format_exc())
+            messagebox.showerror("Erro", "Ocorreu um erro ao carregar as notificações.")
+
+    def _construir_notificacoes(self, tela):
+        """Monta a central de notificações; retorna a função que recarrega a lista"""
+        # Título
+        title_label = ctk.CTkLabel(
+            tela, 
+            text="Notificações", 
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#1E90FF"
+        )
+        title_label.pack(pady=(20, 10))
+        
+        # Lista virtualizada, paginada por keyset (id da notificação)
+        notifications_list = ListaVirtual(
+            tela,
+            lambda master, altura: LinhaNotificacao(master, altura, self),
+            altura_linha=100,
+            texto_vazio="Nenhuma notificação",
+            fg_color="#1E1E1E"
+        )
+        
+        def marcadas(quantidade):
+            if quantidade:
+                self.eventos.publicar(EVENTO_NOTIFICACOES_LIDAS, quantidade=quantidade)
+            notifications_list.fonte.alterar_linhas(lambda linha: (*linha[:4], 1))
+        
+        def marcar_todas():
+            self.executar_em_segundo_plano(
+                marcar_notificacoes_lidas,
+                marcadas,
+                self.current_user, self.user_type,
+                erro="Ocorreu um erro ao marcar as notificações."
             )
-            delete_button.pack(pady=10)
+        
+        mark_all_button = ctk.CTkButton(
+            tela,
+            text="Marcar todas como lidas",
+            command=marcar_todas,
+            fg_color="#1E90FF",
+            hover_color="#0078D7",
+            height=35
+        )
+        mark_all_button.pack(pady=(0, 10), padx=20, anchor="e")
+        notifications_list.pack(pady=10, padx=20, fill="both", expand=True)
+        
+        def atualizar():
+            notifications_list.definir_fonte(FonteKeyset(
+                self.executar_em_segundo_plano,
+                listar_notificacoes,
+                self.current_user, self.user_type
+            ))
+        
+        atualizar()
+        return atualizar
+
+    def show_settings(self):
+        """Exibe a tela de configurações"""
+        try:
+            self.telas.exibir("configuracoes", self._construir_configuracoes)
             
         except Exception as e:
             print(f"Erro ao exibir configurações: {str(e)}")
             print(traceback.format_exc())
             messagebox.showerror("Erro", "Ocorreu um erro ao carregar as configurações.")
 
+    def _construir_configuracoes(self, tela):
+        """Monta a tela de configurações"""
+        # Título
+        title_label = ctk.CTkLabel(
+            tela, 
+            text="Configurações", 
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#1E90FF"
+        )
+        title_label.pack(pady=(20, 30))
+        
+        # Frame principal
+        settings_frame = ctk.CTkScrollableFrame(tela, fg_color="#2B2B2B")
+        settings_frame.pack(pady=10, padx=20, fill="both", expand=True)
+        
+        # Seção de preferências
+        prefs_label = ctk.CTkLabel(
+            settings_frame, 
+            text="Preferências",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#1E90FF"
+        )
+        prefs_label.pack(pady=(10, 20), anchor="w")
+        
+        # Tema
+        theme_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        theme_frame.pack(pady=10, padx=20, fill="x")
+        
+        theme_label = ctk.CTkLabel(
+            theme_frame, 
+            text="Tema:",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color="#FFFFFF"
+        )
+        theme_label.pack(side="left")
+        
+        theme_var = ctk.StringVar(value="Escuro")
+        theme_option = ctk.CTkOptionMenu(
+            theme_frame, 
+            variable=theme_var,
+            values=["Escuro", "Claro"],
+            width=120
+        )
+        theme_option.pack(side="right")
+        
+        # Notificações
+        notif_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        notif_frame.pack(pady=10, padx=20, fill="x")
+        
+        notif_label = ctk.CTkLabel(
+            notif_frame, 
+            text="Notificações:",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color="#FFFFFF"
+        )
+        notif_label.pack(side="left")
+        
+        notif_var = ctk.StringVar(value="Ativadas")
+        notif_option = ctk.CTkOptionMenu(
+            notif_frame, 
+            variable=notif_var,
+            values=["Ativadas", "Desativadas"],
+            width=120
+        )
+        notif_option.pack(side="right")
+        
+        # Seção de conta
+        account_label = ctk.CTkLabel(
+            settings_frame, 
+            text="Conta",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            text_color="#1E90FF"
+        )
+        account_label.pack(pady=(30, 20), anchor="w")
+        
+        # Alterar senha
+        change_pass_button = ctk.CTkButton(
+            settings_frame, 
+            text="Alterar Senha",
+            width=200,
+            height=40,
+            fg_color="#1E1E1E",
+            border_color="#1E90FF",
+            border_width=1,
+            text_color="#1E90FF",
+            hover_color="#2B2B2B",
+            command=self.show_change_password
+        )
+        change_pass_button.pack(pady=10)
+        
+        # Excluir conta
+        delete_button = ctk.CTkButton(
+            settings_frame, 
+            text="Excluir Conta",
+            width=200,
+            height=40,
+            fg_color="#1E1E1E",
+            border_color="#FF5555",
+            border_width=1,
+            text_color="#FF5555",
+            hover_color="#2B2B2B",
+            command=self.confirmar_exclusao_conta
+        )
+        delete_button.pack(pady=10)
+
     def show_change_password(self):
         """Exibe a tela de alteração de senha"""
         try:
-            self.clear_content()
-            
-            # Título
-            title_label = ctk.CTkLabel(
-                self.content_frame, 
-                text="Alterar Senha", 
-                font=ctk.CTkFont(size=24, weight="bold"),
-                text_color="#1E90FF"
-            )
-            title_label.pack(pady=(20, 30))
-            
-            # Formulário
-            form_frame = ctk.CTkFrame(self.content_frame, fg_color="#1E1E1E", corner_radius=10)
-            form_frame.pack(pady=20, padx=100, fill="x")
-            
-            # Senha atual
-            current_pass_label = ctk.CTkLabel(form_frame, text="Senha Atual:", text_color="#FFFFFF")
-            current_pass_label.pack(anchor="w", pady=(20, 5), padx=20)
-            current_pass_entry = ctk.CTkEntry(form_frame, placeholder_text="Digite sua senha atual", show="*", width=300)
-            current_pass_entry.pack(pady=5, padx=20, fill="x")
-            
-            # Nova senha
-            new_pass_label = ctk.CTkLabel(form_frame, text="Nova Senha:", text_color="#FFFFFF")
-            new_pass_label.pack(anchor="w", pady=(20, 5), padx=20)
-            new_pass_entry = ctk.CTkEntry(form_frame, placeholder_text="Digite sua nova senha", show="*", width=300)
-            new_pass_entry.pack(pady=5, padx=20, fill="x")
-            
-            # Confirmar nova senha
-            confirm_pass_label = ctk.CTkLabel(form_frame, text="Confirmar Nova Senha:", text_color="#FFFFFF")
-            confirm_pass_label.pack(anchor="w", pady=(20, 5), padx=20)
-            confirm_pass_entry = ctk.CTkEntry(form_frame, placeholder_text="Confirme sua nova senha", show="*", width=300)
-            confirm_pass_entry.pack(pady=5, padx=20, fill="x")
-            
-            # Botões
-            buttons_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
-            buttons_frame.pack(pady=30)
-            
-            save_button = ctk.CTkButton(
-                buttons_frame, 
-                text="Salvar", 
-                width=120,
-                height=40,
-                fg_color="#1E90FF",
-                hover_color="#0078D7",
-                command=lambda: self.change_password(
-                    current_pass_entry.get(),
-                    new_pass_entry.get(),
-                    confirm_pass_entry.get()
-                )
-            )
-            save_button.pack(pady=10, side="left", padx=10)
-            
-            cancel_button = ctk.CTkButton(
-                buttons_frame, 
-                text="Cancelar", 
-                width=120,
-                height=40,
-                fg_color="#2B2B2B",
-                border_color="#1E90FF",
-                border_width=2,
-                text_color="#1E90FF",
-                hover_color="#1E1E1E",
-                command=self.show_settings
-            )
-            cancel_button.pack(pady=10, side="left", padx=10)
+            # Os campos de senha nunca voltam preenchidos de uma visita anterior
+            self.telas.marcar_suja("senha")
+            self.telas.exibir("senha", self._construir_senha)
             
         except Exception as e:
             print(f"Erro ao exibir alteração de senha: {str(e)}")
             print(traceback.format_exc())
             messagebox.showerror("Erro", "Ocorreu um erro ao carregar a tela de alteração de senha.")
 
+    def _construir_senha(self, tela):
+        """Monta o formulário; retorna a função que limpa os campos"""
+        # Título
+        title_label = ctk.CTkLabel(
+            tela, 
+            text="Alterar Senha", 
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#1E90FF"
+        )
+        title_label.pack(pady=(20, 30))
+        
+        # Formulário
+        form_frame = ctk.CTkFrame(tela, fg_color="#1E1E1E", corner_radius=10)
+        form_frame.pack(pady=20, padx=100, fill="x")
+        
+        # Senha atual
+        current_pass_label = ctk.CTkLabel(form_frame, text="Senha Atual:", text_color="#FFFFFF")
+        current_pass_label.pack(anchor="w", pady=(20, 5), padx=20)
+        current_pass_entry = ctk.CTkEntry(form_frame, placeholder_text="Digite sua senha atual", show="*", width=300)
+        current_pass_entry.pack(pady=5, padx=20, fill="x")
+        
+        # Nova senha
+        new_pass_label = ctk.CTkLabel(form_frame, text="Nova Senha:", text_color="#FFFFFF")
+        new_pass_label.pack(anchor="w", pady=(20, 5), padx=20)
+        new_pass_entry = ctk.CTkEntry(form_frame, placeholder_text="Digite sua nova senha", show="*", width=300)
+        new_pass_entry.pack(pady=5, padx=20, fill="x")
+        
+        # Confirmar nova senha
+        confirm_pass_label = ctk.CTkLabel(form_frame, text="Confirmar Nova Senha:", text_color="#FFFFFF")
+        confirm_pass_label.pack(anchor="w", pady=(20, 5), padx=20)
+        confirm_pass_entry = ctk.CTkEntry(form_frame, placeholder_text="Confirme sua nova senha", show="*", width=300)
+        confirm_pass_entry.pack(pady=5, padx=20, fill="x")
+        
+        # Botões
+        buttons_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
+        buttons_frame.pack(pady=30)
+        
+        save_button = ctk.CTkButton(
+            buttons_frame, 
+            text="Salvar", 
+            width=120,
+            height=40,
+            fg_color="#1E90FF",
+            hover_color="#0078D7",
+            command=lambda: self.change_password(
+                current_pass_entry.get(),
+                new_pass_entry.get(),
+                confirm_pass_entry.get()
+            )
+        )
+        save_button.pack(pady=10, side="left", padx=10)
+        
+        cancel_button = ctk.CTkButton(
+            buttons_frame, 
+            text="Cancelar", 
+            width=120,
+            height=40,
+            fg_color="#2B2B2B",
+            border_color="#1E90FF",
+            border_width=2,
+            text_color="#1E90FF",
+            hover_color="#1E1E1E",
+            command=self.show_settings
+        )
+        cancel_button.pack(pady=10, side="left", padx=10)
+        
+        def limpar():
+            for entry in (current_pass_entry, new_pass_entry, confirm_pass_entry):
+                entry.delete(0, "end")
+        
+        return limpar
+
     def change_password(self, current_password, new_password, confirm_password):
         """Altera a senha do usuário"""
         try:
-            # Validações
-            if not current_password or not new_password or not confirm_password:
-                messagebox.showerror("Erro", "Todos os campos devem ser preenchidos!")
-                return
-            
-            if new_password != confirm_password:
-                messagebox.showerror("Erro", "As novas senhas não coincidem!")
-                return
-            
-            # Verificar senha atual
-            hashed_current = self.hash_password(current_password)
-            
-            if self.user_type == "user":
-                self.cursor.execute("SELECT senha FROM users WHERE id = ?", (self.current_user,))
-            else:
-                self.cursor.execute("SELECT senha FROM empresas WHERE id = ?", (self.current_user,))
-            
-            db_password = self.cursor.fetchone()[0]
-            
-            if hashed_current != db_password:
-                messagebox.showerror("Erro", "Senha atual incorreta!")
-                return
-            
-            # Atualizar senha
-            hashed_new = self.hash_password(new_password)
+            validar_troca_senha(current_password, new_password, confirm_password)
+            
+            conta_id, tipo_conta = self.current_user, self.user_type
+            
+            def concluido(_):
+                self.telas.marcar_suja("senha")
+                messagebox.showinfo("Sucesso", "Senha alterada com sucesso!")
+                if self.telas.atual == "senha":
+                    self.show_settings()
+            
+            def gravar(armazenado, hashed_new):
+                self.executar_em_segundo_plano(
+                    alterar_senha,
+                    concluido,
+                    conta_id, tipo_conta, armazenado, hashed_new,
+                    erro="Ocorreu um erro ao alterar a senha."
+                )
             
-            if self.user_type == "user":
-                self.cursor.execute("UPDATE users SET senha = ? WHERE id = ?", (hashed_new, self.current_user))
-            else:
-                self.cursor.execute("UPDATE empresas SET senha = ? WHERE id = ?", (hashed_new, self.current_user))
+            def conferir(armazenado):
+                # Conferir a senha atual e gerar o novo hash no pool de senhas
+                self.calcular_em_segundo_plano(
+                    trocar_hash_senha,
+                    lambda hashed_new: gravar(armazenado, hashed_new),
+                    current_password, armazenado, new_password,
+                    erro="Ocorreu um erro ao alterar a senha."
+                )
             
-            self.conn.commit()
-            messagebox.showinfo("Sucesso", "Senha alterada com sucesso!")
-            self.show_settings()
+            self.executar_em_segundo_plano(
+                obter_hash_senha,
+                conferir,
+                conta_id, tipo_conta,
+                erro="Ocorreu um erro ao alterar a senha."
+            )
             
+        except ErroValidacao as e:
+            messagebox.showerror("Erro", str(e))
         except Exception as e:
             print(f"Erro ao alterar senha: {str(e)}")
             print(traceback.format_exc())
@@ -1850,48 +2599,69 @@ class BossBridgeSystem:
         
         if resultado:
             try:
-                if self.user_type == "user":
-                    # Excluir usuário e todos os dados relacionados
-                    self.cursor.execute("DELETE FROM users WHERE id = ?", (self.current_user,))
-                    self.cursor.execute("DELETE FROM conexoes WHERE user_id = ?", (self.current_user,))
-                    self.cursor.execute("DELETE FROM mensagens WHERE remetente_id = ? AND tipo_remetente = 'user'", (self.current_user,))
-                    self.cursor.execute("DELETE FROM mensagens WHERE destinatario_id = ? AND tipo_destinatario = 'user'", (self.current_user,))
-                    self.cursor.execute("DELETE FROM notificacoes WHERE usuario_id = ? AND tipo_usuario = 'user'", (self.current_user,))
-                else:
-                    # Excluir empresa e todos os dados relacionados
-                    self.cursor.execute("DELETE FROM empresas WHERE id = ?", (self.current_user,))
-                    self.cursor.execute("DELETE FROM conexoes WHERE empresa_id = ?", (self.current_user,))
-                    self.cursor.execute("DELETE FROM mensagens WHERE remetente_id = ? AND tipo_remetente = 'empresa'", (self.current_user,))
-                    self.cursor.execute("DELETE FROM mensagens WHERE destinatario_id = ? AND tipo_destinatario = 'empresa'", (self.current_user,))
-                    self.cursor.execute("DELETE FROM notificacoes WHERE usuario_id = ? AND tipo_usuario = 'empresa'", (self.current_user,))
+                conta_id, tipo_conta = self.current_user, self.user_type
                 
-                self.conn.commit()
-                messagebox.showinfo("Sucesso", "Conta excluída com sucesso!")
-                self.logout()
+                def concluido(_):
+                    self.cache_busca.invalidar_conta(tipo_conta, conta_id)
+                    self.manutencao.avisar()
+                    messagebox.showinfo("Sucesso", "Conta excluída com sucesso!")
+                    self.logout()
+                
+                # Marcar a conta como excluída; os dados relacionados saem depois, pela manutenção
+                self.executar_em_segundo_plano(
+                    excluir_conta,
+                    concluido,
+                    self.current_user, self.user_type,
+                    erro="Ocorreu um erro ao excluir a conta."
+                )
                 
             except Exception as e:
                 print(f"Erro ao excluir conta: {str(e)}")
                 print(traceback.format_exc())
                 messagebox.showerror("Erro", f"Ocorreu um erro ao excluir a conta: {str(e)}")
 
+    def _definir_status(self, outra_parte, status):
+        self.status_conexoes[outra_parte] = status
+
+    def assinar_na_tela(self, tipo, callback):
+        """Assina um evento enquanto a tela atual estiver aberta"""
+        self.eventos.assinar(tipo, callback, self._tela_atual)
+
+    def abrir_tela(self):
+        """Gera o token de uma nova tela e a torna a tela atual"""
+        self._proximo_token += 1
+        self._telas_abertas.add(self._proximo_token)
+        self._tela_atual = self._proximo_token
+        return self._proximo_token
+
+    def fechar_tela(self, token):
+        """Descarta os resultados pendentes e as assinaturas de eventos da tela"""
+        self._telas_abertas.discard(token)
+        self.eventos.encerrar_tela(token)
+
     def clear_window(self):
         """Limpa toda a janela principal"""
+        for token in list(self._telas_abertas):
+            self.fechar_tela(token)
+        self.telas = None
         for widget in self.root.winfo_children():
             widget.destroy()
-    
-    def clear_content(self):
-        """Limpa apenas a área de conteúdo (mantendo a sidebar)"""
-        if hasattr(self, 'content_frame'):
-            for widget in self.content_frame.winfo_children():
-                widget.destroy()
+        self.abrir_tela()
     
     def logout(self):
         """Realiza o logout do usuário"""
         self.current_user = None
         self.user_type = None
         self.user_name = None
+        self.status_conexoes = {}
+        self._registrar_cache_busca()
         self.show_login_screen()
     
+    def _registrar_cache_busca(self):
+        """Escreve no console o aproveitamento do cache da busca desde a abertura da aplicação"""
+        if hasattr(self, 'cache_busca') and (self.cache_busca.acertos or self.cache_busca.falhas):
+            print(self.cache_busca.resumo())
+    
     def run(self):
         """Inicia a aplicação"""
         try:
@@ -1900,11 +2670,31 @@ class BossBridgeSystem:
             print(f"Erro durante a execução: {str(e)}")
             print(traceback.format_exc())
             input("Pressione Enter para sair...")
+        finally:
+            self.close_db()
+    
+    def close_db(self):
+        """Conclui as operações pendentes e encerra as threads de banco"""
+        if getattr(self, 'current_user', None) is not None:
+            self._registrar_cache_busca()
+        # Primeiro o pool: um hash recalculado ainda pode agendar sua gravação no executor
+        if hasattr(self, 'pool_senhas'):
+            self.pool_senhas.shutdown(wait=True)
+        if hasattr(self, 'db'):
+            self.db.encerrar()
+        if hasattr(self, 'manutencao'):
+            self.manutencao.parar()
+        if hasattr(self, 'checkpoint'):
+            self.checkpoint.parar()
 
 # Função principal
 if __name__ == "__main__":
+    # Importação, exportação, arquivamento e verificação de planos: python -m boss_bridge.cli
+    registro = RegistroInicializacao(INICIO_PROCESSO, ativo="--startup-trace" in sys.argv)
+    registro.marcar("imports")
+    
     try:
-        app = BossBridgeSystem()
+        app = BossBridgeSystem(registro)
         app.run()
     except Exception as e:
         print(f"Erro fatal: {str(e)}")
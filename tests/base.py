@@ -0,0 +1,110 @@
+"""Base dos testes: cada teste recebe um banco próprio, migrado, em uma pasta temporária"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from boss_bridge import banco
+from boss_bridge.banco import abrir_conexao, aplicar_migracoes
+
+# Histórico de um banco antigo: (remetente, tipo, destinatário, tipo, texto, data, lida)
+MENSAGENS = [
+    (1, "user", 1, "empresa", "oi", "2024-01-01 10:00:00", 1),
+    (1, "empresa", 1, "user", "olá", "2024-01-01 10:05:00", 0),
+    (1, "user", 1, "empresa", "proposta", "2024-01-02 09:00:00", 0),
+    (2, "user", 2, "empresa", "bom dia", "2024-01-03 08:00:00", 1),
+    (2, "empresa", 2, "user", "bom dia!", "2024-01-03 08:30:00", 0),
+    (3, "user", 1, "empresa", "sem conexão aceita", "2024-01-04 12:00:00", 0),
+]
+
+def contadores(conn):
+    """{(tipo, id): (conexões ativas, mensagens não lidas, notificações não lidas)} da tabela contadores"""
+    return {(tipo, conta_id): tuple(totais) for tipo, conta_id, *totais in conn.execute(
+        "SELECT tipo_conta, conta_id, conexoes_ativas, mensagens_nao_lidas, notificacoes_nao_lidas FROM contadores"
+    )}
+
+def contadores_recalculados(conn):
+    """Os mesmos totais de contadores(), contados direto nas tabelas
+
+    Conexões e mensagens de uma conta marcada como excluída não contam para a outra parte.
+    """
+    excluidas = set(conn.execute(
+        "SELECT 'user', id FROM users WHERE excluida_em IS NOT NULL "
+        "UNION ALL SELECT 'empresa', id FROM empresas WHERE excluida_em IS NOT NULL"
+    ).fetchall())
+    totais = {}
+    for tipo, tabela, coluna, outro_tipo, outra_coluna in (("user", "users", "user_id", "empresa", "empresa_id"),
+                                                          ("empresa", "empresas", "empresa_id", "user", "user_id")):
+        for (conta_id,) in conn.execute(f"SELECT id FROM {tabela}").fetchall():
+            conexoes = conn.execute(f"SELECT {outra_coluna} FROM conexoes WHERE {coluna} = ? AND status = 'aceita'",
+                                    (conta_id,)).fetchall()
+            mensagens = conn.execute("""SELECT tipo_remetente, remetente_id FROM mensagens
+                                     WHERE destinatario_id = ? AND tipo_destinatario = ? AND lida = 0""",
+                                     (conta_id, tipo)).fetchall()
+            totais[(tipo, conta_id)] = (
+                sum((outro_tipo, outro_id) not in excluidas for (outro_id,) in conexoes),
+                sum(remetente not in excluidas for remetente in mensagens),
+                conn.execute("""SELECT COUNT(*) FROM notificacoes
+                             WHERE usuario_id = ? AND tipo_usuario = ? AND lida = 0""",
+                             (conta_id, tipo)).fetchone()[0],
+            )
+    return totais
+
+class BancoTeste(unittest.TestCase):
+    """Caso de teste com o banco em self.caminho e uma conexão aberta em self.conn"""
+
+    # Versão do esquema montada no setUp; None aplica todas as migrações
+    versao_inicial = None
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        self.caminho = os.path.join(self.pasta.name, "teste.db")
+        self.conn = self.abrir_conexao()
+        self.migrar(self.versao_inicial)
+
+    def abrir_conexao(self):
+        """Abre mais uma conexão com o banco do teste, fechada ao fim do teste"""
+        conn = abrir_conexao(self.caminho)
+        self.addCleanup(conn.close)
+        return conn
+
+    def migrar(self, versao=None):
+        """Aplica as migrações até `versao`, como faria uma versão antiga da aplicação; sem versão, todas"""
+        migracoes = [migracao for migracao in banco.MIGRACOES if versao is None or migracao[0] <= versao]
+        with mock.patch.object(banco, "MIGRACOES", migracoes):
+            return aplicar_migracoes(self.conn)
+
+    def inserir_user(self, nome, email, senha="h"):
+        return self.conn.execute(
+            "INSERT INTO users (nome, email, senha) VALUES (?, ?, ?)", (nome, email, senha)
+        ).lastrowid
+
+    def inserir_empresa(self, cnpj, nome, email, senha="h"):
+        return self.conn.execute(
+            "INSERT INTO empresas (cnpj, nome_empresa, razao_social, email, senha) VALUES (?, ?, ?, ?, ?)",
+            (cnpj, nome, f"{nome} Ltda", email, senha)
+        ).lastrowid
+
+    def popular_historico(self):
+        """Contas, conexões, mensagens e notificações só com as colunas da migração 1"""
+        for nome in ("Ana", "Bruno", "Carla"):
+            self.inserir_user(nome, f"{nome.lower()}@x.com")
+        self.inserir_empresa("11222333000181", "Acme", "acme@x.com")
+        self.inserir_empresa("11444777000161", "Beta", "beta@x.com")
+        self.conn.executemany(
+            "INSERT INTO conexoes (user_id, empresa_id, status) VALUES (?, ?, ?)",
+            [(1, 1, "aceita"), (1, 2, "pendente"), (2, 1, "aceita"), (3, 2, "recusada"), (2, 2, "aceita")]
+        )
+        self.conn.executemany(
+            """INSERT INTO mensagens
+            (remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, mensagem, data_envio, lida)
+            VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            MENSAGENS
+        )
+        self.conn.executemany(
+            "INSERT INTO notificacoes (usuario_id, tipo_usuario, titulo, mensagem, lida) VALUES (?, ?, 't', 'm', ?)",
+            [(1, "user", 0), (1, "empresa", 0), (2, "user", 1), (2, "empresa", 0)]
+        )
+        self.conn.commit()
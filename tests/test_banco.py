@@ -0,0 +1,369 @@
+"""Executor de banco e migrações aplicadas a bancos com dados"""
+
+import os
+import sqlite3
+import unittest
+from unittest import mock
+
+from boss_bridge import cache
+from boss_bridge.banco import ExecutorBanco, verificar_planos_consulta
+from boss_bridge.cache import CacheBusca
+from boss_bridge.servicos.contas import excluir_conta
+from boss_bridge.servicos.diretorio import buscar_contas, corresponde_busca, expressao_fts, termos_busca
+from tests.base import MENSAGENS, BancoTeste, contadores, contadores_recalculados
+
+class ExecutorBancoTeste(BancoTeste):
+
+    def test_caminho_invalido_falha_todas_as_operacoes(self):
+        executor = ExecutorBanco(os.path.join(self.pasta.name, "nao_existe", "banco.db"))
+        na_fila = executor.submeter(lambda conn: conn.execute("SELECT 1").fetchone())
+        with self.assertRaises(sqlite3.OperationalError):
+            na_fila.result(timeout=5)
+
+        # Com a thread encerrada, operações novas falham na hora em vez de ficar pendentes
+        depois = executor.submeter(lambda conn: None)
+        self.assertTrue(depois.done())
+        with self.assertRaises(sqlite3.OperationalError):
+            depois.result(timeout=0)
+        executor.encerrar()
+
+    def test_caminho_valido_executa_operacoes(self):
+        executor = ExecutorBanco(self.caminho)
+        self.assertEqual(executor.submeter(lambda conn: conn.execute("SELECT 1").fetchone()).result(timeout=5), (1,))
+        executor.encerrar()
+
+class PlanosConsultaTeste(BancoTeste):
+
+    def test_nenhuma_consulta_percorre_uma_tabela_inteira(self):
+        # O mesmo que o comando check-query-plans: uma consulta ou índice novo não pode trazer um SCAN de volta
+        self.assertEqual(verificar_planos_consulta(self.conn), [])
+
+class ContadoresMigracaoTeste(BancoTeste):
+
+    # Banco anterior aos contadores: o dashboard contava tudo a cada abertura
+    versao_inicial = 2
+
+    def test_preenchimento_confere_com_as_contagens(self):
+        self.popular_historico()
+        self.migrar()
+        self.assertEqual(contadores(self.conn), contadores_recalculados(self.conn))
+        self.assertEqual(contadores(self.conn)[("empresa", 1)], (2, 2, 1))
+        self.assertEqual(contadores(self.conn)[("user", 1)], (1, 1, 1))
+
+class ContadoresGatilhosTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        for nome in ("Ana", "Bruno", "Carla"):
+            self.inserir_user(nome, f"{nome.lower()}@x.com")
+        self.inserir_empresa("11222333000181", "Acme", "acme@x.com")
+        self.conn.commit()
+
+    def executar(self, sql, *parametros):
+        """Executa um passo e confere todos os contadores com as contagens das tabelas"""
+        self.conn.execute(sql, parametros)
+        self.conn.commit()
+        atuais = contadores(self.conn)
+        self.assertEqual(atuais, contadores_recalculados(self.conn), sql)
+        return atuais
+
+    def test_conexoes(self):
+        self.assertEqual(self.executar("INSERT INTO conexoes (user_id, empresa_id) VALUES (1, 1)")[("user", 1)],
+                         (0, 0, 0))
+        self.assertEqual(self.executar("UPDATE conexoes SET status = 'aceita' WHERE id = 1")[("empresa", 1)],
+                         (1, 0, 0))
+        self.assertEqual(
+            self.executar("INSERT INTO conexoes (user_id, empresa_id, status) VALUES (2, 1, 'aceita')")[("empresa", 1)],
+            (2, 0, 0)
+        )
+        # Trocar a parte de uma conexão aceita move o total entre as contas
+        atuais = self.executar("UPDATE conexoes SET user_id = 3 WHERE id = 2")
+        self.assertEqual((atuais[("user", 3)], atuais[("user", 2)]), ((1, 0, 0), (0, 0, 0)))
+        self.executar("UPDATE conexoes SET status = 'recusada' WHERE id = 2")
+        self.executar("UPDATE conexoes SET status = 'aceita' WHERE id = 1")
+        atuais = self.executar("DELETE FROM conexoes WHERE id = 1")
+        self.assertEqual(atuais[("empresa", 1)], (0, 0, 0))
+        self.executar("DELETE FROM conexoes")
+
+    def test_mensagens(self):
+        inserir = """INSERT INTO mensagens
+            (remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, mensagem, lida)
+            VALUES (?, ?, ?, ?, 'texto', ?)"""
+        self.executar(inserir, 1, "user", 1, "empresa", 0)
+        self.executar(inserir, 1, "empresa", 2, "user", 0)
+        self.assertEqual(self.executar(inserir, 1, "user", 1, "empresa", 1)[("empresa", 1)], (0, 1, 0))
+        self.assertEqual(self.executar("UPDATE mensagens SET lida = 1 WHERE id = 1")[("empresa", 1)], (0, 0, 0))
+        self.assertEqual(self.executar("UPDATE mensagens SET lida = 0 WHERE id = 3")[("empresa", 1)], (0, 1, 0))
+        # Mudar o destinatário de uma não lida move o total entre as contas
+        atuais = self.executar("UPDATE mensagens SET destinatario_id = 1 WHERE id = 2")
+        self.assertEqual((atuais[("user", 1)], atuais[("user", 2)]), ((0, 1, 0), (0, 0, 0)))
+        self.executar("DELETE FROM mensagens WHERE id = 1")
+        atuais = self.executar("DELETE FROM mensagens WHERE lida = 0")
+        self.assertEqual(set(atuais.values()), {(0, 0, 0)})
+
+    def test_conta_removida_leva_a_linha_de_contadores(self):
+        self.executar("INSERT INTO conexoes (user_id, empresa_id, status) VALUES (2, 1, 'aceita')")
+        self.executar("DELETE FROM users WHERE id = 2")
+        self.assertNotIn(("user", 2), contadores(self.conn))
+        self.assertIn(("user", 1), contadores(self.conn))
+
+    def test_conta_marcada_como_excluida_sai_dos_totais_das_outras(self):
+        self.executar("INSERT INTO conexoes (user_id, empresa_id, status) VALUES (2, 1, 'aceita')")
+        self.executar("""INSERT INTO mensagens (remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, mensagem)
+                      VALUES (2, 'user', 1, 'empresa', 'oi')""")
+        self.assertEqual(self.executar("UPDATE users SET excluida_em = CURRENT_TIMESTAMP WHERE id = 2")[("empresa", 1)],
+                         (0, 0, 0))
+        # Linhas da conta excluída alteradas antes da purga não voltam a contar
+        self.assertEqual(self.executar("UPDATE mensagens SET lida = 1")[("empresa", 1)], (0, 0, 0))
+        self.assertEqual(self.executar("UPDATE mensagens SET lida = 0")[("empresa", 1)], (0, 0, 0))
+        self.assertEqual(self.executar("UPDATE users SET excluida_em = NULL WHERE id = 2")[("empresa", 1)], (1, 1, 0))
+        self.executar("UPDATE users SET excluida_em = CURRENT_TIMESTAMP WHERE id = 2")
+        self.assertEqual(self.executar("DELETE FROM mensagens")[("empresa", 1)], (0, 0, 0))
+        # O que a purga ainda não removeu sai pelas cascatas sem descontar duas vezes
+        self.assertEqual(self.executar("DELETE FROM users WHERE id = 2")[("empresa", 1)], (0, 0, 0))
+
+class ContadoresContasExcluidasMigracaoTeste(BancoTeste):
+
+    # Banco em que os contadores ainda contavam as contas excluídas até a purga
+    versao_inicial = 11
+
+    def test_preenchimento_desconta_as_contas_excluidas(self):
+        self.popular_historico()
+        self.conn.execute("UPDATE users SET excluida_em = CURRENT_TIMESTAMP WHERE id = 1")
+        self.conn.commit()
+        self.migrar()
+        self.assertEqual(contadores(self.conn), contadores_recalculados(self.conn))
+        self.assertEqual(contadores(self.conn)[("empresa", 1)], (1, 1, 1))
+
+class ConversasTeste(BancoTeste):
+
+    # Banco anterior às conversas: a lista era montada agrupando as mensagens
+    versao_inicial = 3
+
+    def setUp(self):
+        super().setUp()
+        self.popular_historico()
+        self.migrar()
+
+    def conversas(self):
+        """{(user_id, empresa_id): (última mensagem, data)} de todas as conversas"""
+        return {(user_id, empresa_id): tuple(ultima) for user_id, empresa_id, *ultima in self.conn.execute(
+            "SELECT user_id, empresa_id, ultima_mensagem, ultima_data FROM conversas"
+        )}
+
+    def enviar(self, remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, texto, data):
+        self.conn.execute(
+            """INSERT INTO mensagens
+            (remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, mensagem, data_envio)
+            VALUES (?, ?, ?, ?, ?, ?)""",
+            (remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, texto, data)
+        )
+        self.conn.commit()
+
+    def test_preenchimento_pelas_conexoes_aceitas_e_mensagens(self):
+        self.assertEqual(self.conversas(), {
+            (1, 1): ("proposta", "2024-01-02 09:00:00"),
+            (2, 1): (None, None),
+            (2, 2): ("bom dia!", "2024-01-03 08:30:00"),
+            (3, 1): ("sem conexão aceita", "2024-01-04 12:00:00"),
+        })
+        # Cada mensagem ficou ligada à conversa do seu par
+        self.assertEqual(self.conn.execute(
+            """SELECT COUNT(*) FROM mensagens m JOIN conversas cv ON cv.id = m.conversa_id
+            WHERE cv.user_id = CASE m.tipo_remetente WHEN 'user' THEN m.remetente_id ELSE m.destinatario_id END
+              AND cv.empresa_id = CASE m.tipo_remetente WHEN 'user' THEN m.destinatario_id ELSE m.remetente_id END"""
+        ).fetchone()[0], len(MENSAGENS))
+
+    def test_mensagem_nova_atualiza_uma_unica_conversa(self):
+        antes = self.conversas()
+        self.enviar(1, "empresa", 1, "user", "resposta", "2024-02-01 10:00:00")
+        depois = self.conversas()
+        self.assertEqual(depois[(1, 1)], ("resposta", "2024-02-01 10:00:00"))
+        del antes[(1, 1)], depois[(1, 1)]
+        self.assertEqual(depois, antes)
+
+        # Uma mensagem com data anterior não substitui a última
+        self.enviar(1, "user", 1, "empresa", "atrasada", "2024-01-15 10:00:00")
+        self.assertEqual(self.conversas()[(1, 1)], ("resposta", "2024-02-01 10:00:00"))
+
+    def test_mensagem_de_par_novo_cria_uma_conversa(self):
+        total = len(self.conversas())
+        self.enviar(3, "user", 2, "empresa", "primeiro contato", "2024-02-01 10:00:00")
+        self.enviar(2, "empresa", 3, "user", "resposta", "2024-02-01 11:00:00")
+        conversas = self.conversas()
+        self.assertEqual(len(conversas), total + 1)
+        self.assertEqual(conversas[(3, 2)], ("resposta", "2024-02-01 11:00:00"))
+        self.assertEqual(self.conn.execute(
+            "SELECT COUNT(DISTINCT conversa_id) FROM mensagens WHERE mensagem IN ('primeiro contato', 'resposta')"
+        ).fetchone()[0], 1)
+
+class RecriarTabelasTeste(BancoTeste):
+
+    # Banco anterior às cascatas: as tabelas são recriadas com ON DELETE CASCADE
+    versao_inicial = 5
+    tabelas = ("conexoes", "conversas", "mensagens")
+
+    def setUp(self):
+        super().setUp()
+        self.popular_historico()
+        self.linhas = {tabela: self.conn.execute(f"SELECT * FROM {tabela} ORDER BY id").fetchall()
+                       for tabela in self.tabelas}
+
+        # Órfãos de quando as chaves estrangeiras não eram verificadas
+        self.conn.execute("PRAGMA foreign_keys = OFF")
+        self.conn.execute("INSERT INTO conexoes (user_id, empresa_id, status) VALUES (99, 1, 'aceita')")
+        self.conn.execute("INSERT INTO mensagens (conversa_id, remetente_id, tipo_remetente, destinatario_id, "
+                          "tipo_destinatario, mensagem) VALUES (999, 1, 'user', 1, 'empresa', 'órfã')")
+        self.conn.commit()
+        self.conn.execute("PRAGMA foreign_keys = ON")
+
+        # Os maiores ids já usados foram excluídos: não podem voltar depois da recriação
+        for tabela, sql in (("conexoes", "INSERT INTO conexoes (user_id, empresa_id) VALUES (3, 1)"),
+                            ("mensagens", "INSERT INTO mensagens (mensagem) VALUES ('excluída')")):
+            self.conn.execute(f"DELETE FROM {tabela} WHERE id = ?", (self.conn.execute(sql).lastrowid,))
+        self.conn.commit()
+
+        self.sequencias = dict(self.conn.execute("SELECT name, seq FROM sqlite_sequence"))
+        self.objetos = self.objetos_das_tabelas()
+        self.migrar(6)
+
+    def objetos_das_tabelas(self):
+        return sorted(self.conn.execute(
+            f"""SELECT tbl_name, type, name FROM sqlite_master
+            WHERE type IN ('index', 'trigger') AND tbl_name IN ({', '.join('?' * len(self.tabelas))})""",
+            self.tabelas
+        ))
+
+    def test_linhas_ids_e_objetos_mantidos(self):
+        for tabela in self.tabelas:
+            self.assertEqual(self.conn.execute(f"SELECT * FROM {tabela} ORDER BY id").fetchall(),
+                             self.linhas[tabela], tabela)
+        self.assertEqual(self.objetos_das_tabelas(), self.objetos)
+        self.assertEqual(self.conn.execute("PRAGMA foreign_key_check").fetchall(), [])
+        self.assertEqual(contadores(self.conn), contadores_recalculados(self.conn))
+
+    def test_sequencia_preservada(self):
+        self.assertEqual(dict(self.conn.execute("SELECT name, seq FROM sqlite_sequence")), self.sequencias)
+        # Nem os ids das linhas excluídas nem os dos órfãos removidos voltam a ser usados
+        novo_id = self.conn.execute("INSERT INTO conexoes (user_id, empresa_id) VALUES (3, 1)").lastrowid
+        self.assertEqual(novo_id, self.sequencias["conexoes"] + 1)
+        self.assertEqual(novo_id, max(linha[0] for linha in self.linhas["conexoes"]) + 3)
+
+    def test_chaves_estrangeiras_em_cascata(self):
+        for tabela in self.tabelas:
+            acoes = {linha[2]: linha[6] for linha in self.conn.execute(f"PRAGMA foreign_key_list({tabela})")}
+            self.assertEqual(set(acoes.values()), {"CASCADE"}, tabela)
+
+class BuscaTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        self.acme = self.inserir_empresa("11222333000181", "Acme Energia Solar", "contato@acme.com")
+        self.beta = self.inserir_empresa("11444777000161", "Beta Agro", "beta@x.com")
+        self.acai = self.inserir_empresa("19131243000197", "Açaí do Norte", "norte@x.com")
+        # "Solar" só na razão social: vale menos que no nome
+        self.conn.execute("UPDATE empresas SET razao_social = 'Solar Participações' WHERE id = ?", (self.beta,))
+        self.ana = self.inserir_user("Ana Souza", "ana@x.com")
+        self.conn.commit()
+
+    def buscar(self, tipo_conta, consulta):
+        return [linha[0] for linha in buscar_contas(self.conn, tipo_conta, consulta, 0, 10)]
+
+    def test_expressao_fts(self):
+        self.assertEqual(expressao_fts("Energ  SOL"), '"energ"* "sol"*')
+        self.assertEqual(expressao_fts("Açaí"), '"acai"*')
+        # Aspas e operadores digitados viram separadores, nunca sintaxe do FTS5
+        self.assertEqual(expressao_fts('a"b OR -c'), '"a"* "b"* "or"* "c"*')
+        self.assertEqual(expressao_fts(" -- "), "")
+
+    def test_cada_termo_e_um_prefixo_obrigatorio(self):
+        self.assertEqual(self.buscar("user", "ener"), [self.acme])
+        self.assertEqual(self.buscar("user", "acme sol"), [self.acme])
+        self.assertEqual(self.buscar("user", "acme agro"), [])
+        self.assertEqual(self.buscar("user", "acai"), [self.acai])
+        self.assertEqual(self.buscar("user", ""), [])
+        # Investidores buscam empresas; empresas buscam investidores
+        self.assertEqual(self.buscar("empresa", "sou"), [self.ana])
+
+    def test_nome_pesa_mais_que_a_razao_social(self):
+        self.assertEqual(self.buscar("user", "solar"), [self.acme, self.beta])
+
+    def test_filtro_em_memoria_reproduz_a_busca(self):
+        # Digitar mais letras refina os resultados já carregados em vez de consultar de novo
+        for tipo_conta, anterior, atual in (("user", "a", "acme sol"), ("user", "sol", "solar part"),
+                                            ("user", "a", "açaí"), ("empresa", "a", "ana sou")):
+            termos = termos_busca(atual)
+            filtradas = [linha[0] for linha in buscar_contas(self.conn, tipo_conta, anterior, 0, 10)
+                         if corresponde_busca(tipo_conta, linha, termos)]
+            self.assertEqual(sorted(filtradas), sorted(self.buscar(tipo_conta, atual)), atual)
+        self.assertEqual(termos_busca("Açaí, do-Norte"), ["acai", "do", "norte"])
+
+    def test_conta_excluida_sai_da_busca(self):
+        excluir_conta(self.conn, self.acme, "empresa")
+        excluir_conta(self.conn, self.ana, "user")
+        self.assertEqual(self.buscar("user", "solar"), [self.beta])
+        self.assertEqual(self.buscar("empresa", "ana"), [])
+
+class CacheBuscaTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        self.acme = self.inserir_empresa("11222333000181", "Acme Energia", "acme@x.com")
+        self.beta = self.inserir_empresa("11444777000161", "Beta Agro", "beta@x.com")
+        self.conn.commit()
+        self.cache = CacheBusca(ttl=60)
+
+    def carregar(self, consulta, offset=0, limite=10):
+        """Consulta a página como FontePaginada faria e a guarda no cache"""
+        geracao = self.cache.geracao
+        linhas = buscar_contas(self.conn, "user", consulta, offset, limite)
+        self.cache.guardar(("user", consulta, offset, limite), linhas, geracao)
+        return linhas
+
+    def test_pagina_expira(self):
+        with mock.patch.object(cache.time, "monotonic", return_value=1000.0):
+            self.carregar("acme")
+            self.assertEqual(self.cache.obter(("user", "acme", 0, 10))[0][0], self.acme)
+        with mock.patch.object(cache.time, "monotonic", return_value=1060.0):
+            self.assertIsNone(self.cache.obter(("user", "acme", 0, 10)))
+        self.assertEqual(self.cache.estatisticas()["entradas"], 0)
+
+    def test_remove_a_menos_usada(self):
+        self.cache = CacheBusca(max_entradas=3)
+        for consulta in ("acme", "beta", "agro"):
+            self.carregar(consulta)
+        self.assertIsNotNone(self.cache.obter(("user", "acme", 0, 10)))
+        self.carregar("energia")
+        self.assertIsNone(self.cache.obter(("user", "beta", 0, 10)))
+        self.assertIsNotNone(self.cache.obter(("user", "acme", 0, 10)))
+        self.assertEqual(self.cache.estatisticas()["entradas"], 3)
+
+    def test_pagina_consultada_antes_da_invalidacao_e_descartada(self):
+        geracao = self.cache.geracao
+        linhas = buscar_contas(self.conn, "user", "agro", 0, 10)
+        # Uma empresa nova entra na busca enquanto a página estava no executor
+        nova = self.inserir_empresa("19131243000197", "Gama Agro", "gama@x.com")
+        self.conn.commit()
+        self.cache.invalidar_conta("empresa", nova, ("Gama Agro", "gama@x.com"))
+        self.cache.guardar(("user", "agro", 0, 10), linhas, geracao)
+        self.assertIsNone(self.cache.obter(("user", "agro", 0, 10)))
+        self.assertEqual(len(self.carregar("agro")), 2)
+
+    def test_invalidar_conta_remove_so_as_buscas_afetadas(self):
+        self.carregar("acme")
+        self.carregar("acme", offset=10)
+        self.carregar("beta")
+        self.carregar("gama")
+        self.assertEqual(self.cache.estatisticas()["entradas"], 4)
+        # Acme foi editada: saem todas as páginas das buscas em que ela aparecia
+        self.cache.invalidar_conta("empresa", self.acme, ("Acme Solar", "acme@x.com"))
+        self.assertIsNone(self.cache.obter(("user", "acme", 0, 10)))
+        self.assertIsNone(self.cache.obter(("user", "acme", 10, 10)))
+        self.assertIsNotNone(self.cache.obter(("user", "beta", 0, 10)))
+        # A busca vazia por "gama" passa a atender o novo nome de outra conta
+        self.cache.invalidar_conta("empresa", self.beta, ("Gama Agro", "beta@x.com"))
+        self.assertIsNone(self.cache.obter(("user", "gama", 0, 10)))
+        self.assertIsNone(self.cache.obter(("user", "beta", 0, 10)))
+
+if __name__ == "__main__":
+    unittest.main()
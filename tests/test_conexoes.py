@@ -0,0 +1,276 @@
+"""Solicitações de conexão, conexões purgadas, histórico do chat (com o arquivo), notificações e eventos"""
+
+import contextlib
+import io
+import sqlite3
+import unittest
+from unittest import mock
+
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.eventos import EVENTO_CONEXAO_ACEITA, EVENTO_CONEXAO_SOLICITADA, BarramentoEventos
+from boss_bridge.servicos.conexoes import criar_conexao, responder_conexao
+from boss_bridge.servicos.contas import excluir_conta, purgar_conta_excluida
+from boss_bridge.servicos import mensagens
+from boss_bridge.servicos.mensagens import arquivar_mensagens, enviar_mensagem, listar_mensagens, obter_conversa
+from boss_bridge.servicos.notificacoes import expirar_notificacoes, listar_notificacoes, marcar_notificacoes_lidas
+from tests.base import BancoTeste, contadores, contadores_recalculados
+
+class ConexoesRepetidasTeste(BancoTeste):
+
+    # Banco anterior ao índice único: o mesmo pedido podia ser gravado duas vezes
+    versao_inicial = 10
+
+    def setUp(self):
+        super().setUp()
+        self.popular_historico()
+        self.conn.executemany(
+            "INSERT INTO conexoes (user_id, empresa_id, status) VALUES (?, ?, ?)",
+            [(1, 1, "pendente"), (1, 1, "aceita"), (1, 2, "recusada"), (3, 2, "pendente"), (3, 2, "pendente")]
+        )
+        self.conn.commit()
+        self.migrar()
+
+    def conexoes(self):
+        return self.conn.execute("SELECT id, user_id, empresa_id, status FROM conexoes ORDER BY id").fetchall()
+
+    def test_migracao_deixa_uma_conexao_por_par(self):
+        # Fica a aceita, senão a pendente, senão a mais antiga
+        self.assertEqual(self.conexoes(), [
+            (1, 1, 1, "aceita"), (2, 1, 2, "pendente"), (3, 2, 1, "aceita"), (5, 2, 2, "aceita"), (9, 3, 2, "pendente"),
+        ])
+        self.assertEqual(contadores(self.conn), contadores_recalculados(self.conn))
+        self.assertEqual(contadores(self.conn)[("user", 1)][0], 1)
+
+    def test_pedido_repetido_e_recusado(self):
+        self.inserir_user("Davi", "davi@x.com")
+        self.conn.commit()
+        criar_conexao(self.conn, 4, 1, "empresa")
+        with self.assertRaisesRegex(ErroValidacao, "já existe"):
+            criar_conexao(self.conn, 4, 1, "empresa")
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM conexoes WHERE user_id = 4").fetchone()[0], 1)
+        self.assertEqual(contadores(self.conn)[("empresa", 1)][2], 2)
+
+class ConexaoPurgadaTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        self.popular_historico()
+        # A lista da Acme foi carregada com estas conexões antes de o Bruno excluir a conta
+        self.pendente = criar_conexao(self.conn, 3, 1, "empresa")[0]
+        self.aceita = self.conn.execute("SELECT id FROM conexoes WHERE user_id = 2 AND empresa_id = 1").fetchone()[0]
+        for conta_id in (2, 3):
+            excluir_conta(self.conn, conta_id, "user")
+        while purgar_conta_excluida(self.conn):
+            pass
+
+    def test_responder_conexao_removida(self):
+        with self.assertRaisesRegex(ErroValidacao, "não está mais disponível"):
+            responder_conexao(self.conn, self.pendente, "aceita")
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(contadores(self.conn), contadores_recalculados(self.conn))
+
+    def test_abrir_conversa_de_conexao_removida(self):
+        with self.assertRaisesRegex(ErroValidacao, "não está mais disponível"):
+            obter_conversa(self.conn, self.aceita)
+        self.assertFalse(self.conn.in_transaction)
+
+class HistoricoChatTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        self.inserir_user("Ana", "ana@x.com")
+        self.inserir_empresa("11222333000181", "Acme", "acme@x.com")
+        self.conn.execute("INSERT INTO conexoes (user_id, empresa_id, status) VALUES (1, 1, 'aceita')")
+        self.conversa_id = obter_conversa(self.conn, 1)
+        # 14 mensagens, três por segundo: as páginas de 3 cortam grupos com a mesma data_envio.
+        # Lidas, exceto uma antiga e as duas mais novas
+        for i in range(14):
+            tipo_remetente, tipo_destinatario = ("user", "empresa") if i % 2 == 0 else ("empresa", "user")
+            self.conn.execute(
+                """INSERT INTO mensagens (conversa_id, remetente_id, tipo_remetente, destinatario_id,
+                tipo_destinatario, mensagem, data_envio, lida) VALUES (?, 1, ?, 1, ?, ?, ?, ?)""",
+                (self.conversa_id, tipo_remetente, tipo_destinatario, f"m{i}",
+                 f"2024-01-{1 + i // 3:02d} 10:00:00", int(i not in (4, 12, 13)))
+            )
+        self.conn.commit()
+        self.ids = [linha[0] for linha in self.conn.execute(
+            "SELECT id FROM mensagens WHERE conversa_id = ? ORDER BY data_envio, id", (self.conversa_id,)
+        )]
+
+    def paginas(self, conn=None, limite=3):
+        """Rola do fim até o começo da conversa, como ChatMensagens, e retorna as páginas de ids"""
+        paginas = []
+        antes = None
+        while True:
+            pagina = listar_mensagens(conn or self.conn, self.conversa_id, antes, limite)
+            if not pagina:
+                return paginas
+            self.assertLessEqual(len(pagina), limite)
+            paginas.append([linha[0] for linha in pagina])
+            antes = (pagina[0][4], pagina[0][0])
+
+    def historico(self, paginas):
+        """Junta as páginas, da mais antiga para a mais nova"""
+        return [mensagem_id for pagina in reversed(paginas) for mensagem_id in pagina]
+
+    def test_paginas_por_keyset(self):
+        paginas = self.paginas()
+        self.assertEqual(paginas, [self.ids[11:], self.ids[8:11], self.ids[5:8], self.ids[2:5], self.ids[:2]])
+        # Mesma data_envio em uma página e na seguinte: o id desempata sem repetir nem pular
+        self.assertEqual(self.historico(paginas), self.ids)
+
+    def test_mensagem_enviada_durante_a_rolagem(self):
+        primeira = listar_mensagens(self.conn, self.conversa_id, None, 3)
+        self.assertEqual([linha[3] for linha in primeira], ["m11", "m12", "m13"])
+        nova, _ = enviar_mensagem(self.conn, self.conversa_id, 1, "user", "nova")
+        segunda = listar_mensagens(self.conn, self.conversa_id, (primeira[0][4], primeira[0][0]), 3)
+        self.assertEqual([linha[0] for linha in segunda], self.ids[8:11])
+        # A nova só aparece na página mais recente
+        self.assertEqual(self.historico(self.paginas()), self.ids + [nova])
+
+    def arquivada_ate(self):
+        return self.conn.execute("SELECT arquivada_ate FROM conversas WHERE id = ?", (self.conversa_id,)).fetchone()[0]
+
+    def contar(self, banco):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {banco}.mensagens").fetchone()[0]
+
+    def test_paginas_atravessam_o_arquivo(self):
+        while arquivar_mensagens(self.conn, dias=180, limite=4):
+            pass
+        # No principal ficam a não lida antiga (m4) e as duas mais novas
+        self.assertEqual((self.contar("main"), self.contar("arquivo")), (3, 11))
+        self.assertEqual(self.arquivada_ate(), "2024-01-04 10:00:00")
+
+        # Conexão nova, como a da interface: o arquivo é anexado só ao rolar até ele
+        paginas = self.paginas(self.abrir_conexao())
+        self.assertEqual(paginas, [self.ids[11:], self.ids[8:11], self.ids[5:8], self.ids[2:5], self.ids[:2]])
+        self.assertEqual(self.historico(paginas), self.ids)
+
+    def test_lote_copiado_e_nao_removido_nao_se_repete(self):
+        self.assertEqual(arquivar_mensagens(self.conn, dias=180, limite=4), 4)
+        # Queda entre as duas transações do lote seguinte: a cópia foi gravada, a remoção não
+        with mock.patch.object(mensagens, "REMOVER_ARQUIVADAS", "DELETE FROM tabela_inexistente"):
+            with self.assertRaises(sqlite3.OperationalError):
+                arquivar_mensagens(self.conn, dias=180, limite=4)
+        self.assertEqual((self.contar("main"), self.contar("arquivo")), (10, 8))
+        self.assertEqual(self.arquivada_ate(), "2024-01-02 10:00:00")
+
+        for limite in (2, 3, 5):
+            historico = self.historico(self.paginas(self.abrir_conexao(), limite))
+            self.assertEqual(historico, self.ids, limite)
+
+        # O lote seguinte termina a remoção sem duplicar o que já foi copiado
+        while arquivar_mensagens(self.conn, dias=180, limite=4):
+            pass
+        self.assertEqual((self.contar("main"), self.contar("arquivo")), (3, 11))
+
+    def test_pagina_mais_nova_que_o_arquivo_nao_o_anexa(self):
+        while arquivar_mensagens(self.conn, dias=180):
+            pass
+        conn = self.abrir_conexao()
+        self.assertEqual([linha[3] for linha in listar_mensagens(conn, self.conversa_id, None, 2)], ["m12", "m13"])
+        self.assertNotIn("arquivo", [nome for _, nome, _ in conn.execute("PRAGMA database_list")])
+        # A página seguinte chega a arquivada_ate e precisa do arquivo
+        anteriores = listar_mensagens(conn, self.conversa_id, ("2024-01-05 10:00:00", self.ids[12]), 2)
+        self.assertEqual([linha[3] for linha in anteriores], ["m10", "m11"])
+        self.assertIn("arquivo", [nome for _, nome, _ in conn.execute("PRAGMA database_list")])
+
+class NotificacoesTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        self.inserir_user("Ana", "ana@x.com")
+        self.inserir_empresa("11222333000181", "Acme", "acme@x.com")
+        # A solicitação notifica a Ana; depois chegam seis avisos
+        criar_conexao(self.conn, 1, 1, "user")
+        for i in range(1, 7):
+            self.avisar(1, "user", f"aviso {i}")
+        # Notificação de outra conta não entra nas páginas da Ana
+        self.avisar(1, "empresa", "t")
+
+    def avisar(self, usuario_id, tipo_usuario, titulo):
+        self.conn.execute(
+            "INSERT INTO notificacoes (usuario_id, tipo_usuario, titulo, mensagem) VALUES (?, ?, ?, 'm')",
+            (usuario_id, tipo_usuario, titulo)
+        )
+        self.conn.commit()
+
+    def test_paginas_por_keyset(self):
+        paginas = []
+        antes_id = None
+        while True:
+            pagina = listar_notificacoes(self.conn, 1, "user", antes_id, 3)
+            if not pagina:
+                break
+            paginas.append([linha[1] for linha in pagina])
+            antes_id = pagina[-1][0]
+        self.assertEqual(paginas, [
+            ["aviso 6", "aviso 5", "aviso 4"], ["aviso 3", "aviso 2", "aviso 1"], ["Nova solicitação de conexão"],
+        ])
+        # Uma notificação nova não desloca as páginas seguintes de quem já está rolando
+        primeira = listar_notificacoes(self.conn, 1, "user", None, 3)
+        self.avisar(1, "user", "aviso 7")
+        segunda = listar_notificacoes(self.conn, 1, "user", primeira[-1][0], 3)
+        self.assertEqual([linha[1] for linha in segunda], ["aviso 3", "aviso 2", "aviso 1"])
+
+    def test_retencao_remove_so_as_lidas_antigas(self):
+        self.assertEqual(marcar_notificacoes_lidas(self.conn, 1, "user"), 7)
+        self.assertEqual(contadores(self.conn)[("user", 1)][2], 0)
+        self.conn.execute("""UPDATE notificacoes SET data_notificacao = datetime('now', '-100 days')
+                          WHERE titulo IN ('aviso 1', 'aviso 2', 'aviso 3', 't')""")
+        self.conn.execute("UPDATE notificacoes SET lida = 0 WHERE titulo = 'aviso 3'")
+        self.conn.commit()
+
+        self.assertEqual(expirar_notificacoes(self.conn, dias=90, limite=1), 1)
+        self.assertEqual(expirar_notificacoes(self.conn, dias=90), 1)
+        self.assertEqual(expirar_notificacoes(self.conn, dias=90), 0)
+        restantes = [linha[1] for linha in listar_notificacoes(self.conn, 1, "user", None, 10)]
+        self.assertNotIn("aviso 1", restantes)
+        self.assertNotIn("aviso 2", restantes)
+        # Não lidas nunca expiram, por mais antigas que sejam
+        self.assertIn("aviso 3", restantes)
+        self.assertEqual(len(restantes), 5)
+        self.assertEqual(listar_notificacoes(self.conn, 1, "empresa", None, 10)[0][1], "t")
+        self.assertEqual(contadores(self.conn), contadores_recalculados(self.conn))
+
+class BarramentoEventosTeste(unittest.TestCase):
+
+    def setUp(self):
+        self.barramento = BarramentoEventos()
+        self.recebidos = []
+
+    def registrar(self, nome):
+        return lambda **dados: self.recebidos.append((nome, dados))
+
+    def test_falha_de_um_assinante_nao_impede_os_demais(self):
+        def falhar(**dados):
+            raise RuntimeError("tela destruída")
+
+        self.barramento.assinar(EVENTO_CONEXAO_ACEITA, self.registrar("antes"))
+        self.barramento.assinar(EVENTO_CONEXAO_ACEITA, falhar)
+        self.barramento.assinar(EVENTO_CONEXAO_ACEITA, self.registrar("depois"))
+        with contextlib.redirect_stdout(io.StringIO()) as saida:
+            self.barramento.publicar(EVENTO_CONEXAO_ACEITA, conexao_id=1, outra_parte=2)
+        self.assertEqual([nome for nome, _ in self.recebidos], ["antes", "depois"])
+        self.assertEqual(self.recebidos[0][1], {"conexao_id": 1, "outra_parte": 2})
+        self.assertIn("tela destruída", saida.getvalue())
+
+    def test_fechar_a_tela_remove_so_as_assinaturas_dela(self):
+        self.barramento.assinar(EVENTO_CONEXAO_SOLICITADA, self.registrar("conexoes"), tela="conexoes")
+        self.barramento.assinar(EVENTO_CONEXAO_ACEITA, self.registrar("conexoes"), tela="conexoes")
+        self.barramento.assinar(EVENTO_CONEXAO_ACEITA, self.registrar("sessao"))
+        self.barramento.encerrar_tela("conexoes")
+        self.barramento.publicar(EVENTO_CONEXAO_SOLICITADA, conexao_id=1)
+        self.barramento.publicar(EVENTO_CONEXAO_ACEITA, conexao_id=1)
+        self.assertEqual([nome for nome, _ in self.recebidos], ["sessao"])
+
+    def test_assinante_pode_se_remover_durante_a_entrega(self):
+        # Um callback que fecha a própria tela não faz os demais pularem o evento
+        self.barramento.assinar(EVENTO_CONEXAO_ACEITA, lambda **_: self.barramento.encerrar_tela("chat"), tela="chat")
+        self.barramento.assinar(EVENTO_CONEXAO_ACEITA, self.registrar("sessao"))
+        self.barramento.publicar(EVENTO_CONEXAO_ACEITA, conexao_id=1)
+        self.assertEqual([nome for nome, _ in self.recebidos], ["sessao"])
+
+if __name__ == "__main__":
+    unittest.main()
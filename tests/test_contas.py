@@ -0,0 +1,146 @@
+"""Login (hashes de senha e índice com emails repetidos) e exclusão de contas com purga em lotes"""
+
+import hashlib
+import unittest
+from unittest import mock
+
+from boss_bridge import seguranca
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.seguranca import gerar_hash_senha, verificar_senha
+from boss_bridge.servicos.contas import (
+    atualizar_hash_senha, autenticar, excluir_conta, listar_contas_conflitantes, purgar_conta_excluida, resolver_conta_conflitante
+)
+from boss_bridge.servicos.mensagens import arquivar_mensagens
+from tests.base import BancoTeste, contadores, contadores_recalculados
+
+class ContasConflitantesTeste(BancoTeste):
+
+    # Banco anterior ao índice de contas: nada impedia o mesmo email nas duas tabelas
+    versao_inicial = 4
+
+    def setUp(self):
+        super().setUp()
+        senha = gerar_hash_senha("segredo")
+        self.inserir_user("Ana", "Ana@Exemplo.com", senha)
+        self.inserir_empresa("11222333000181", "Acme", " ana@exemplo.com", senha)
+        self.conn.commit()
+        self.migrar()
+
+    def test_conta_fora_do_indice_fica_registrada(self):
+        self.assertEqual(listar_contas_conflitantes(self.conn), [("empresa", 1, "ana@exemplo.com", "user", 1)])
+        # O email continua levando à conta que ficou no índice
+        self.assertEqual(autenticar(self.conn, "ana@exemplo.com", "segredo")[:2], (1, "user"))
+
+    def test_resolver_libera_o_login_da_conta_conflitante(self):
+        with self.assertRaises(ErroValidacao):
+            resolver_conta_conflitante(self.conn, "empresa", 1, "ANA@exemplo.com")
+
+        resolver_conta_conflitante(self.conn, "empresa", 1, "contato@acme.com.br")
+        self.assertEqual(listar_contas_conflitantes(self.conn), [])
+        self.assertEqual(autenticar(self.conn, "contato@acme.com.br", "segredo")[:2], (1, "empresa"))
+        self.assertEqual(autenticar(self.conn, "ana@exemplo.com", "segredo")[:2], (1, "user"))
+
+    def test_conta_conflitante_removida_sai_do_registro(self):
+        self.conn.execute("DELETE FROM empresas WHERE id = 1")
+        self.conn.commit()
+        self.assertEqual(listar_contas_conflitantes(self.conn), [])
+
+class AutenticacaoTeste(BancoTeste):
+
+    def test_email_desconhecido_custa_o_mesmo_scrypt(self):
+        self.inserir_user("Ana", "ana@x.com", gerar_hash_senha("segredo"))
+        self.conn.commit()
+        with mock.patch.object(seguranca, "_scrypt", wraps=seguranca._scrypt) as scrypt:
+            self.assertIsNone(autenticar(self.conn, "ninguem@x.com", "segredo"))
+            self.assertIsNone(autenticar(self.conn, "ana@x.com", "errada"))
+        self.assertEqual(scrypt.call_count, 2)
+        self.assertEqual(scrypt.call_args_list[0].args[2], scrypt.call_args_list[1].args[2])
+
+    def test_verificar_senha(self):
+        atual = gerar_hash_senha("segredo")
+        self.assertEqual(verificar_senha("segredo", atual), (True, False))
+        self.assertEqual(verificar_senha("errada", atual), (False, False))
+        # Custo antigo ou hash legado: confere e pede recálculo; senha errada nunca pede
+        antigo = gerar_hash_senha("segredo", {"ln": 4, "r": 8, "p": 1})
+        self.assertEqual(verificar_senha("segredo", antigo), (True, True))
+        legado = hashlib.sha256(b"segredo").hexdigest()
+        self.assertEqual(verificar_senha("segredo", legado), (True, True))
+        self.assertEqual(verificar_senha("errada", legado), (False, False))
+
+    def test_login_recalcula_o_hash_legado(self):
+        legado = hashlib.sha256(b"segredo").hexdigest()
+        conta_id = self.inserir_user("Ana", "ana@x.com", legado)
+        self.conn.commit()
+        self.assertEqual(autenticar(self.conn, "ANA@x.com", "segredo"), (conta_id, "user", "Ana"))
+        armazenado = self.conn.execute("SELECT senha FROM users WHERE id = ?", (conta_id,)).fetchone()[0]
+        self.assertTrue(armazenado.startswith("$scrypt$"))
+        self.assertEqual(verificar_senha("segredo", armazenado), (True, False))
+
+    def test_recalculo_nao_sobrescreve_senha_trocada(self):
+        legado = hashlib.sha256(b"segredo").hexdigest()
+        conta_id = self.inserir_user("Ana", "ana@x.com", legado)
+        # Outra sessão trocou a senha enquanto o login recalculava o hash antigo
+        trocada = gerar_hash_senha("nova")
+        self.conn.execute("UPDATE users SET senha = ? WHERE id = ?", (trocada, conta_id))
+        self.conn.commit()
+        self.assertFalse(atualizar_hash_senha(self.conn, conta_id, "user", legado, gerar_hash_senha("segredo")))
+        self.assertEqual(self.conn.execute("SELECT senha FROM users WHERE id = ?", (conta_id,)).fetchone()[0], trocada)
+
+class PurgaContaTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        self.popular_historico()
+        self.inserir_user("Davi", "davi@x.com", gerar_hash_senha("segredo"))
+        self.conn.commit()
+        # "oi" (Acme) e "bom dia" (Beta) vão para o banco de arquivo
+        self.assertEqual(arquivar_mensagens(self.conn, dias=180), 2)
+
+    def contar(self, sql, *parametros):
+        return self.conn.execute(sql, parametros).fetchone()[0]
+
+    def test_purga_em_lotes_mantem_o_banco_consistente(self):
+        excluir_conta(self.conn, 1, "empresa")
+        excluir_conta(self.conn, 4, "user")
+        # A conta some do login na hora, antes da purga
+        self.assertIsNone(autenticar(self.conn, "davi@x.com", "segredo"))
+
+        lotes = []
+        while True:
+            removidas = purgar_conta_excluida(self.conn, limite=2)
+            if not removidas:
+                break
+            self.assertLessEqual(removidas, 2)
+            lotes.append(removidas)
+            # Cada lote é uma transação completa: os contadores nunca ficam para trás
+            self.assertEqual(contadores(self.conn), contadores_recalculados(self.conn))
+        self.assertGreater(len(lotes), 2)
+
+        self.assertEqual(self.contar("SELECT COUNT(*) FROM empresas WHERE id = 1"), 0)
+        self.assertEqual(self.contar("SELECT COUNT(*) FROM users WHERE id = 4"), 0)
+        for tabela, coluna in (("conexoes", "empresa_id"), ("conversas", "empresa_id")):
+            self.assertEqual(self.contar(f"SELECT COUNT(*) FROM {tabela} WHERE {coluna} = 1"), 0, tabela)
+        self.assertEqual(self.contar(
+            """SELECT COUNT(*) FROM mensagens WHERE (remetente_id = 1 AND tipo_remetente = 'empresa')
+            OR (destinatario_id = 1 AND tipo_destinatario = 'empresa')"""
+        ), 0)
+        self.assertEqual(
+            self.contar("SELECT COUNT(*) FROM notificacoes WHERE usuario_id = 1 AND tipo_usuario = 'empresa'"), 0
+        )
+        self.assertEqual(self.contar("SELECT COUNT(*) FROM contas WHERE tipo_conta = 'empresa' AND conta_id = 1"), 0)
+        self.assertNotIn(("empresa", 1), contadores(self.conn))
+        self.assertEqual(self.contar("SELECT COUNT(*) FROM empresas_fts WHERE empresas_fts MATCH 'acme'"), 0)
+
+        # Nada aponta para as linhas removidas, nem no banco de arquivo
+        self.assertEqual(self.conn.execute("PRAGMA foreign_key_check").fetchall(), [])
+        self.assertEqual(self.contar("SELECT COUNT(*) FROM arquivo.mensagens WHERE conversa_id NOT IN "
+                                     "(SELECT id FROM conversas)"), 0)
+
+        # A conversa da Beta segue inteira: uma mensagem no banco principal, outra no arquivo
+        conversa_id = self.contar("SELECT id FROM conversas WHERE user_id = 2 AND empresa_id = 2")
+        self.assertEqual(self.contar("SELECT COUNT(*) FROM mensagens WHERE conversa_id = ?", conversa_id), 1)
+        self.assertEqual(self.contar("SELECT COUNT(*) FROM arquivo.mensagens WHERE conversa_id = ?", conversa_id), 1)
+        self.assertEqual(contadores(self.conn)[("user", 2)], (1, 1, 0))
+
+if __name__ == "__main__":
+    unittest.main()
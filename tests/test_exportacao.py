@@ -0,0 +1,86 @@
+"""Exportação de mensagens depois do arquivamento, e pelo comando export em bancos antigos"""
+
+import contextlib
+import csv
+import io
+import json
+import unittest
+
+from boss_bridge import banco, cli
+from boss_bridge.servicos.exportacao import exportar
+from boss_bridge.servicos.mensagens import arquivar_mensagens
+from tests.base import BancoTeste
+
+class ExportacaoMensagensArquivadasTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        self.inserir_user("Ana", "ana@x.com")
+        self.inserir_empresa("11222333000181", "Acme", "acme@x.com")
+        # Dez mensagens lidas de um ano atrás e duas recentes, alternando o remetente
+        for dia in list(range(400, 390, -1)) + [2, 1]:
+            remetente = ("user", "empresa") if dia % 2 else ("empresa", "user")
+            self.conn.execute(
+                """INSERT INTO mensagens
+                (remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, mensagem, data_envio, lida)
+                VALUES (1, ?, 1, ?, ?, datetime('now', ?), 1)""",
+                (*remetente, f"dia {dia}", f"-{dia} days")
+            )
+        self.conn.commit()
+        self.ids = [linha[0] for linha in self.conn.execute("SELECT id FROM mensagens ORDER BY id")]
+
+        self.assertEqual(arquivar_mensagens(self.conn, dias=180), 10)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM main.mensagens").fetchone()[0], 2)
+
+    def exportar(self, **filtros):
+        # Conexão nova, como a do comando export: o banco de arquivo ainda não está anexado
+        conn = self.abrir_conexao()
+        saida = io.StringIO()
+        total, ultimo_id = exportar(conn, "mensagens", saida, lote=3, **filtros)
+        ids = [int(linha["id"]) for linha in csv.DictReader(io.StringIO(saida.getvalue()))]
+        self.assertEqual(total, len(ids))
+        return ids, ultimo_id
+
+    def test_exportacao_completa_inclui_arquivadas_em_ordem_de_id(self):
+        ids, ultimo_id = self.exportar()
+        self.assertEqual(ids, self.ids)
+        self.assertEqual(ultimo_id, self.ids[-1])
+
+    def test_filtros_e_marca_incremental_valem_para_as_arquivadas(self):
+        ids, _ = self.exportar(apos_id=self.ids[4])
+        self.assertEqual(ids, self.ids[5:])
+        ids, _ = self.exportar(ate=self.conn.execute("SELECT date('now', '-395 days')").fetchone()[0])
+        self.assertEqual(ids, self.ids[:6])
+
+    def test_lote_interrompido_nos_dois_bancos_nao_duplica(self):
+        # Simula uma cópia concluída cuja remoção não chegou a acontecer
+        self.conn.execute("INSERT INTO arquivo.mensagens SELECT * FROM main.mensagens WHERE id = ?", (self.ids[-1],))
+        self.conn.commit()
+        ids, _ = self.exportar()
+        self.assertEqual(ids, self.ids)
+
+class ExportacaoBancoAntigoTeste(BancoTeste):
+
+    # Banco anterior ao arquivamento, nunca aberto pela versão atual da aplicação
+    versao_inicial = 7
+
+    def test_comando_migra_antes_de_exportar(self):
+        self.inserir_user("Ana", "ana@x.com")
+        self.inserir_empresa("11222333000181", "Acme", "acme@x.com")
+        self.conn.execute(
+            """INSERT INTO mensagens (remetente_id, tipo_remetente, destinatario_id, tipo_destinatario, mensagem)
+            VALUES (1, 'user', 1, 'empresa', 'oi')"""
+        )
+        self.conn.commit()
+
+        saida, erros = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(saida), contextlib.redirect_stderr(erros):
+            codigo = cli.main(["--banco", self.caminho, "export", "mensagens", "--formato", "jsonl"])
+        self.assertEqual(codigo, 0, erros.getvalue())
+        # Só as linhas exportadas na saída padrão; os avisos das migrações vão para o stderr
+        self.assertEqual([json.loads(linha)["mensagem"] for linha in saida.getvalue().splitlines()], ["oi"])
+        self.assertIn("Migração 8 aplicada", erros.getvalue())
+        self.assertEqual(self.conn.execute("PRAGMA user_version").fetchone()[0], banco.MIGRACOES[-1][0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Importação em massa de empresas: cada linha recebe a sua própria credencial"""
+
+import csv
+import os
+import stat
+import unittest
+
+from boss_bridge.erros import ErroValidacao
+from boss_bridge.seguranca import CUSTO_SCRYPT
+from boss_bridge.servicos.contas import (
+    autenticar, cadastrar_empresa, digitos_verificadores_cnpj, listar_cnpjs_conflitantes, obter_hash_senha,
+    resolver_cnpj_conflitante
+)
+from boss_bridge.servicos.importacao import importar_csv_empresas, importar_empresas
+from tests.base import BancoTeste
+
+EMPRESAS = """cnpj;nome_empresa;razao_social;email
+11.222.333/0001-81;Acme;Acme Ltda;contato@acme.com.br
+11444777000161;Beta;Beta SA;contato@beta.com.br
+"""
+
+class ImportacaoEmpresasTeste(BancoTeste):
+
+    def setUp(self):
+        super().setUp()
+        self.csv = os.path.join(self.pasta.name, "empresas.csv")
+        with open(self.csv, "w", encoding="utf-8") as arquivo:
+            arquivo.write(EMPRESAS)
+        self.credenciais = os.path.join(self.pasta.name, "senhas.csv")
+
+    def importar(self):
+        resultado = importar_csv_empresas(self.conn, self.csv, self.credenciais)
+        with open(self.credenciais, newline="", encoding="utf-8") as arquivo:
+            return resultado, list(csv.DictReader(arquivo))
+
+    def test_empresas_importadas_nao_compartilham_credencial(self):
+        (importadas, rejeitadas), linhas = self.importar()
+        self.assertEqual((importadas, rejeitadas), (2, 0))
+
+        senhas = [linha["senha"] for linha in linhas]
+        self.assertEqual(len(set(senhas)), 2)
+        hashes = {obter_hash_senha(self.conn, conta_id, "empresa")
+                  for (conta_id,) in self.conn.execute("SELECT id FROM empresas")}
+        self.assertEqual(len(hashes), 2)
+
+        # Cada senha abre só a própria conta
+        acme, beta = linhas
+        self.assertIsNotNone(autenticar(self.conn, acme["email"], acme["senha"]))
+        self.assertIsNone(autenticar(self.conn, beta["email"], acme["senha"]))
+        self.assertIsNotNone(autenticar(self.conn, beta["email"], beta["senha"]))
+
+        # O hash barato da senha gerada passa ao custo normal no primeiro login
+        conta_id = self.conn.execute("SELECT id FROM empresas WHERE email = ?", (acme["email"],)).fetchone()[0]
+        self.assertIn(f"ln={CUSTO_SCRYPT['ln']},", obter_hash_senha(self.conn, conta_id, "empresa"))
+
+    def test_arquivo_de_credenciais_restrito_e_nao_sobrescrito(self):
+        self.importar()
+        if os.name == "posix":
+            self.assertEqual(stat.S_IMODE(os.stat(self.credenciais).st_mode), 0o600)
+        with self.assertRaises(FileExistsError):
+            importar_csv_empresas(self.conn, self.csv, self.credenciais)
+
+class CnpjLegadoTeste(BancoTeste):
+
+    # Antes da normalização: o CNPJ era gravado como digitado
+    versao_inicial = 9
+
+    def setUp(self):
+        super().setUp()
+        self.inserir_empresa("11.222.333/0001-81", "Acme", "acme@x.com")
+        self.inserir_empresa("11444777000161", "Beta", "beta@x.com")
+        self.inserir_empresa("11.444.777/0001-61", "Beta Filial", "filial@x.com")
+        self.inserir_empresa("123", "Gama", "gama@x.com")
+        self.conn.commit()
+        self.migrar()
+
+    def test_migracao_grava_so_digitos_e_registra_invalidos_e_repetidos(self):
+        self.assertEqual(
+            [cnpj for (cnpj,) in self.conn.execute("SELECT cnpj FROM empresas ORDER BY id")],
+            ["11222333000181", "11444777000161", "11.444.777/0001-61", "123"]
+        )
+        self.assertEqual(listar_cnpjs_conflitantes(self.conn), [
+            (3, "Beta Filial", "11.444.777/0001-61", 2),
+            (4, "Gama", "123", None),
+        ])
+
+    def test_cnpj_legado_nao_e_cadastrado_de_novo(self):
+        rejeitadas = []
+        linhas = [(2, {"cnpj": "11222333000181", "nome_empresa": "Acme", "razao_social": "Acme Ltda",
+                       "email": "outro@acme.com.br"})]
+        resultado = importar_empresas(self.conn, linhas, lambda *credencial: None,
+                                      lambda numero, campos, motivo: rejeitadas.append(motivo))
+        self.assertEqual(resultado, (0, 1))
+        self.assertEqual(rejeitadas, ["Este CNPJ já está cadastrado!"])
+
+        with self.assertRaises(ErroValidacao):
+            cadastrar_empresa(self.conn, "11.222.333/0001-81", "Acme", "Acme Ltda", "", "", "", "", "", "",
+                              "novo@acme.com.br", "h")
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM empresas").fetchone()[0], 4)
+
+    def test_resolver_e_excluir_tiram_a_empresa_do_registro(self):
+        with self.assertRaises(ErroValidacao):
+            resolver_cnpj_conflitante(self.conn, 3, "11444777000161")
+
+        base = "114447770002"
+        resolver_cnpj_conflitante(self.conn, 3, base + digitos_verificadores_cnpj(base))
+        self.assertEqual(self.conn.execute("SELECT cnpj FROM empresas WHERE id = 3").fetchone()[0],
+                         base + digitos_verificadores_cnpj(base))
+
+        self.conn.execute("DELETE FROM empresas WHERE id = 4")
+        self.conn.commit()
+        self.assertEqual(listar_cnpjs_conflitantes(self.conn), [])
+
+if __name__ == "__main__":
+    unittest.main()
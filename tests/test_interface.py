@@ -0,0 +1,44 @@
+"""Fontes paginadas das listas virtualizadas (requer customtkinter)"""
+
+import importlib.util
+import sqlite3
+import unittest
+
+if importlib.util.find_spec("customtkinter"):
+    from boss_bridge_system import FontePaginada
+else:
+    FontePaginada = None
+
+@unittest.skipIf(FontePaginada is None, "customtkinter não está instalado")
+class FontePaginadaTeste(unittest.TestCase):
+
+    def setUp(self):
+        # Cada pedido fica pendente até o teste entregar o resultado ou a falha
+        self.pedidos = []
+
+        def executar(funcao, ao_concluir, *args, ao_falhar=None):
+            self.pedidos.append((args, ao_concluir, ao_falhar))
+
+        self.fonte = FontePaginada(executar, None, "user", tamanho_pagina=2)
+
+    def test_pagina_pendente_nao_e_pedida_duas_vezes(self):
+        self.fonte.garantir(1)
+        self.fonte.garantir(1)
+        self.assertEqual(len(self.pedidos), 1)
+
+    def test_pagina_que_falhou_pode_ser_pedida_de_novo(self):
+        self.fonte.garantir(1)
+        _, _, ao_falhar = self.pedidos[0]
+        ao_falhar(sqlite3.OperationalError("database is locked"))
+        self.assertFalse(self.fonte.carregando)
+
+        self.fonte.garantir(1)
+        self.assertEqual(len(self.pedidos), 2)
+        args, ao_concluir, _ = self.pedidos[1]
+        self.assertEqual(args, ("user", 0, 2))
+        ao_concluir([(1,), (2,)])
+        self.assertEqual(self.fonte.linhas, [(1,), (2,)])
+        self.assertFalse(self.fonte.completa)
+
+if __name__ == "__main__":
+    unittest.main()